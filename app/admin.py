@@ -1,81 +1,36 @@
-from django.contrib import admin
-from .models import ProcessedData
-from django.http import HttpResponse
-import xlwt
+import os
+from django.contrib import admin, messages
+from django.shortcuts import redirect, render
+from django.urls import path, reverse
+from .caching import CachedCountPaginator
+from .fulltext import FullTextIndex, FullTextSearchMixin
+from .keyset import KeysetPaginationMixin
+from .references import ReferenceSearchMixin, process_reference
+from .models import ExportJob, ProcessedData
+from .export_jobs import CONTENT_TYPES, UnreadableSelection, fail_job, job_model, queue_export
+from .importer import import_processed_data
+from django.http import FileResponse, Http404, JsonResponse
+from django.utils.html import format_html
 from datetime import datetime
 from django.utils import timezone
 from rangefilter.filters import DateRangeFilter
 
 @admin.register(ProcessedData)
-class ProcessedDataAdmin(admin.ModelAdmin):
+class ProcessedDataAdmin(ReferenceSearchMixin, FullTextSearchMixin, KeysetPaginationMixin, admin.ModelAdmin):
     list_display = ('image_number', 'serial_number', 'username', 'customer_name', 'city_state', 
                    'purchase_value_and_down_payment', 'loan_period_and_interest', 
                    'loan_amount_and_principal', 'insurance_and_pmi', 'formatted_property_tax', 'entry_timestamp')
     list_filter = (('entry_timestamp', DateRangeFilter), 'image_number', 'username')
     search_fields = ('image_number', 'username', 'customer_name', 'customer_reference_number', 'guarantor_name')
+    fulltext_index = FullTextIndex(ProcessedData._meta.db_table, search_fields)
     readonly_fields = ('entry_timestamp', 'loan_period_and_interest', 
                       'purchase_value_and_down_payment', 'loan_amount_and_principal',
                       'insurance_and_pmi', 'formatted_property_tax')
     actions = ['export_to_excel']
     
     def export_to_excel(self, request, queryset):
-        """Export selected records to Excel"""
-        response = HttpResponse(content_type='application/ms-excel')
-        response['Content-Disposition'] = 'attachment; filename="processed_data.xls"'
-
-        wb = xlwt.Workbook(encoding='utf-8')
-        ws = wb.add_sheet('Processed Data')
-
-        # Write headers
-        headers = [
-            'Image Number',
-            'Serial Number',
-            'Username',
-            'Customer Reference Number',
-            'Customer Name',
-            'City, State',
-            'Purchase Value and Down Payment',
-            'Loan Period and Annual Interest',
-            'Guarantor Name',
-            'Guarantor Reference Number',
-            'Loan Amount and Principal',
-            'Total Interest for Loan Period and Property Tax for Loan Period',
-            'Property Insurance per Month and PMI per Annum'
-        ]
-        
-        font_style = xlwt.XFStyle()
-        font_style.font.bold = True
-
-        for col_num, header in enumerate(headers):
-            ws.write(0, col_num, header, font_style)
-
-        # Write data rows
-        font_style = xlwt.XFStyle()
-        row_num = 1
-        
-        for obj in queryset:
-            row = [
-                obj.image_number,
-                obj.serial_number,
-                obj.username,
-                obj.customer_reference_number,
-                obj.customer_name,
-                obj.city_state,
-                f"{obj.format_purchase_value()} AND {obj.down_payment_percent} %",
-                f"{obj.loan_period_years} YEARS AND {obj.annual_interest_rate} %",
-                obj.guarantor_name,
-                obj.guarantor_reference_number or '',
-                f"{obj.format_number_with_commas(obj.loan_amount)} AND {obj.format_number_with_commas(obj.final_principal)}",
-                f"{obj.format_number_with_commas(obj.total_interest_for_period)} AND {obj.formatted_property_tax}",
-                f"{obj.format_number_with_commas(obj.property_insurance_per_month)} AND {obj.format_number_with_commas(obj.pmi_per_annum) if obj.pmi_per_annum else 'NA'}"
-            ]
-            
-            for col_num, cell_value in enumerate(row):
-                ws.write(row_num, col_num, str(cell_value), font_style)
-            row_num += 1
-
-        wb.save(response)
-        return response
+        """Queue the selected records for export to Excel"""
+        return queue_export(request, 'processed_data_xlsx', queryset)
     export_to_excel.short_description = "Export selected records to Excel"
     
     fieldsets = (
@@ -112,10 +67,151 @@ class ProcessedDataAdmin(admin.ModelAdmin):
     )
     
     list_per_page = 20
+    paginator = CachedCountPaginator
     save_on_top = True
     ordering = ('-entry_timestamp',)
+    keyset_field = 'entry_timestamp'
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='app_processeddata_import'),
+        ]
+        return custom_urls + urls
+
+    def import_view(self, request):
+        """Upload a .xlsx/.csv with the home form's columns and bulk import it"""
+        if not self.has_add_permission(request):
+            return redirect('admin:app_processeddata_changelist')
+
+        if request.method == 'POST' and request.FILES.get('spreadsheet'):
+            upload = request.FILES['spreadsheet']
+            try:
+                result = import_processed_data(
+                    upload.file,
+                    filename=upload.name,
+                    default_username=request.user.get_username(),
+                )
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                for row_number, message in result.errors[:20]:
+                    messages.warning(request, f"Row {row_number}: {message}")
+                if len(result.errors) > 20:
+                    messages.warning(request, f"... and {len(result.errors) - 20} more skipped rows")
+                messages.success(request, f"Imported {result.created} rows ({len(result.errors)} skipped).")
+                return redirect('admin:app_processeddata_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import processed data',
+        }
+        return render(request, 'admin/app/processeddata/import.html', context)
 
     def save_model(self, request, obj, form, change):
         if obj.customer_reference_number:
-            obj.customer_reference_number = obj.customer_reference_number.strip().upper().replace(' ', '   ')
+            obj.customer_reference_number = process_reference(obj.customer_reference_number)
         super().save_model(request, obj, form, change)
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'exporter', 'status', 'progress', 'requested_by', 'created_at', 'download_link')
+    list_filter = ('status', 'exporter')
+    readonly_fields = ('exporter', 'status', 'total_rows', 'processed_rows', 'filename', 'error',
+                       'requested_by', 'created_at', 'started_at', 'heartbeat_at', 'attempts', 'finished_at')
+    exclude = ('selection', 'file_path')
+    list_per_page = 20
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def progress(self, obj):
+        return f"{obj.processed_rows} / {obj.total_rows} ({obj.progress_percent}%)"
+    progress.short_description = 'Progress'
+
+    def download_link(self, obj):
+        if obj.status != ExportJob.DONE:
+            return format_html('<a href="{}">{}</a>', reverse('admin:app_exportjob_progress', args=[obj.pk]), obj.get_status_display())
+        return format_html('<a href="{}">Download</a>', reverse('admin:app_exportjob_download', args=[obj.pk]))
+    download_link.short_description = 'File'
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('<int:job_id>/progress/', self.admin_site.admin_view(self.progress_view), name='app_exportjob_progress'),
+            path('<int:job_id>/status/', self.admin_site.admin_view(self.status_view), name='app_exportjob_status'),
+            path('<int:job_id>/download/', self.admin_site.admin_view(self.download_view), name='app_exportjob_download'),
+        ]
+        return custom_urls + urls
+
+    def get_queryset(self, request):
+        # Users see the exports they queued; superusers see every export
+        queryset = super().get_queryset(request)
+        if request.user.is_superuser:
+            return queryset
+        return queryset.filter(requested_by=request.user)
+
+    def _get_job(self, request, job_id):
+        """
+        A job the user queued (any job for a superuser), as long as they can
+        still view the rows it exports. A job whose saved selection names a
+        model that is gone is marked failed, so its page shows why instead of erroring.
+        """
+        job = self.get_queryset(request).filter(pk=job_id).first()
+        if job is None or not self.has_view_permission(request, job):
+            raise Http404("Export not found")
+        try:
+            model = job_model(job)
+        except UnreadableSelection as e:
+            if job.status != ExportJob.FAILED:
+                fail_job(job, str(e))
+            return job
+        model_admin = self.admin_site._registry.get(model)
+        if model_admin is None or not model_admin.has_view_permission(request):
+            raise Http404("Export not found")
+        return job
+
+    def _job_status(self, job):
+        return {
+            'id': job.pk,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'processed_rows': job.processed_rows,
+            'total_rows': job.total_rows,
+            'percent': job.progress_percent,
+            'download_url': reverse('admin:app_exportjob_download', args=[job.pk]) if job.status == ExportJob.DONE else None,
+            'error': job.error.strip().splitlines()[-1] if job.error else '',
+        }
+
+    def progress_view(self, request, job_id):
+        """Page that polls the job status and shows the download link when ready"""
+        job = self._get_job(request, job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f'Export {job.pk}',
+            'job': job,
+            'job_status': self._job_status(job),
+            'status_url': reverse('admin:app_exportjob_status', args=[job.pk]),
+        }
+        return render(request, 'admin/app/exportjob/progress.html', context)
+
+    def status_view(self, request, job_id):
+        return JsonResponse(self._job_status(self._get_job(request, job_id)))
+
+    def download_view(self, request, job_id):
+        job = self._get_job(request, job_id)
+        if job.status != ExportJob.DONE or not os.path.exists(job.file_path):
+            raise Http404("Export file is not available")
+        extension = os.path.splitext(job.filename)[1].lstrip('.')
+        return FileResponse(
+            open(job.file_path, 'rb'),
+            as_attachment=True,
+            filename=job.filename,
+            content_type=CONTENT_TYPES.get(extension, 'application/octet-stream'),
+        )
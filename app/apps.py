@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from .caching import processed_data_changed
+        from .fulltext import restore_fulltext_triggers
+
+        post_save.connect(processed_data_changed, sender='app.ProcessedData')
+        post_delete.connect(processed_data_changed, sender='app.ProcessedData')
+        post_migrate.connect(restore_fulltext_triggers, sender=self)
@@ -0,0 +1,294 @@
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from decimal import Decimal
+
+from django.conf import settings
+
+# ——— Workbook Location ———
+# The sheet holds one block per state: a "Cities in <State> State" header row,
+# then (city, rate) rows, then a blank separator row. Rates are fractions
+# (0.3311) and are served as percentages ("33.11") to match the form field.
+WORKBOOK_PATH = getattr(
+    settings,
+    'ASSESSMENT_RATE_WORKBOOK',
+    os.path.join(settings.BASE_DIR, 'City and State Assessment Rate.xlsx'),
+)
+
+# Compiled by `manage.py compile_assessment_rates`; see SnapshotRateIndex.
+SNAPSHOT_PATH = getattr(
+    settings,
+    'ASSESSMENT_RATE_SNAPSHOT',
+    os.path.join(settings.BASE_DIR, 'assessment_rates.idx'),
+)
+SNAPSHOT_MAGIC = b'ARIDX001'
+SNAPSHOT_HEADER = struct.Struct('<8sdI4x')  # magic, source mtime, row count
+
+STATE_HEADER_RE = re.compile(r"^\s*cities\s+in\s+(.*?)(?:\s+state)?\s*$", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+
+STATE_ABBREVIATIONS = {
+    "AL": "ALABAMA", "AK": "ALASKA", "AZ": "ARIZONA", "AR": "ARKANSAS",
+    "CA": "CALIFORNIA", "CO": "COLORADO", "CT": "CONNECTICUT", "DE": "DELAWARE",
+    "FL": "FLORIDA", "GA": "GEORGIA", "HI": "HAWAII", "ID": "IDAHO",
+    "IL": "ILLINOIS", "IN": "INDIANA", "IA": "IOWA", "KS": "KANSAS",
+    "KY": "KENTUCKY", "LA": "LOUISIANA", "ME": "MAINE", "MD": "MARYLAND",
+    "MA": "MASSACHUSETTS", "MI": "MICHIGAN", "MN": "MINNESOTA", "MS": "MISSISSIPPI",
+    "MO": "MISSOURI", "MT": "MONTANA", "NE": "NEBRASKA", "NV": "NEVADA",
+    "NH": "NEW HAMPSHIRE", "NJ": "NEW JERSEY", "NM": "NEW MEXICO", "NY": "NEW YORK",
+    "NC": "NORTH CAROLINA", "ND": "NORTH DAKOTA", "OH": "OHIO", "OK": "OKLAHOMA",
+    "OR": "OREGON", "PA": "PENNSYLVANIA", "RI": "RHODE ISLAND", "SC": "SOUTH CAROLINA",
+    "SD": "SOUTH DAKOTA", "TN": "TENNESSEE", "TX": "TEXAS", "UT": "UTAH",
+    "VT": "VERMONT", "VA": "VIRGINIA", "WA": "WASHINGTON", "WV": "WEST VIRGINIA",
+    "WI": "WISCONSIN", "WY": "WYOMING",
+}
+
+
+def make_key(city, state):
+    """
+    Build the lookup key for a city/state pair in the same "CITY , STATE"
+    shape that format_location produces.
+    """
+    city = WHITESPACE_RE.sub(" ", str(city).strip().upper())
+    state = WHITESPACE_RE.sub(" ", str(state).strip().upper().rstrip('.'))
+    state = STATE_ABBREVIATIONS.get(state, state)
+    return f"{city} , {state}"
+
+
+def normalize_location(text):
+    """
+    Normalize free text such as "adak,  ak" → "ADAK , ALASKA".
+    Returns None when the text has no comma (format_location rejects those too).
+    """
+    if not text or ',' not in text:
+        return None
+    # The state is whatever follows the last comma; some workbook city names
+    # contain commas themselves ("SALEM, FULTON").
+    city, state = text.rsplit(',', 1)
+    return make_key(city, state)
+
+
+def parse_rate(value):
+    """
+    Convert a workbook fraction (0.3311) into a two-place percentage (33.11).
+    """
+    return (Decimal(str(value)) * 100).quantize(Decimal("0.01"))
+
+
+def read_workbook(path):
+    """
+    Yield (key, rate) pairs from the assessment-rate workbook.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        state = None
+        for city, rate in workbook.worksheets[0].iter_rows(min_col=1, max_col=2, values_only=True):
+            if city is None:
+                continue
+            if isinstance(city, str):
+                header = STATE_HEADER_RE.match(city)
+                if header:
+                    state = header.group(1)
+                    continue
+            if state is None or not isinstance(rate, (int, float)):
+                continue
+            yield make_key(city, state), parse_rate(rate)
+    finally:
+        workbook.close()
+
+
+class AssessmentRateIndex:
+    """
+    Hash index over the workbook: normalized "CITY , STATE" → rate percent.
+    """
+
+    def __init__(self, rates, mtime=None):
+        self.rates = rates
+        self.mtime = mtime
+
+    @classmethod
+    def from_workbook(cls, path):
+        mtime = os.stat(path).st_mtime
+        rates = {}
+        for key, rate in read_workbook(path):
+            # First occurrence wins for the handful of duplicated city rows.
+            rates.setdefault(key, rate)
+        return cls(rates, mtime)
+
+    def __len__(self):
+        return len(self.rates)
+
+    def items(self):
+        """Yield (key, rate) pairs in key order."""
+        for key in sorted(self.rates):
+            yield key, self.rates[key]
+
+    def __contains__(self, location):
+        return self.get(location) is not None
+
+    def get(self, location):
+        """Return the rate percent (Decimal) for a location, or None."""
+        key = normalize_location(location)
+        if key is None:
+            return None
+        return self.rates.get(key)
+
+
+class SnapshotRateIndex:
+    """
+    Read-only index over a compiled snapshot file, memory-mapped so every
+    worker on the box shares the same page-cached copy.
+
+    Layout (native byte order for the arrays):
+        header   magic, workbook mtime, row count
+        offsets  uint32[count + 1]  byte offsets of each key in the key blob
+        rates    int32[count]       rate in hundredths of a percent
+        keys     UTF-8 keys, sorted, concatenated
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.mtime, count = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an assessment-rate snapshot")
+
+        view = memoryview(self._map)
+        start = SNAPSHOT_HEADER.size
+        end = start + 4 * (count + 1)
+        self._offsets = view[start:end].cast('I')
+        start, end = end, end + 4 * count
+        self._rates = view[start:end].cast('i')
+        self._keys = view[end:]
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def key_at(self, i):
+        return bytes(self._keys[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+    def rate_at(self, i):
+        return Decimal(self._rates[i]).scaleb(-2)
+
+    def items(self):
+        """Yield (key, rate) pairs in key order."""
+        for i in range(self._count):
+            yield self.key_at(i), self.rate_at(i)
+
+    def __contains__(self, location):
+        return self.get(location) is not None
+
+    def lower_bound(self, key):
+        """
+        Position of the first key >= `key` (bisect_left), found with a binary
+        search straight over the mapped key blob.
+        """
+        target = key.encode('utf-8')
+        keys, offsets = self._keys, self._offsets
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(keys[offsets[mid]:offsets[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, location):
+        """Return the rate percent (Decimal) for a location, or None."""
+        key = normalize_location(location)
+        if key is None:
+            return None
+        i = self.lower_bound(key)
+        if i < self._count and self.key_at(i) == key:
+            return self.rate_at(i)
+        return None
+
+
+def write_snapshot(index, path):
+    """
+    Compile an index into the snapshot format. The file is written beside the
+    target and renamed into place so running workers keep their old mapping.
+    """
+    # Sort on the encoded bytes so the reader's byte-wise binary search agrees.
+    rows = sorted((key.encode('utf-8'), rate) for key, rate in index.items())
+    offsets = array('I', [0])
+    rates = array('i')
+    blob = bytearray()
+    for key, rate in rows:
+        blob += key
+        offsets.append(len(blob))
+        rates.append(int(rate.scaleb(2)))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, index.mtime or 0.0, len(rows)))
+        offsets.tofile(f)
+        rates.tofile(f)
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def load_index(path, snapshot_path):
+    """
+    Open the compiled snapshot when it matches the workbook, otherwise fall
+    back to parsing the workbook itself.
+    """
+    workbook_mtime = _mtime(path)
+    if _mtime(snapshot_path) is not None:
+        try:
+            snapshot = SnapshotRateIndex(snapshot_path)
+        except (OSError, ValueError, struct.error):
+            snapshot = None
+        if snapshot is not None and workbook_mtime in (None, snapshot.mtime):
+            return snapshot
+    if workbook_mtime is None:
+        return AssessmentRateIndex({})
+    return AssessmentRateIndex.from_workbook(path)
+
+
+_index = None
+_index_stamp = None
+_index_lock = threading.Lock()
+
+
+def get_index(path=None, snapshot_path=None):
+    """
+    Return the process-wide index, reloading it when the workbook or the
+    snapshot changes on disk. The first call loads it lazily.
+    """
+    global _index, _index_stamp
+    path = path or WORKBOOK_PATH
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    stamp = (path, _mtime(path), _mtime(snapshot_path))
+
+    index = _index
+    if index is not None and _index_stamp == stamp:
+        return index
+
+    with _index_lock:
+        if _index is None or _index_stamp != stamp:
+            _index = load_index(path, snapshot_path)
+            _index_stamp = stamp
+        return _index
+
+
+def lookup_rate(location):
+    """
+    Return the assessment reduction rate percent for "City, State", or None.
+    """
+    return get_index().get(location)
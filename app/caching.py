@@ -0,0 +1,157 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+
+# ——— Two-Tier Cache ———
+# LOCAL is the per-process LRU (settings.CACHES['default'], LocMemCache);
+# SHARED is the file-backed tier every worker on the box reads
+# (settings.CACHES['shared']). A lookup tries LOCAL, then SHARED, and only
+# then computes the value, filling both tiers on the way back.
+#
+# Entries live in a namespace. Keys carry the namespace's version, so
+# invalidate() drops a whole namespace in every worker at once by bumping
+# the version; the old entries simply age out. The versions are rows of
+# CacheVersion rather than cache entries: a cache may cull them, and its
+# incr() is a read-modify-write that loses concurrent bumps, either of which
+# can bring back a stale entry. The database increments atomically.
+#
+# Reading the row on every lookup would cost a query even for a LOCAL hit,
+# so each worker keeps the versions it has read for VERSION_TTL seconds:
+# another worker's bump reaches it within that long, its own at once.
+LOCAL = 'default'
+SHARED = 'shared'
+DEFAULT_TIMEOUT = 300
+VERSION_TTL = 5
+
+# Anything derived from ProcessedData / ProcessedData2 rows; bumped on every
+# save and delete, and after bulk imports and recalculations
+PROCESSED_DATA = 'processed_data'
+# Anything derived from the assessment-rate workbook
+LOCATIONS = 'locations'
+# Anything derived from CustomerData rows (app4.summary)
+CUSTOMER_DATA = 'customer_data'
+
+_MISSING = object()
+
+# {namespace: (version, monotonic time it was read)}
+_versions = {}
+
+
+def namespace_version(namespace):
+    """Current version of `namespace`, starting at 1, at most VERSION_TTL seconds old"""
+    from .models import CacheVersion
+
+    version, read_at = _versions.get(namespace, (None, None))
+    now = time.monotonic()
+    if read_at is not None and now - read_at < VERSION_TTL:
+        return version
+    version = CacheVersion.objects.filter(namespace=namespace).values_list('version', flat=True).first()
+    version = 1 if version is None else version
+    _versions[namespace] = (version, now)
+    return version
+
+
+def invalidate(namespace):
+    """
+    Drop every entry memoized under `namespace`, in all workers, once the
+    current transaction commits: bumped any earlier, another worker could
+    cache what it reads of the old rows under the new version.
+    """
+    transaction.on_commit(lambda: _bump_version(namespace))
+
+
+def _bump_version(namespace):
+    from .models import CacheVersion
+
+    # This worker sees its own bump on the next lookup
+    _versions.pop(namespace, None)
+    versions = CacheVersion.objects.filter(namespace=namespace)
+    if versions.update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            # Entries may be cached under the implied version 1
+            CacheVersion.objects.create(namespace=namespace, version=2)
+    except IntegrityError:
+        # Another worker created it first
+        versions.update(version=F('version') + 1)
+
+
+def cache_key(namespace, name, parts):
+    """A short key for `parts` (anything with a stable repr) under `name`"""
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"{namespace}:{namespace_version(namespace)}:{name}:{digest}"
+
+
+def get_or_compute(namespace, name, parts, compute, timeout=DEFAULT_TIMEOUT, shared=True):
+    """
+    Return the cached value for (name, parts), calling compute() on a miss.
+    With shared=False the value stays in this process (for results that are
+    cheap to recompute but used on every keystroke).
+    """
+    key = cache_key(namespace, name, parts)
+    local = caches[LOCAL]
+    value = local.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    if shared:
+        value = caches[SHARED].get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        if shared:
+            caches[SHARED].set(key, value, timeout)
+    local.set(key, value, timeout)
+    return value
+
+
+def memoize(namespace, timeout=DEFAULT_TIMEOUT, shared=True):
+    """
+    Decorator form of get_or_compute, keyed on the call's arguments:
+
+        @memoize(PROCESSED_DATA)
+        def entries_per_image(): ...
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                namespace, name, (args, sorted(kwargs.items())),
+                lambda: func(*args, **kwargs), timeout=timeout, shared=shared,
+            )
+        return wrapper
+    return decorator
+
+
+def processed_data_changed(sender, **kwargs):
+    """post_save / post_delete receiver for ProcessedData and ProcessedData2"""
+    invalidate(PROCESSED_DATA)
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Admin paginator whose COUNT(*) is memoized per filtered query until the
+    next change in `namespace`, so paging through a large changelist counts
+    the table once instead of on every page.
+    """
+    namespace = PROCESSED_DATA
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        try:
+            sql = query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        return get_or_compute(
+            self.namespace, 'changelist_count', (query.model._meta.label, sql),
+            self.object_list.count,
+        )
@@ -0,0 +1,139 @@
+from decimal import Decimal, InvalidOperation, getcontext
+
+from .assessment_rates import lookup_rate
+from .loan_engine import LoanInput, calculate_loan
+from .location_search import unknown_location_warning
+from .number_words import convert_alphanumeric_to_decimal
+from .references import process_reference
+
+# ——— Decimal Setup ———
+getcontext().prec = 30  # high precision to avoid intermediate rounding
+
+def format_with_commas(d: Decimal) -> str:
+    """
+    Format a Decimal with commas and exactly two decimal digits.
+    """
+    return f"{d:,.2f}"
+
+def format_location(text):
+    # Step 1: Strip and uppercase
+    text = text.strip().upper()
+
+    # Step 2: Split on comma
+    if ',' not in text:
+        return "Invalid format: no comma found"
+
+    left, right = text.split(',', 1)
+    left = left.strip()
+    right = right.strip()
+
+    # Step 3: Always add exactly one space before and after the comma
+    formatted = f"{left} , {right}"
+    return formatted
+
+def calculate_entry(data, original_amount=None, name_spacing='  '):
+    """
+    Run the full ProcessedData calculation chain over one form submission.
+
+    `data` is any mapping keyed by the home form's field names (request.POST,
+    a spreadsheet row, ...). `original_amount` is the purchase value when the
+    caller has already parsed input_text4. `name_spacing` replaces each space
+    in the customer and guarantor names: ProcessedData stores them
+    double-spaced, ProcessedData2 triple-spaced. Returns a dict of model
+    field values, everything except serial_number. Raises ValueError with an
+    operator-facing message when an input cannot be used.
+    """
+    # Get numerical inputs
+    try:
+        purchase_value_reduction = Decimal(data.get('purchase_value_reduction', '0'))
+
+        # Handle down payment to preserve exact format
+        down_payment_str = data.get('down_payment', '0')
+        down_payment = Decimal(down_payment_str)
+        # Store whether original had decimal points
+        has_decimal = '.' in down_payment_str
+
+        loan_period = int(data.get('loan_period', '0'))
+        annual_interest = Decimal(data.get('annual_interest', '0'))
+        monthly_principal_reduction = Decimal(data.get('monthly_principal_reduction', '0'))
+        total_interest_reduction = Decimal(data.get('total_interest_reduction', '0'))
+    except (ValueError, TypeError, InvalidOperation) as e:
+        raise ValueError(f"Invalid numerical input: {str(e)}")
+
+    # Process texts
+    user_input3 = data.get('input_text3', '')  # City, State
+    fields = {
+        'image_number': data.get('image_number', ''),
+        'username': data.get('username', '').strip(),
+        'customer_reference_number': process_reference(data.get('input_text_ref', '')),
+        'customer_name': data.get('input_text1', '').strip().upper().replace(' ', name_spacing),
+        'guarantor_name': data.get('input_text2', '').strip().upper().replace(' ', name_spacing),
+        'city_state': format_location(user_input3),
+        'guarantor_reference_number': process_reference(data.get('input_text_guarantor_ref', '')),
+    }
+
+    # 1. Purchase Value
+    if original_amount is None:
+        original_amount = convert_alphanumeric_to_decimal(data.get('input_text4', ''))
+
+    # 2. Property Tax rate: an empty or NA rate skips the calculation
+    try:
+        assessment_reduction_rate = (data.get('assessment_reduction_rate', '') or '').strip()
+
+        # Fill in the rate from the assessment workbook when left blank
+        if not assessment_reduction_rate:
+            workbook_rate = lookup_rate(user_input3)
+            if workbook_rate is not None:
+                assessment_reduction_rate = str(workbook_rate)
+
+        if not assessment_reduction_rate or assessment_reduction_rate.upper() == 'NA':
+            tax_rate = None
+        else:
+            assessment_reduction_rate = tax_rate = Decimal(assessment_reduction_rate)
+    except (ValueError, TypeError, InvalidOperation) as e:
+        raise ValueError(f"Invalid property tax calculation: {str(e)}")
+
+    # 3. Everything else is the shared loan engine
+    result = calculate_loan(LoanInput(
+        original_amount=original_amount,
+        purchase_value_reduction=purchase_value_reduction,
+        down_payment=down_payment,
+        loan_period=loan_period,
+        annual_interest=annual_interest,
+        monthly_principal_reduction=monthly_principal_reduction,
+        total_interest_reduction=total_interest_reduction,
+        assessment_reduction_rate=tax_rate,
+    ))
+
+    # Store the down payment value in its original format for display
+    down_payment_display = f"{down_payment:.2f}" if has_decimal else f"{int(down_payment)}"
+
+    fields.update({
+        'purchase_value_excel': result.purchase_value_excel,
+        'down_payment_percent': down_payment_display,
+        'loan_period_years': loan_period,
+        'annual_interest_rate': annual_interest,
+        'loan_amount': result.loan_amount,
+        'final_principal': result.final_principal,
+        'total_interest_for_period': result.total_interest_for_period,
+        'property_insurance_per_month': result.property_insurance_per_month,
+        'pmi_per_annum': result.pmi_per_annum,
+        'assessment_reduction_rate': assessment_reduction_rate,
+        'property_tax_per_annum': result.property_tax_per_annum,
+        'property_tax_for_period': result.property_tax_for_period,
+    })
+    return fields
+
+
+def prepare_entry(data, name_spacing='  '):
+    """
+    calculate_entry for the data-entry views, plus the warning to show when
+    the rate was left blank and City, State has no workbook row (or None).
+    Both read the workbook index, which loads or reloads from disk, so the
+    async views run this in a worker thread.
+    """
+    fields = calculate_entry(data, name_spacing=name_spacing)
+    warning = None
+    if not fields['assessment_reduction_rate']:
+        warning = unknown_location_warning(data.get('input_text3', ''))
+    return fields, warning
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from django.db import router
+
+from .caching import PROCESSED_DATA, invalidate
+from .formatting import DISPLAY_COLUMNS, DISPLAY_SOURCE_COLUMNS, display_columns
+from .loan_batch import RecalculationResult, update_rows
+
+# ——— Display Column Backfill ———
+# Rebuilds the stored display strings (app.formatting.DISPLAY_COLUMNS) of a
+# ProcessedData-shaped model: after the columns are added, and for rows
+# written without save(), e.g. by a raw UPDATE or a hand-run SQL fix.
+
+DEFAULT_CHUNK_SIZE = 10000
+
+FETCH_COLUMNS = ('pk', *DISPLAY_SOURCE_COLUMNS, *DISPLAY_COLUMNS)
+
+
+class DisplayBackfill:
+    """
+    Walk the table in primary-key order, `chunk_size` rows at a time, and
+    write back the display strings of the rows whose stored ones differ.
+    """
+
+    def __init__(self, model, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+
+    def run(self):
+        result = RecalculationResult()
+        last_pk = None
+        while True:
+            rows = self.model.objects.order_by('pk')
+            if last_pk is not None:
+                rows = rows.filter(pk__gt=last_pk)
+            chunk = list(rows.values_list(*FETCH_COLUMNS)[:self.chunk_size])
+            if not chunk:
+                return result
+            self._backfill_chunk(chunk, result)
+            last_pk = chunk[-1][0]
+
+    def _backfill_chunk(self, chunk, result):
+        changed = {}
+        for row in chunk:
+            values = display_columns(dict(zip(FETCH_COLUMNS, row)))
+            if any(values[column] != current for column, current in zip(DISPLAY_COLUMNS, row[-len(DISPLAY_COLUMNS):])):
+                changed[row[0]] = values
+
+        result.checked += len(chunk)
+        if changed and not self.dry_run:
+            update_rows(self.model, DISPLAY_COLUMNS, changed, using=router.db_for_write(self.model))
+        result.updated += len(changed)
+
+
+def backfill_display_columns(model, **options):
+    """Rebuild the stored display strings of `model`; returns a RecalculationResult."""
+    started = datetime.now()
+    result = DisplayBackfill(model, **options).run()
+    # Raw UPDATEs send no post_save
+    if result.updated and not options.get('dry_run'):
+        invalidate(PROCESSED_DATA)
+    result.elapsed = datetime.now() - started
+    return result
@@ -0,0 +1,268 @@
+import os
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ExportJob
+
+# Finished files land here; the worker and the web processes must share it
+EXPORT_ROOT = getattr(settings, 'EXPORT_ROOT', os.path.join(settings.BASE_DIR, 'exports'))
+
+# How often (in rows) the worker writes progress and a heartbeat to the job row
+PROGRESS_EVERY = 2000
+# A running job with no heartbeat for this long has lost its worker
+STALE_AFTER = timedelta(minutes=10)
+# Claims of one job before it is failed rather than claimed again
+MAX_ATTEMPTS = 3
+
+# exporter key → (headers, row generator, file format, filename prefix, sheet name, column widths)
+EXPORTERS = {
+    'processed_data_xlsx': (
+        'app.exports.PROCESSED_DATA_HEADERS', 'app.exports.processed_data_rows',
+        'xlsx', 'processed_data', 'Processed Data', None,
+    ),
+    'processed_data2_xlsx': (
+        'app.exports.PROCESSED_DATA_HEADERS', 'app.exports.processed_data_rows',
+        'xlsx', 'processed_data2', 'Processed Data', None,
+    ),
+    'customer_data_xlsx': (
+        'app4.exports.CUSTOMER_DATA_HEADERS', 'app4.exports.customer_data_rows',
+        'xlsx', 'customer_data_export', 'Customer Data', 'app4.exports.CUSTOMER_DATA_COLUMN_WIDTHS',
+    ),
+    'customer_data_csv': (
+        'app4.exports.CUSTOMER_DATA_HEADERS', 'app4.exports.customer_data_rows',
+        'csv', 'customer_data_export', None, None,
+    ),
+}
+
+CONTENT_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+}
+
+
+def make_selection(model, params=None, pks=None):
+    """
+    What a job stores to find its rows again, as JSON: the model, the
+    changelist parameters (filters, search, sort) the rows were chosen
+    under, and the primary keys of the ticked rows, or None for every row
+    the changelist shows.
+    """
+    return {
+        'model': model._meta.label_lower,
+        'params': params or {},
+        'pks': None if pks is None else list(pks),
+    }
+
+
+def admin_selection(request, queryset):
+    """The selection of an admin action: its changelist's rows, or just the ticked ones"""
+    select_across = request.POST.get('select_across') == '1'
+    params = {key: request.GET.getlist(key) for key in request.GET}
+    pks = None if select_across else queryset.values_list('pk', flat=True)
+    return make_selection(queryset.model, params, pks)
+
+
+def enqueue_export(exporter, selection, user=None):
+    """
+    Queue an export of `selection` (see make_selection) and return the
+    ExportJob. Only the selection is stored, so queuing a whole filtered
+    changelist costs the same for ten rows or a million.
+    """
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown exporter '{exporter}'")
+    return ExportJob.objects.create(
+        exporter=exporter,
+        selection=selection,
+        requested_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+class UnreadableSelection(Exception):
+    """A job's saved selection no longer finds its rows, e.g. after a model or admin change"""
+
+
+def _unreadable(job, problem):
+    return UnreadableSelection(
+        f"The selection saved with export {job.pk} can no longer be read ({problem}). Queue the export again."
+    )
+
+
+def job_model(job):
+    """The model a job exports; UnreadableSelection if it is gone"""
+    try:
+        return apps.get_model(job.selection['model'])
+    except (KeyError, LookupError, TypeError, ValueError) as e:
+        raise _unreadable(job, f"{type(e).__name__}: {e}") from e
+
+
+def job_queryset(job):
+    """
+    Rebuild the rows a job was queued with: the model admin's changelist
+    for the saved parameters, as the user who queued it saw it, narrowed to
+    the ticked rows. UnreadableSelection if that is no longer possible.
+    """
+    from django.contrib import admin
+    from django.contrib.admin.options import IncorrectLookupParameters
+    from django.core.exceptions import FieldError, ValidationError
+    from django.http import HttpRequest, QueryDict
+
+    model = job_model(job)
+    params, pks = job.selection.get('params') or {}, job.selection.get('pks')
+    model_admin = admin.site._registry.get(model)
+    if job.requested_by is None or model_admin is None:
+        if params and pks is None:
+            raise _unreadable(job, "the user or admin it was filtered in no longer exists")
+        queryset = model._default_manager.all()
+        return queryset if pks is None else queryset.filter(pk__in=pks)
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(mutable=True)
+    for key, values in params.items():
+        request.GET.setlist(key, values)
+    request.user = job.requested_by
+    try:
+        queryset = model_admin.get_changelist_instance(request).queryset
+    except (IncorrectLookupParameters, FieldError, ValidationError, ValueError) as e:
+        raise _unreadable(job, f"{type(e).__name__}: {e}") from e
+    return queryset if pks is None else queryset.filter(pk__in=pks)
+
+
+def fail_job(job, message):
+    """Mark a job failed with `message`, which its progress page shows"""
+    job.status = ExportJob.FAILED
+    job.error = message
+    job.finished_at = timezone.now()
+    ExportJob.objects.filter(pk=job.pk).update(status=job.status, error=job.error, finished_at=job.finished_at)
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest pending job to running and return it, or None.
+    The conditional UPDATE means two workers can never claim the same job.
+
+    A running job whose heartbeat is older than STALE_AFTER lost its worker
+    (killed, crashed, out of memory) and is claimed again like a pending
+    one, until it has been tried MAX_ATTEMPTS times; then it is failed.
+    """
+    now = timezone.now()
+    stale = Q(status=ExportJob.RUNNING, heartbeat_at__lt=now - STALE_AFTER)
+    ExportJob.objects.filter(stale, attempts__gte=MAX_ATTEMPTS).update(
+        status=ExportJob.FAILED, finished_at=now,
+        error=f"The export stopped responding {MAX_ATTEMPTS} times; its worker was probably killed. Queue it again.",
+    )
+    candidates = ExportJob.objects.filter(Q(status=ExportJob.PENDING) | stale).order_by('created_at')
+    for job_id, status, heartbeat_at in candidates.values_list('pk', 'status', 'heartbeat_at')[:10]:
+        claimed = ExportJob.objects.filter(pk=job_id, status=status, heartbeat_at=heartbeat_at).update(
+            status=ExportJob.RUNNING, started_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1, total_rows=0, processed_rows=0,
+        )
+        if claimed:
+            return ExportJob.objects.get(pk=job_id)
+    return None
+
+
+class JobReclaimed(Exception):
+    """Another worker claimed the job after this one's heartbeat went stale"""
+
+
+def _owned(job):
+    """The job's row, as long as this worker's claim (its started_at) still holds"""
+    return ExportJob.objects.filter(pk=job.pk, started_at=job.started_at)
+
+
+def _heartbeat(job, **fields):
+    if not _owned(job).update(heartbeat_at=timezone.now(), **fields):
+        raise JobReclaimed(f"Export {job.pk} was claimed by another worker; this run was abandoned.")
+
+
+def _track_progress(job, rows):
+    """Pass rows through, recording the running count (and a heartbeat) on the job"""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            _heartbeat(job, processed_rows=count)
+
+
+def run_job(job):
+    """Write the export file for a claimed job and mark it done or failed"""
+    from .exports import write_csv, write_xlsx
+
+    headers, rows_func, file_format, prefix, sheet_name, widths = EXPORTERS[job.exporter]
+    try:
+        queryset = job_queryset(job)
+        job.total_rows = queryset.count()
+        _heartbeat(job, total_rows=job.total_rows)
+
+        os.makedirs(EXPORT_ROOT, exist_ok=True)
+        job.filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+        job.file_path = os.path.join(EXPORT_ROOT, f"{job.pk}_{job.filename}")
+
+        rows = _track_progress(job, import_string(rows_func)(queryset))
+        if file_format == 'xlsx':
+            with open(job.file_path, 'wb') as f:
+                job.processed_rows = write_xlsx(
+                    f, import_string(headers), rows, sheet_name,
+                    column_widths=import_string(widths) if widths else None,
+                )
+        else:
+            with open(job.file_path, 'w', newline='', encoding='utf-8') as f:
+                job.processed_rows = write_csv(f, import_string(headers), rows)
+
+        job.status = ExportJob.DONE
+    except JobReclaimed as e:
+        # The other worker writes its own file and the job's outcome
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.error = str(e)
+        return job
+    except UnreadableSelection as e:
+        job.status = ExportJob.FAILED
+        job.error = str(e)
+    except Exception:
+        job.status = ExportJob.FAILED
+        job.error = traceback.format_exc()
+
+    job.finished_at = timezone.now()
+    _owned(job).update(**{
+        field: getattr(job, field)
+        for field in ('status', 'total_rows', 'processed_rows', 'filename', 'file_path', 'error', 'finished_at')
+    })
+    return job
+
+
+def work(once=False, poll_interval=2.0):
+    """Process queued jobs; with once=True stop when the queue is empty"""
+    while True:
+        # Long-running worker: drop connections the server may have timed out
+        close_old_connections()
+        job = claim_next_job()
+        if job is not None:
+            yield run_job(job)
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+def queue_export(request, exporter, queryset):
+    """
+    Admin action body: queue the export and send the user to its progress
+    page instead of building the file inside the request.
+    """
+    from django.contrib import messages
+    from django.shortcuts import redirect
+
+    job = enqueue_export(exporter, admin_selection(request, queryset), request.user)
+    messages.info(request, f"Export {job.pk} queued. The download link appears here when it is ready.")
+    return redirect('admin:app_exportjob_progress', job.pk)
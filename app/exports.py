@@ -0,0 +1,87 @@
+import csv
+from datetime import datetime
+
+# Rows fetched per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+PROCESSED_DATA_HEADERS = [
+    'Image Number',
+    'Serial Number',
+    'Username',
+    'Customer Reference Number',
+    'Customer Name',
+    'City, State',
+    'Purchase Value and Down Payment',
+    'Loan Period and Annual Interest',
+    'Guarantor Name',
+    'Guarantor Reference Number',
+    'Loan Amount and Principal',
+    'Total Interest for Loan Period and Property Tax for Loan Period',
+    'Property Insurance per Month and PMI per Annum'
+]
+
+# The export columns, display strings included, fetched as tuples
+PROCESSED_DATA_COLUMNS = (
+    'image_number', 'serial_number', 'username', 'customer_reference_number',
+    'customer_name', 'city_state', 'purchase_value_and_down_payment',
+    'loan_period_and_interest', 'guarantor_name', 'guarantor_reference_number',
+    'loan_amount_and_principal', 'interest_and_property_tax', 'insurance_and_pmi',
+)
+GUARANTOR_REFERENCE = PROCESSED_DATA_COLUMNS.index('guarantor_reference_number')
+
+
+def processed_data_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield export rows for a ProcessedData (or ProcessedData2) queryset. The
+    composite columns are the display strings stored at save time, so rows
+    stream straight from the database without building model instances.
+    """
+    rows = queryset.values_list(*PROCESSED_DATA_COLUMNS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row = list(row)
+        row[GUARANTOR_REFERENCE] = row[GUARANTOR_REFERENCE] or ''
+        yield row
+
+
+def write_xlsx(fileobj, headers, rows, sheet_name='Processed Data', column_widths=None):
+    """
+    Write rows to an .xlsx file in xlsxwriter's constant_memory mode, which
+    flushes each row to disk as soon as the next one starts. Memory stays
+    flat however many rows are written. Returns the number of data rows.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True, 'remove_timezone': True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm'})
+
+    for col_num, width in enumerate(column_widths or []):
+        worksheet.set_column(col_num, col_num, width)
+    for col_num, header in enumerate(headers):
+        worksheet.write_string(0, col_num, header, header_format)
+
+    row_num = 0
+    for row_num, row in enumerate(rows, start=1):
+        for col_num, cell_value in enumerate(row):
+            if isinstance(cell_value, datetime):
+                worksheet.write_datetime(row_num, col_num, cell_value, date_format)
+            else:
+                worksheet.write_string(row_num, col_num, '' if cell_value is None else str(cell_value))
+
+    workbook.close()
+    return row_num
+
+
+def write_csv(fileobj, headers, rows):
+    """Write rows to a text file as CSV. Returns the number of data rows."""
+    writer = csv.writer(fileobj)
+    writer.writerow(headers)
+    row_num = 0
+    for row_num, row in enumerate(rows, start=1):
+        writer.writerow([
+            cell_value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(cell_value, datetime) else cell_value
+            for cell_value in row
+        ])
+    return row_num
+
@@ -0,0 +1,73 @@
+from decimal import Decimal, InvalidOperation
+
+# ——— Currency Formatting ———
+# Amounts are shown as "$  1  ,  234  ,  567.89": two spaces after the dollar
+# sign and around each thousands separator.
+THOUSANDS_SEPARATOR = "  ,  "
+
+
+def format_number_with_commas(value):
+    """Format a number according to the specified rules"""
+    if value is None:
+        return "NA"
+    return "$  " + format(value, ',.2f').replace(',', THOUSANDS_SEPARATOR)
+
+
+def format_property_tax(assessment_reduction_rate, property_tax_for_period):
+    """Property tax for the loan period, or NA when the row pays none"""
+    # The rate is a Decimal on a row that has not been saved yet
+    rate = '' if assessment_reduction_rate is None else str(assessment_reduction_rate)
+    if not rate or rate.upper() == 'NA':
+        return "NA"
+    return format_number_with_commas(property_tax_for_period)
+
+
+def format_pmi(down_payment_percent, pmi_per_annum):
+    """PMI per annum, or NA for a loan of 80% or less (or an unreadable down payment)"""
+    try:
+        loan_percent = Decimal('100') - Decimal(down_payment_percent)
+    except (InvalidOperation, TypeError, ValueError):
+        return "NA"
+    if loan_percent <= 80:
+        return "NA"
+    return format_number_with_commas(pmi_per_annum)
+
+
+# ——— Display Columns ———
+# The composite strings the admin list and the exports show. ProcessedData
+# and ProcessedData2 store them at save time; `backfill_display_columns`
+# fills them in for rows written some other way.
+DISPLAY_SOURCE_COLUMNS = (
+    'purchase_value_excel', 'down_payment_percent', 'loan_period_years',
+    'annual_interest_rate', 'loan_amount', 'final_principal',
+    'total_interest_for_period', 'assessment_reduction_rate', 'property_tax_for_period',
+    'property_insurance_per_month', 'pmi_per_annum',
+)
+DISPLAY_COLUMNS = (
+    'purchase_value_and_down_payment', 'loan_period_and_interest',
+    'loan_amount_and_principal', 'interest_and_property_tax',
+    'insurance_and_pmi', 'formatted_property_tax',
+)
+
+
+def display_columns(values):
+    """
+    DISPLAY_COLUMNS for one row, from a mapping of its DISPLAY_SOURCE_COLUMNS.
+    The interest rate is shown with the two decimals the column stores, so a
+    row reads the same before and after it goes through the database.
+    """
+    formatted_property_tax = format_property_tax(values['assessment_reduction_rate'], values['property_tax_for_period'])
+    return {
+        'purchase_value_and_down_payment':
+            f"{format_number_with_commas(values['purchase_value_excel'])} AND {values['down_payment_percent']} %",
+        'loan_period_and_interest':
+            f"{values['loan_period_years']} YEARS AND {Decimal(values['annual_interest_rate']):.2f} %",
+        'loan_amount_and_principal':
+            f"{format_number_with_commas(values['loan_amount'])} AND {format_number_with_commas(values['final_principal'])}",
+        'interest_and_property_tax':
+            f"{format_number_with_commas(values['total_interest_for_period'])} AND {formatted_property_tax}",
+        'insurance_and_pmi':
+            f"{format_number_with_commas(values['property_insurance_per_month'])} AND "
+            f"{format_pmi(values['down_payment_percent'], values['pmi_per_annum'])}",
+        'formatted_property_tax': formatted_property_tax,
+    }
@@ -0,0 +1,234 @@
+import re
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, migrations
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.text import smart_split, unescape_string_literal
+
+# ——— Full-Text Search for Admin Changelists ———
+# The stock admin search ORs an ILIKE '%term%' per search field for every
+# term, which no B-tree index can serve, so each search scans the table.
+# Here the search fields share one full-text index instead: a FULLTEXT index
+# on MySQL, or an FTS5 table kept in sync by triggers on SQLite for local
+# runs. Every word of the search must start a word in one of the fields.
+# Anything the index cannot answer (another database, an index that is not
+# there, words MySQL does not index) goes to the stock search.
+#
+# The index is only ever created or changed by `migrate`: by the migration
+# that adds it, and on SQLite by restore_fulltext_triggers after every run,
+# since a migration that rebuilds the table (most AlterFields) drops the
+# triggers with it. A request only checks whether the index is there.
+
+WORD_RE = re.compile(r'\w+')
+
+# innodb_ft_min_token_size: shorter words are not in a MySQL FULLTEXT index,
+# and neither are InnoDB's default stopwords
+MYSQL_MIN_TOKEN_SIZE = 3
+MYSQL_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or "
+    "that the this to was what when where who will with und www".split()
+)
+
+
+def search_words(search_term):
+    """The words of an admin search, split the way the stock search splits terms"""
+    words = []
+    for bit in smart_split(search_term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        words.extend(WORD_RE.findall(bit))
+    return words
+
+
+class FullTextIndex:
+    """
+    One full-text index over `columns` of `table`. Migrations create it
+    with operation(); admin searches go through filter().
+    """
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = tuple(columns)
+        self._available = {}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return f"{self.table}_fts"
+
+    # ——— Schema ———
+
+    def operation(self):
+        """A migration operation creating the index (a no-op on other databases)"""
+        def forwards(apps, schema_editor):
+            self.create(schema_editor.connection)
+
+        def backwards(apps, schema_editor):
+            self.drop(schema_editor.connection)
+
+        return migrations.RunPython(forwards, backwards)
+
+    def create(self, connection):
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(column) for column in self.columns)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(f"CREATE FULLTEXT INDEX {quote(self.name)} ON {quote(self.table)} ({columns})")
+            elif connection.vendor == 'sqlite':
+                self._create_fts5(cursor, quote)
+
+    def drop(self, connection):
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(f"DROP INDEX {quote(self.name)} ON {quote(self.table)}")
+            elif connection.vendor == 'sqlite':
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {quote(f'{self.name}_{suffix}')}")
+                cursor.execute(f"DROP TABLE IF EXISTS {quote(self.name)}")
+
+    def _create_fts5(self, cursor, quote):
+        """
+        An external-content FTS5 table over the rows, plus insert/update/
+        delete triggers to keep it in step, filled from the current rows.
+        """
+        fts, table = quote(self.name), quote(self.table)
+        columns = ", ".join(quote(column) for column in self.columns)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, "
+            f"content={table}, content_rowid='id')"
+        )
+        self._create_triggers(cursor, quote)
+
+    def _create_triggers(self, cursor, quote):
+        """The sync triggers, then the FTS5 table refilled from the current rows"""
+        fts, table = quote(self.name), quote(self.table)
+        columns = ", ".join(quote(column) for column in self.columns)
+        new = ", ".join(f"new.{quote(column)}" for column in self.columns)
+        old = ", ".join(f"old.{quote(column)}" for column in self.columns)
+        insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new});"
+        delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {quote(self.name + '_ai')} AFTER INSERT ON {table} BEGIN {insert} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {quote(self.name + '_ad')} AFTER DELETE ON {table} BEGIN {delete} END")
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {quote(self.name + '_au')} AFTER UPDATE OF {columns} ON {table} "
+            f"BEGIN {delete} {insert} END"
+        )
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    @property
+    def _trigger_names(self):
+        return {f'{self.name}_ai', f'{self.name}_ad', f'{self.name}_au'}
+
+    def _sqlite_objects(self, cursor):
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [self.name, *sorted(self._trigger_names)],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    def _sqlite_ready(self, connection):
+        """Whether the FTS5 table is there, over these columns, with its triggers"""
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            if self._sqlite_objects(cursor) != {self.name, *self._trigger_names}:
+                return False
+            cursor.execute(f"SELECT * FROM {quote(self.name)} LIMIT 0")
+            return tuple(column[0] for column in cursor.description) == self.columns
+
+    def restore_triggers(self, connection):
+        """
+        On SQLite, put back the triggers of an FTS5 table that a table
+        rebuild dropped, and refill it. Returns whether anything was done;
+        an index that was never created is left to its migration.
+        """
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            present = self._sqlite_objects(cursor)
+            if self.name not in present or self._trigger_names <= present:
+                return False
+            self._create_triggers(cursor, connection.ops.quote_name)
+        return True
+
+    def _mysql_ready(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+                [self.table, self.name],
+            )
+            return {row[0] for row in cursor.fetchall()} == set(self.columns)
+
+    def available(self, using='default'):
+        """Whether `using` can answer searches from this index; checked once per process"""
+        with self._lock:
+            if using not in self._available:
+                connection = connections[using]
+                try:
+                    if connection.vendor == 'mysql':
+                        ready = self._mysql_ready(connection)
+                    elif connection.vendor == 'sqlite':
+                        ready = self._sqlite_ready(connection)
+                    else:
+                        ready = False
+                except DatabaseError:
+                    # e.g. SQLite built without FTS5
+                    ready = False
+                self._available[using] = ready
+            return self._available[using]
+
+    # ——— Queries ———
+
+    def filter(self, queryset, words):
+        """
+        `queryset` narrowed to rows where every word starts a word in one of
+        the columns, or None when the index cannot answer the search.
+        """
+        connection = connections[queryset.db]
+        if not words or not self.available(queryset.db):
+            return None
+        quote = connection.ops.quote_name
+        if connection.vendor == 'mysql':
+            if any(len(word) < MYSQL_MIN_TOKEN_SIZE or word.lower() in MYSQL_STOPWORDS for word in words):
+                return None
+            columns = ", ".join(f"{quote(self.table)}.{quote(column)}" for column in self.columns)
+            match = RawSQL(
+                f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)",
+                [" ".join(f"+{word}*" for word in words)],
+                output_field=FloatField(),
+            )
+            return queryset.alias(fulltext_match=match).filter(fulltext_match__gt=0)
+        fts = quote(self.name)
+        match = RawSQL(
+            f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s",
+            [" ".join(f'"{word}"*' for word in words)],
+        )
+        return queryset.filter(pk__in=match)
+
+
+def restore_fulltext_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate receiver: restore_triggers() for the full-text index of every model admin"""
+    from django.contrib import admin
+
+    connection = connections[using]
+    for model_admin in admin.site._registry.values():
+        index = getattr(model_admin, 'fulltext_index', None)
+        if index is not None:
+            index.restore_triggers(connection)
+
+
+class FullTextSearchMixin:
+    """
+    ModelAdmin mixin answering the changelist search from `fulltext_index`,
+    a FullTextIndex over the admin's search_fields.
+    """
+    fulltext_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if self.fulltext_index is not None and search_term:
+            results = self.fulltext_index.filter(queryset, search_words(search_term))
+            if results is not None:
+                return results, False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,223 @@
+import csv
+import io
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import transaction
+
+from .caching import PROCESSED_DATA, invalidate
+from .calculations import calculate_entry
+from .models import ProcessedData
+from .number_words import parse_many
+from .serials import allocate_serial_numbers, ensure_counter
+
+# Spreadsheet headers are matched case-insensitively against the home form's
+# field names and the labels operators see on the form.
+HEADER_ALIASES = {
+    'image number': 'image_number',
+    'username': 'username',
+    'customer reference number': 'input_text_ref',
+    'customer name': 'input_text1',
+    'guarantor name': 'input_text2',
+    'city, state': 'input_text3',
+    'city state': 'input_text3',
+    'purchase value': 'input_text4',
+    'purchase value reduction %': 'purchase_value_reduction',
+    'down payment %': 'down_payment',
+    'loan period (years)': 'loan_period',
+    'loan period': 'loan_period',
+    'annual interest rate %': 'annual_interest',
+    'monthly principal reduction %': 'monthly_principal_reduction',
+    'total interest reduction %': 'total_interest_reduction',
+    'guarantor reference number': 'input_text_guarantor_ref',
+    'assessment reduction rate %': 'assessment_reduction_rate',
+}
+FORM_FIELDS = set(HEADER_ALIASES.values())
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def normalize_header(header):
+    """Map a spreadsheet header onto a home form field name, or None."""
+    name = str(header or '').strip()
+    if name in FORM_FIELDS:
+        return name
+    return HEADER_ALIASES.get(' '.join(name.lower().split()))
+
+
+def cell_to_text(value):
+    """
+    Render a cell the way the operator would have typed it into the form.
+    Whole-number floats lose their ".0" so int() still accepts loan periods.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _rows_from_header(rows):
+    rows = iter(rows)
+    try:
+        header = next(rows)
+    except StopIteration:
+        return
+    fields = [normalize_header(h) for h in header]
+    if 'image_number' not in fields or 'input_text_ref' not in fields:
+        raise ValueError("Spreadsheet needs at least Image Number and Customer Reference Number columns.")
+
+    for values in rows:
+        if values is None or all(v in (None, '') for v in values):
+            continue
+        yield {
+            field: cell_to_text(value)
+            for field, value in zip(fields, values)
+            if field is not None
+        }
+
+
+def read_rows(source, filename=None):
+    """
+    Stream form-shaped dicts from a .xlsx or .csv file.
+
+    `source` is a path or a binary file object (e.g. an uploaded file); the
+    extension of `filename` (or the path) picks the reader.
+    """
+    name = filename or (source if isinstance(source, str) else getattr(source, 'name', ''))
+    extension = os.path.splitext(name)[1].lower()
+
+    if extension == '.csv':
+        if isinstance(source, str):
+            with open(source, newline='', encoding='utf-8-sig') as f:
+                yield from _rows_from_header(csv.reader(f))
+        else:
+            text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+            try:
+                yield from _rows_from_header(csv.reader(text))
+            finally:
+                text.detach()
+    elif extension in ('.xlsx', '.xlsm'):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            yield from _rows_from_header(workbook.worksheets[0].iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported file type '{extension}'; upload a .xlsx or .csv file.")
+
+
+class ImportResult:
+    """Counts and per-row errors from one import run."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # (spreadsheet row number, message)
+        self.elapsed = None
+
+    def __str__(self):
+        return f"{self.created} rows imported, {len(self.errors)} rows skipped"
+
+
+class ProcessedDataImporter:
+    """
+    Bulk import path for ProcessedData.
+
+    Each row goes through the same calculate_entry chain as the home form.
+    For each image in a chunk, a block of serial numbers is reserved from the
+    shared counter (app.serials) with one UPDATE and handed out in memory.
+    Each chunk is written with a single bulk_create inside its own
+    transaction.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, default_username='', dry_run=False):
+        self.batch_size = batch_size
+        self.default_username = default_username
+        self.dry_run = dry_run
+        self.seen_refs = set()
+
+    def run(self, rows):
+        result = ImportResult()
+        chunk = []
+        # Row 1 is the header, so data starts on spreadsheet row 2
+        for row_number, row in enumerate(rows, start=2):
+            chunk.append((row_number, row))
+            if len(chunk) >= self.batch_size:
+                self._import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, result)
+        return result
+
+    def _assign_serials(self, objects):
+        """Reserve one block of serial numbers per image and number the rows."""
+        by_image = defaultdict(list)
+        for obj in objects:
+            by_image[obj.image_number].append(obj)
+        for image_number, image_objects in by_image.items():
+            first = allocate_serial_numbers(ProcessedData, image_number, count=len(image_objects))
+            for offset, obj in enumerate(image_objects):
+                obj.serial_number = first + offset
+
+    def _existing_refs(self, refs):
+        return set(
+            ProcessedData.objects.filter(customer_reference_number__in=refs)
+            .values_list('customer_reference_number', flat=True)
+        )
+
+    def _import_chunk(self, chunk, result):
+        # Parse the chunk's purchase values in one pass; repeats are parsed once
+        amounts = parse_many(row.get('input_text4', '') for _, row in chunk)
+
+        entries = []
+        for (row_number, row), original_amount in zip(chunk, amounts):
+            if not row.get('username') and self.default_username:
+                row['username'] = self.default_username
+            if not row.get('image_number'):
+                result.errors.append((row_number, "Image number is required!"))
+                continue
+            if not row.get('input_text_ref'):
+                result.errors.append((row_number, "Customer Reference Number is required!"))
+                continue
+            try:
+                entries.append((row_number, calculate_entry(row, original_amount)))
+            except Exception as e:
+                result.errors.append((row_number, str(e)))
+
+        existing = self._existing_refs({fields['customer_reference_number'] for _, fields in entries})
+
+        objects = []
+        for row_number, fields in entries:
+            ref = fields['customer_reference_number']
+            if ref in existing or ref in self.seen_refs:
+                result.errors.append((row_number, "This Customer Reference Number already exists!"))
+                continue
+            self.seen_refs.add(ref)
+            obj = ProcessedData(**fields)
+            # bulk_create skips save(), so fill in the display strings and
+            # reference keys here
+            obj.refresh_display_columns()
+            obj.refresh_reference_keys()
+            objects.append(obj)
+
+        if objects and not self.dry_run:
+            for image_number in {obj.image_number for obj in objects}:
+                ensure_counter(ProcessedData, image_number)
+            with transaction.atomic():
+                self._assign_serials(objects)
+                ProcessedData.objects.bulk_create(objects, batch_size=self.batch_size)
+        result.created += len(objects)
+
+
+def import_processed_data(source, filename=None, **options):
+    """Import a .xlsx/.csv file into ProcessedData; returns an ImportResult."""
+    started = datetime.now()
+    result = ProcessedDataImporter(**options).run(read_rows(source, filename))
+    # bulk_create sends no post_save
+    if result.created and not options.get('dry_run'):
+        invalidate(PROCESSED_DATA)
+    result.elapsed = datetime.now() - started
+    return result
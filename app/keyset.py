@@ -0,0 +1,203 @@
+from django.contrib.admin.views.main import ALL_VAR, ORDER_VAR, ChangeList
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# ——— Keyset Pagination for Admin Changelists ———
+# Stock changelists page with OFFSET, so page N reads and skips N x
+# list_per_page rows, and count the table on every page. Here a page link
+# carries the (timestamp, id) of the row it continues from instead, and the
+# next page is a range scan of list_per_page + 1 entries on the
+# (timestamp, id) index, whatever its depth.
+
+# Query-string parameters holding the cursor: show rows older than `after`
+# or newer than `before`
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+CURSOR_VARS = (AFTER_VAR, BEFORE_VAR)
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Row count from the database's table statistics, or None when there are
+    none. Constant time on any table size, but approximate: InnoDB samples
+    pages, SQLite only knows what the last ANALYZE saw.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    [table],
+                )
+            elif connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        # e.g. SQLite before the first ANALYZE has no sqlite_stat1
+        return None
+    if row is None or row[0] is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    return count if count >= 0 else None
+
+
+def encode_cursor(timestamp, pk):
+    return f"{timestamp.isoformat()},{pk}"
+
+
+def decode_cursor(value):
+    """(timestamp, pk) from a cursor parameter, or None if it is malformed"""
+    timestamp, _, pk = (value or '').rpartition(',')
+    try:
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if timestamp is None:
+        return None
+    return timestamp, pk
+
+
+class KeysetPage:
+    """What the pagination template needs to link around a keyset page."""
+
+    def __init__(self, estimated=False, first_url=None, previous_url=None, next_url=None, show_all_url=None):
+        self.estimated = estimated
+        self.first_url = first_url
+        self.previous_url = previous_url
+        self.next_url = next_url
+        self.show_all_url = show_all_url
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList that pages newest-first on the model admin's `keyset_field`
+    (a timestamp) with the primary key as tie-break, which is exactly the
+    default ordering ('-<keyset_field>', '-pk'). The model needs an index on
+    (keyset_field, id).
+
+    With no filter or search applied, totals come from table statistics
+    (estimated_row_count); otherwise from the model admin's paginator, which
+    should memoize its count (app.caching.CachedCountPaginator) so paging
+    does not count the filtered rows again on every page. A column sort, "Show all" and popups use the stock OFFSET
+    pages.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor_params = {var: request.GET[var] for var in CURSOR_VARS if var in request.GET}
+        self.keyset_page = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for var in CURSOR_VARS:
+            lookup_params.pop(var, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter, sort and search links start again from the newest rows
+        return super().get_query_string(new_params, [*(remove or []), *CURSOR_VARS])
+
+    def _keyset_applies(self, request):
+        field = getattr(self.model_admin, 'keyset_field', None)
+        if field is None or ORDER_VAR in self.params or self.show_all or self.is_popup:
+            return False
+        # The ordering the changelist applied, repeats dropped
+        return list(dict.fromkeys(self.queryset.query.order_by)) == [f'-{field}', '-pk']
+
+    def page_key_query(self, field, cursor_var=None, cursor=None):
+        """
+        The range scan for up to list_per_page + 1 (timestamp, pk) keys from
+        the cursor; pages before it come back oldest first.
+        """
+        queryset = self.queryset
+        if cursor_var == BEFORE_VAR:
+            timestamp, pk = cursor
+            newer = queryset.filter(Q(**{f'{field}__gte': timestamp}), Q(**{f'{field}__gt': timestamp}) | Q(pk__gt=pk))
+            return newer.order_by(field, 'pk').values_list(field, 'pk')[:self.list_per_page + 1]
+        if cursor_var == AFTER_VAR:
+            timestamp, pk = cursor
+            queryset = queryset.filter(Q(**{f'{field}__lte': timestamp}), Q(**{f'{field}__lt': timestamp}) | Q(pk__lt=pk))
+        return queryset.order_by(f'-{field}', '-pk').values_list(field, 'pk')[:self.list_per_page + 1]
+
+    def _page_keys(self, field, cursor_var, cursor):
+        """Up to list_per_page + 1 (timestamp, pk) keys in page order"""
+        keys = list(self.page_key_query(field, cursor_var, cursor))
+        return keys[::-1] if cursor_var == BEFORE_VAR else keys
+
+    def get_results(self, request):
+        if not self._keyset_applies(request):
+            return super().get_results(request)
+
+        field = self.model_admin.keyset_field
+        per_page = self.list_per_page
+
+        cursor_var, cursor = None, None
+        for var in CURSOR_VARS:
+            if var in self.cursor_params:
+                cursor_var, cursor = var, decode_cursor(self.cursor_params[var])
+                break
+        if cursor is None:
+            cursor_var = None
+
+        keys = self._page_keys(field, cursor_var, cursor)
+        if cursor_var == BEFORE_VAR:
+            has_previous, has_next = len(keys) > per_page, True
+            keys = keys[-per_page:] if has_previous else keys
+            if not has_previous:
+                # Back at the newest rows: show a full first page
+                cursor_var = None
+                keys = self._page_keys(field, None, None)
+        if cursor_var != BEFORE_VAR:
+            has_previous, has_next = cursor_var == AFTER_VAR, len(keys) > per_page
+            keys = keys[:per_page]
+
+        # Totals: table statistics unless a filter or search narrows the list
+        paginator = self.model_admin.get_paginator(request, self.queryset, per_page)
+        full_result_count = None
+        if self.model_admin.show_full_result_count:
+            full_result_count = estimated_row_count(self.model, self.queryset.db)
+        estimated = full_result_count is not None
+        if not self.queryset.query.where and estimated:
+            result_count = full_result_count
+        else:
+            result_count = paginator.count
+            estimated = False
+            if self.model_admin.show_full_result_count and full_result_count is None:
+                # Through the paginator too, so a memoizing one counts once
+                full_result_count = self.model_admin.get_paginator(request, self.root_queryset, per_page).count
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = self.queryset.filter(pk__in=[pk for timestamp, pk in keys])
+        self.can_show_all = result_count <= self.list_max_show_all
+        self.multi_page = has_previous or has_next
+        self.paginator = paginator
+        self.keyset_page = KeysetPage(
+            estimated=estimated,
+            first_url=self.get_query_string() if has_previous else None,
+            previous_url=self.get_query_string({BEFORE_VAR: encode_cursor(*keys[0])}) if has_previous else None,
+            next_url=self.get_query_string({AFTER_VAR: encode_cursor(*keys[-1])}) if has_next and keys else None,
+            show_all_url=self.get_query_string({ALL_VAR: ''}) if self.multi_page and self.can_show_all else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ModelAdmin mixin: set `keyset_field` to the timestamp the default
+    ordering sorts on, newest first, to use KeysetChangeList.
+    """
+    keyset_field = None
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,152 @@
+from bisect import bisect_left
+from decimal import Decimal, ROUND_DOWN
+from typing import NamedTuple, Optional
+
+# ——— Loan Calculation Engine ———
+# The one calculation chain behind app, app2 and app3. Everything here is a
+# pure function of its inputs: no database, no request, no workbook lookups.
+
+HUNDRED = Decimal('100')
+TWELVE = Decimal('12')
+CENT = Decimal('0.01')
+PROPERTY_TAX_RATE = Decimal('0.02')  # 2% fixed rate on the assessed value
+
+
+def truncate_two_decimals(d: Decimal) -> Decimal:
+    """
+    Truncate a Decimal to exactly two decimal places (ROUND_DOWN).
+    """
+    return d.quantize(CENT, rounding=ROUND_DOWN)
+
+
+class RateTable:
+    """
+    Rate bands keyed on loan percentage (100 - down payment %).
+
+    Each band is (upper bound, rate up to `period_cutoff` years, rate for
+    longer loans). A loan percentage falls in the first band whose upper
+    bound it does not exceed; anything above the last bound uses the last
+    band. Lookups are a bisect over the bounds instead of an if/elif chain.
+    """
+
+    def __init__(self, bands, period_cutoff):
+        self.bounds = [upper for upper, short_rate, long_rate in bands]
+        self.rates = [(short_rate, long_rate) for upper, short_rate, long_rate in bands]
+        self.period_cutoff = period_cutoff
+
+    def lookup(self, loan_percentage, loan_period):
+        index = min(bisect_left(self.bounds, loan_percentage), len(self.rates) - 1)
+        short_rate, long_rate = self.rates[index]
+        return short_rate if loan_period <= self.period_cutoff else long_rate
+
+
+PROPERTY_INSURANCE_RATES = RateTable([
+    (Decimal('84.99'), Decimal('0.32'), Decimal('0.32')),
+    (Decimal('85'), Decimal('0.21'), Decimal('0.32')),
+    (Decimal('90'), Decimal('0.41'), Decimal('0.52')),
+    (Decimal('95'), Decimal('0.67'), Decimal('0.78')),
+    (HUNDRED, Decimal('0.85'), Decimal('0.96')),
+], period_cutoff=25)
+
+PMI_RATES = RateTable([
+    (Decimal('80'), None, None),  # no PMI at 80% or less
+    (Decimal('85'), Decimal('0.19'), Decimal('0.32')),
+    (Decimal('90'), Decimal('0.23'), Decimal('0.52')),
+    (Decimal('95'), Decimal('0.26'), Decimal('0.78')),
+    (HUNDRED, Decimal('0.79'), Decimal('0.90')),
+], period_cutoff=20)
+
+
+class LoanInput(NamedTuple):
+    """The numeric side of one form submission, already parsed."""
+    original_amount: Decimal
+    purchase_value_reduction: Decimal
+    down_payment: Decimal
+    loan_period: int
+    annual_interest: Decimal
+    monthly_principal_reduction: Decimal
+    total_interest_reduction: Decimal
+    assessment_reduction_rate: Optional[Decimal] = None  # None skips property tax
+
+
+class LoanResult(NamedTuple):
+    purchase_value_excel: Decimal
+    loan_amount: Decimal
+    final_principal: Decimal
+    total_interest_for_period: Decimal
+    property_insurance_rate: Decimal
+    property_insurance_per_month: Decimal
+    pmi_rate: Optional[Decimal]
+    pmi_per_annum: Optional[Decimal]
+    property_tax_per_annum: Optional[Decimal]
+    property_tax_for_period: Optional[Decimal]
+
+
+def property_insurance_rate(loan_percentage, loan_period):
+    """Property insurance rate (% per annum) for a loan percentage and period"""
+    return PROPERTY_INSURANCE_RATES.lookup(loan_percentage, loan_period)
+
+
+def pmi_rate(loan_percentage, loan_period):
+    """PMI rate (% per annum), or None when the loan needs no PMI"""
+    return PMI_RATES.lookup(loan_percentage, loan_period)
+
+
+def calculate_loan(loan: LoanInput) -> LoanResult:
+    """
+    Run the calculation chain. Every intermediate amount is truncated to
+    cents, in the order the operators' spreadsheet does it.
+    """
+    loan_period = Decimal(loan.loan_period)
+
+    # 1. Purchase Value: original amount less the reduction
+    reduced_value = truncate_two_decimals(loan.original_amount * (loan.purchase_value_reduction / HUNDRED))
+    purchase_value_excel = truncate_two_decimals(loan.original_amount - reduced_value)
+
+    # 2. Loan Amount: purchase value less the down payment
+    dp_value = truncate_two_decimals(purchase_value_excel * (loan.down_payment / HUNDRED))
+    loan_amount = truncate_two_decimals(purchase_value_excel - dp_value)
+
+    # 3. Principal
+    annual_principal = truncate_two_decimals(loan_amount / loan_period)
+    monthly_principal = truncate_two_decimals(annual_principal / TWELVE)
+    final_principal = truncate_two_decimals(monthly_principal * (loan.monthly_principal_reduction / HUNDRED))
+
+    # 4. Interest, then the total interest reduction
+    interest_per_annum = truncate_two_decimals(loan_amount * (loan.annual_interest / HUNDRED))
+    total_interest_for_period = truncate_two_decimals(interest_per_annum * loan_period)
+    total_interest_for_period = truncate_two_decimals(total_interest_for_period * (loan.total_interest_reduction / HUNDRED))
+
+    # 5. Property insurance on the loan amount, PMI on the purchase value
+    loan_percentage = HUNDRED - loan.down_payment
+    insurance_rate = property_insurance_rate(loan_percentage, loan.loan_period)
+    property_insurance_per_annum = truncate_two_decimals(loan_amount * (insurance_rate / HUNDRED))
+    property_insurance_per_month = truncate_two_decimals(property_insurance_per_annum / TWELVE)
+
+    loan_pmi_rate = pmi_rate(loan_percentage, loan.loan_period)
+    if loan_pmi_rate is None:
+        pmi_per_annum = None
+    else:
+        pmi_per_annum = truncate_two_decimals(purchase_value_excel * (loan_pmi_rate / HUNDRED))
+
+    # 6. Property tax on the assessed share of the loan amount
+    if loan.assessment_reduction_rate is None:
+        property_tax_per_annum = None
+        property_tax_for_period = None
+    else:
+        assessed_value = truncate_two_decimals(loan_amount * (loan.assessment_reduction_rate / HUNDRED))
+        property_tax_per_annum = truncate_two_decimals(assessed_value * PROPERTY_TAX_RATE)
+        property_tax_for_period = truncate_two_decimals(property_tax_per_annum * loan_period)
+
+    return LoanResult(
+        purchase_value_excel=purchase_value_excel,
+        loan_amount=loan_amount,
+        final_principal=final_principal,
+        total_interest_for_period=total_interest_for_period,
+        property_insurance_rate=insurance_rate,
+        property_insurance_per_month=property_insurance_per_month,
+        pmi_rate=loan_pmi_rate,
+        pmi_per_annum=pmi_per_annum,
+        property_tax_per_annum=property_tax_per_annum,
+        property_tax_for_period=property_tax_for_period,
+    )
@@ -0,0 +1,280 @@
+import heapq
+import threading
+from bisect import bisect_left
+from array import array
+from collections import Counter
+
+from .assessment_rates import STATE_ABBREVIATIONS, WHITESPACE_RE, SnapshotRateIndex, get_index, normalize_location
+
+# Queries sharing fewer trigrams than this (Dice coefficient) are not suggested
+MIN_SCORE = 0.4
+
+# Spellings folded together before trigrams are taken ("SAINT LOUIS" ~ "ST. LOUIS")
+CITY_WORD_FOLDS = {
+    "SAINT": "ST", "STE": "ST", "MOUNT": "MT", "FORT": "FT",
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+}
+
+
+def trigrams(text):
+    """
+    Split a normalized key into its set of padded character trigrams:
+    "ADAK" → {"  A", " AD", "ADA", "DAK", "AK "}.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fold_city(city):
+    """Fold common abbreviations so they compare equal in trigram space."""
+    words = city.replace(".", " ").split()
+    return " ".join(CITY_WORD_FOLDS.get(word, word) for word in words)
+
+
+def split_query(text):
+    """
+    Split free text into a normalized (city, state) pair. Text without a
+    comma is treated as a bare city name and state is None.
+    """
+    key = normalize_location(text)
+    if key is None:
+        return WHITESPACE_RE.sub(" ", (text or "").strip().upper()), None
+    city, state = key.rsplit(" , ", 1)
+    return city, state or None
+
+
+def dice(grams, other_size, shared):
+    return 2 * shared / (len(grams) + other_size)
+
+
+class TrigramIndex:
+    """
+    Inverted index from city trigram → key ids over the assessment-rate keys.
+
+    Only the city half of each key is indexed; the state is resolved to one
+    of the ~50 workbook states up front and used as a filter. A search then
+    touches just the posting lists of the query's own city trigrams.
+    """
+
+    def __init__(self, items):
+        self.keys = []
+        self.rates = []
+        self.states = []
+        self.sizes = array('H')
+        self.postings = {}
+        for key_id, (key, rate) in enumerate(items):
+            city, state = key.rsplit(" , ", 1)
+            grams = trigrams(fold_city(city))
+            self.keys.append(key)
+            self.rates.append(rate)
+            self.states.append(state)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, array('I')).append(key_id)
+        self.state_grams = {state: trigrams(state) for state in set(self.states)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def resolve_state(self, state):
+        """Map a typed state onto a workbook state, tolerating typos."""
+        if state is None or state in self.state_grams:
+            return state
+        grams = trigrams(state)
+        best_score, best_state = max(
+            (dice(grams, len(other), len(grams & other)), name)
+            for name, other in self.state_grams.items()
+        )
+        return best_state if best_score >= MIN_SCORE else None
+
+    def search(self, text, limit=5, min_score=MIN_SCORE):
+        """
+        Return up to `limit` (key, rate, score) tuples, best first.
+        """
+        city, state = split_query(text)
+        if not city:
+            return []
+        state = self.resolve_state(state)
+        grams = trigrams(fold_city(city))
+
+        shared = Counter()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is not None:
+                shared.update(posting)
+
+        states, sizes = self.states, self.sizes
+        scored = (
+            (dice(grams, sizes[key_id], count), key_id)
+            for key_id, count in shared.items()
+            if state is None or states[key_id] == state
+        )
+        best = heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+        return [(self.keys[key_id], self.rates[key_id], round(score, 3)) for score, key_id in best]
+
+
+class PrefixIndex:
+    """
+    Prefix lookup over the sorted keys for typeahead.
+
+    The keys are kept as one sorted list, which is a trie flattened into an
+    array: every key under a prefix sits in one contiguous run, found with a
+    single bisect. That avoids a dict per trie node across 38k keys.
+    """
+
+    def __init__(self, items):
+        rows = sorted(items)
+        self.keys = [key for key, rate in rows]
+        self.rates = [rate for key, rate in rows]
+
+    @classmethod
+    def over(cls, source):
+        """
+        A prefix index over a rate index. A snapshot is searched in place,
+        so workers share its mapped keys instead of each holding a copy.
+        """
+        if isinstance(source, SnapshotRateIndex):
+            return SnapshotPrefixIndex(source)
+        return cls(source.items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _lower_bound(self, prefix):
+        return bisect_left(self.keys, prefix)
+
+    def _key(self, i):
+        return self.keys[i]
+
+    def _rate(self, i):
+        return self.rates[i]
+
+    def search(self, text, limit=10):
+        """Return up to `limit` (key, rate) pairs starting with `text`."""
+        prefix = normalize_prefix(text)
+        if not prefix:
+            return []
+        start = self._lower_bound(prefix)
+        results = []
+        for i in range(start, min(start + limit, len(self))):
+            key = self._key(i)
+            if not key.startswith(prefix):
+                break
+            results.append((key, self._rate(i)))
+        return results
+
+
+class SnapshotPrefixIndex(PrefixIndex):
+    """
+    PrefixIndex bisecting a SnapshotRateIndex's mapped keys. They are sorted
+    by their UTF-8 bytes, which is code point order, so every key under a
+    prefix still sits in one contiguous run.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def _lower_bound(self, prefix):
+        return self.snapshot.lower_bound(prefix)
+
+    def _key(self, i):
+        return self.snapshot.key_at(i)
+
+    def _rate(self, i):
+        return self.snapshot.rate_at(i)
+
+
+def normalize_prefix(text):
+    """
+    Normalize partially typed text into a key prefix: "spring" → "SPRING",
+    "springfield, il" → "SPRINGFIELD , ILLINOIS". A trailing space is kept
+    so "new " only matches multi-word names.
+    """
+    text = WHITESPACE_RE.sub(" ", (text or "").upper()).lstrip()
+    if ',' not in text:
+        return text
+    city, state = text.rsplit(',', 1)
+    state = state.lstrip()
+    state = STATE_ABBREVIATIONS.get(state.strip(), state)
+    return f"{city.strip()} , {state}"
+
+
+_derived_indexes = {}
+_derived_lock = threading.Lock()
+
+
+def _derived_index(index_class, build=None):
+    """
+    Return an `index_class` built over the current rate index (by
+    `build(source)`, default index_class(source.items())), rebuilding it when
+    get_index() hands back a reloaded table.
+    """
+    source = get_index()
+    cached = _derived_indexes.get(index_class)
+    if cached is not None and cached[0] is source:
+        return cached[1]
+
+    with _derived_lock:
+        cached = _derived_indexes.get(index_class)
+        if cached is None or cached[0] is not source:
+            cached = (source, build(source) if build else index_class(source.items()))
+            _derived_indexes[index_class] = cached
+        return cached[1]
+
+
+def get_search_index():
+    return _derived_index(TrigramIndex)
+
+
+def get_prefix_index():
+    return _derived_index(PrefixIndex, PrefixIndex.over)
+
+
+def complete_locations(text, limit=10):
+    """
+    Typeahead matches for partially typed "City, State" text: prefix matches
+    first, topped up with fuzzy matches so typos still get answers.
+    """
+    results = get_prefix_index().search(text, limit=limit)
+    if len(results) < limit:
+        seen = {key for key, rate in results}
+        for key, rate, score in suggest_locations(text, limit=limit):
+            if key not in seen and len(results) < limit:
+                results.append((key, rate))
+    return results
+
+
+def suggest_locations(text, limit=5):
+    """
+    Suggest workbook rows for hand-typed "City, State" text, best first.
+    """
+    return get_search_index().search(text, limit=limit)
+
+
+def reconcile_location(text):
+    """
+    Return the workbook key that `text` refers to: the exact key when it is
+    in the workbook, otherwise the single best fuzzy match, or None.
+    """
+    key = normalize_location(text)
+    if key is not None and get_index().get(key) is not None:
+        return key
+    matches = suggest_locations(text, limit=1)
+    return matches[0][0] if matches else None
+
+
+def unknown_location_warning(text, limit=3):
+    """
+    The data-entry warning for a "City, State" the workbook gave no rate
+    for, naming the closest rows, or None when nothing is close.
+    """
+    suggestions = suggest_locations(text, limit=limit)
+    if not suggestions:
+        return None
+    return (
+        "City, State not found in the assessment workbook. Did you mean: "
+        + "; ".join(key for key, rate, score in suggestions) + "?"
+    )
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from app.display_backfill import DEFAULT_CHUNK_SIZE, backfill_display_columns
+
+
+class Command(BaseCommand):
+    help = "Fill in the stored display strings (purchase value and down payment, insurance and PMI, ...) of existing rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default='app.ProcessedData',
+                            help="Model to backfill (app.ProcessedData or app2.ProcessedData2)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Rows read and rebuilt per round trip")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Count the rows that would change without writing")
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        result = backfill_display_columns(
+            model,
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+        )
+
+        verb = "would change" if options['dry_run'] else "updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result.checked} rows in {result.elapsed.total_seconds():.1f}s, {result.updated} {verb}"
+        ))
@@ -0,0 +1,57 @@
+import time
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.admin import ModelAdmin
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Time changelist searches (row count and first page) with the stock "
+        "ILIKE search and with the model admin's indexed search (reference keys, then full text)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='+', help="Search terms, as typed into the admin search box")
+        parser.add_argument('--model', default='app4.CustomerData',
+                            help="Model whose admin search is timed (app.ProcessedData, app2.ProcessedData2, app4.CustomerData)")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per term and search; the median is reported")
+
+    def _time(self, search, queryset, term, per_page, repeat):
+        """Median seconds for count() plus the first page, and the count"""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results, _ = search(queryset, term)
+            count = results.count()
+            list(results[:per_page])
+            timings.append(time.perf_counter() - started)
+        return sorted(timings)[len(timings) // 2], count
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        model_admin = admin.site._registry.get(model)
+        if model_admin is None or getattr(model_admin, 'fulltext_index', None) is None:
+            raise CommandError(f"{options['model']} has no admin with a full-text index")
+
+        request = RequestFactory().get('/')
+        queryset = model_admin.get_queryset(request)
+        if not model_admin.fulltext_index.available(queryset.db):
+            self.stdout.write(self.style.WARNING("The full-text index is not available here; only reference-number searches use an index"))
+        searches = [
+            ('stock', lambda qs, term: ModelAdmin.get_search_results(model_admin, request, qs, term)),
+            ('indexed', lambda qs, term: model_admin.get_search_results(request, qs, term)),
+        ]
+
+        self.stdout.write(f"{model._meta.label}: {queryset.count()} rows")
+        for term in options['terms']:
+            line = []
+            for label, search in searches:
+                seconds, count = self._time(search, queryset, term, model_admin.list_per_page, options['repeat'])
+                line.append(f"{label} {seconds * 1000:.1f} ms ({count} rows)")
+            self.stdout.write(f"{term!r}: " + ", ".join(line))
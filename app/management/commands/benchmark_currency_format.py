@@ -0,0 +1,64 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.formatting import format_number_with_commas
+
+
+def legacy_format_number_with_commas(value):
+    """
+    The formatter before app.formatting, as app.models had it: the digits
+    reversed, cut into threes and joined back up.
+    """
+    if value is None:
+        return "NA"
+    whole, decimal = f"{value:.2f}".split('.')
+    if len(whole) <= 3:
+        return f"$  {whole}.{decimal}"
+    whole = whole[::-1]
+    groups = [whole[i:i + 3][::-1] for i in range(0, len(whole), 3)]
+    return "$  " + "  ,  ".join(groups[::-1]) + f".{decimal}"
+
+
+def sample_amounts(count, seed=1):
+    """`count` non-negative Decimal amounts of two to four decimals, from cents to billions"""
+    rng = random.Random(seed)
+    return [
+        Decimal(rng.randrange(10 ** rng.randrange(1, 13))).scaleb(-rng.choice((2, 2, 2, 3, 4)))
+        for _ in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time format_number_with_commas against the reverse-and-regroup formatter it "
+        "replaced over --values amounts, and check that both give the same text"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--values', type=int, default=1_000_000, help="Amounts to format per formatter")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed for the amounts")
+
+    def _time(self, formatter, values):
+        started = time.perf_counter()
+        results = [formatter(value) for value in values]
+        return time.perf_counter() - started, results
+
+    def handle(self, *args, **options):
+        if options['values'] < 1:
+            raise CommandError("--values must be positive")
+        values = sample_amounts(options['values'], options['seed'])
+
+        old_seconds, old = self._time(legacy_format_number_with_commas, values)
+        new_seconds, new = self._time(format_number_with_commas, values)
+        mismatches = sum(a != b for a, b in zip(old, new))
+
+        self.stdout.write(f"reverse and regroup: {old_seconds:.2f} s")
+        self.stdout.write(f"format(value, ',.2f'): {new_seconds:.2f} s")
+        if mismatches:
+            raise CommandError(f"{mismatches} of {len(values)} values format differently")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(values)} values, identical output, {old_seconds / new_seconds:.1f}x faster"
+        ))
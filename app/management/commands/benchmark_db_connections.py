@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a one-query request cycle with a fresh database connection per request "
+        "and with the configured persistent connection (CONN_MAX_AGE)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Request cycles per mode")
+        parser.add_argument('--database', default='default', help="Database alias to test")
+
+    def _run(self, connection, requests):
+        """
+        Simulate `requests` requests: the request_started/request_finished
+        signals drive Django's connection handling exactly as the handlers do.
+        Returns (sorted per-request seconds, connections opened).
+        """
+        timings, opened = [], 0
+        for _ in range(requests):
+            request_started.send(sender=self.__class__)
+            started = time.perf_counter()
+            opened += connection.connection is None
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            timings.append(time.perf_counter() - started)
+            request_finished.send(sender=self.__class__)
+        return sorted(timings), opened
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        configured = connection.settings_dict['CONN_MAX_AGE']
+        modes = [
+            ('new connection per request', 0),
+            (f"CONN_MAX_AGE={configured}", configured),
+        ]
+        for label, max_age in modes:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            try:
+                timings, opened = self._run(connection, options['requests'])
+            finally:
+                connection.settings_dict['CONN_MAX_AGE'] = configured
+                connection.close()
+            self.stdout.write(
+                f"{label}: {opened} connections opened, per request "
+                f"mean {sum(timings) / len(timings) * 1000:.2f} ms, "
+                f"p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+                f"p99 {timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000:.2f} ms"
+            )
+        if not configured:
+            self.stdout.write(self.style.WARNING("CONN_MAX_AGE is 0, so both runs open a connection per request"))
@@ -0,0 +1,137 @@
+import random
+import re
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app import number_words
+from app.number_words import ONES, SCALES, TENS, convert_alphanumeric_to_decimal
+
+# ——— The Parser Before app.number_words ———
+# As it was in app.views: regexes compiled on every call, a second pass per
+# group, and no cache.
+
+
+def legacy_parse_hundreds(words):
+    current = 0
+    for w in words:
+        lw = w.lower()
+        if lw in ONES:
+            current += ONES[lw]
+        elif lw in TENS:
+            current += TENS[lw]
+        elif lw == "hundred":
+            current *= SCALES[lw]
+    return current
+
+
+def legacy_parse_number(text):
+    tokens = re.findall(r"[A-Za-z]+", text)
+    total = 0
+    group = []
+    for w in tokens:
+        lw = w.lower()
+        if lw in SCALES and lw != "hundred":
+            total += legacy_parse_hundreds(group) * SCALES[lw]
+            group = []
+        else:
+            group.append(w)
+    if group:
+        total += legacy_parse_hundreds(group)
+    return total
+
+
+def legacy_convert(s):
+    s = s.strip()
+    if s.startswith('$'):
+        s = s[1:].strip()
+    m = re.match(r"^(.*)\s+dollars\s+and\s+(.*)\s+cents$", s, flags=re.IGNORECASE)
+    if not m:
+        raise ValueError("Input must be of the form '<…> dollars and <…> cents'.")
+    return Decimal(legacy_parse_number(m.group(1).strip())) + Decimal(legacy_parse_number(m.group(2).strip())) / Decimal(100)
+
+
+# ——— Workload ———
+
+NUMBER_WORDS = {value: word.title() for word, value in {**ONES, **TENS}.items()}
+SCALE_WORDS = [(value, word.title()) for word, value in sorted(SCALES.items(), key=lambda item: -item[1]) if word != 'hundred']
+
+
+def spell_below_thousand(n):
+    words = []
+    if n >= 100:
+        words += [NUMBER_WORDS[n // 100], 'Hundred']
+        n %= 100
+    if n >= 20:
+        words.append(NUMBER_WORDS[n - n % 10])
+        n %= 10
+    if n:
+        words.append(NUMBER_WORDS[n])
+    return words
+
+
+def spell(n):
+    """An int as the operators type it: 1250 → "One Thousand Two Hundred Fifty" """
+    if not n:
+        return 'Zero'
+    words = []
+    for value, word in SCALE_WORDS:
+        if n >= value:
+            words += spell_below_thousand(n // value) + [word]
+            n %= value
+    return ' '.join(words + spell_below_thousand(n))
+
+
+def typed_variant(rng, text):
+    """The same amount as a different operator might type it: case and spacing vary"""
+    case = rng.choice((str, str.upper, str.lower))
+    return case(text).replace(' ', rng.choice((' ', ' ', '  ')))
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the spelled-out amount parser before app.number_words (the app.views copy) "
+        "and after, uncached and with the cache on the normalized phrase"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--amounts', type=int, default=5000, help="Distinct amounts in the workload")
+        parser.add_argument('--calls', type=int, default=200_000, help="Conversions per mode")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed for the workload")
+
+    def _time(self, convert, texts):
+        started = time.perf_counter()
+        results = [convert(text) for text in texts]
+        return time.perf_counter() - started, results
+
+    def handle(self, *args, **options):
+        if options['amounts'] < 1 or options['calls'] < 1:
+            raise CommandError("--amounts and --calls must be positive")
+        rng = random.Random(options['seed'])
+        amounts = [
+            f"{spell(rng.randrange(1_000, 5_000_000))} Dollars and {spell(rng.randrange(100))} Cents"
+            for _ in range(options['amounts'])
+        ]
+        texts = [typed_variant(rng, rng.choice(amounts)) for _ in range(options['calls'])]
+
+        number_words._convert_phrase.cache_clear()
+        modes = [
+            ('before (app.views parser)', legacy_convert),
+            ('after, uncached', number_words._convert),
+            ('after, cached on the normalized phrase', convert_alphanumeric_to_decimal),
+        ]
+        baseline = None
+        for label, convert in modes:
+            seconds, results = self._time(convert, texts)
+            if baseline is None:
+                baseline = results
+            elif results != baseline:
+                raise CommandError(f"{label} disagrees with the old parser")
+            self.stdout.write(f"{label}: {seconds:.2f} s, {seconds / len(texts) * 1e6:.2f} µs per amount")
+
+        info = number_words._convert_phrase.cache_info()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(texts)} conversions of {len(amounts)} amounts typed {len(set(texts))} ways; "
+            f"cache {info.hits} hits, {info.misses} misses"
+        ))
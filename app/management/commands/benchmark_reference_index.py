@@ -0,0 +1,110 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connections, transaction
+
+from app.references import process_reference
+
+FILL_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the per-submit customer reference check on a scratch table of --rows rows: "
+        "exists() then INSERT on an unindexed column (before migration 0010) against "
+        "an INSERT caught on the unique index (after)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Rows already in the table")
+        parser.add_argument('--submits', type=int, default=200, help="Timed submits per mode")
+        parser.add_argument('--database', default='default', help="Database alias to test")
+
+    def _reference(self, n):
+        return process_reference(f"ref {n:09d}")
+
+    def _create(self, cursor, quote, table, unique):
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} ("
+            f"customer_reference_number VARCHAR(255) NULL{' UNIQUE' if unique else ''}, "
+            f"customer_name VARCHAR(255) NOT NULL)"
+        )
+
+    def _fill(self, connection, table, rows):
+        quote = connection.ops.quote_name
+        sql = f"INSERT INTO {quote(table)} (customer_reference_number, customer_name) VALUES (%s, %s)"
+        for start in range(0, rows, FILL_BATCH_SIZE):
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.executemany(sql, [
+                    (self._reference(n), 'Benchmark') for n in range(start, min(start + FILL_BATCH_SIZE, rows))
+                ])
+
+    def _submit_before(self, connection, table, reference):
+        """The old view: scan for the reference, then insert it"""
+        quote = connection.ops.quote_name
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {quote(table)} WHERE customer_reference_number = %s LIMIT 1", [reference])
+            if cursor.fetchone() is not None:
+                return False
+            cursor.execute(
+                f"INSERT INTO {quote(table)} (customer_reference_number, customer_name) VALUES (%s, %s)",
+                [reference, 'Benchmark'],
+            )
+        return True
+
+    def _submit_after(self, connection, table, reference):
+        """The current view: insert, and let the unique index reject a duplicate"""
+        quote = connection.ops.quote_name
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {quote(table)} (customer_reference_number, customer_name) VALUES (%s, %s)",
+                    [reference, 'Benchmark'],
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def _time(self, submit, connection, table, references):
+        """Sorted per-submit seconds, and how many submits were accepted"""
+        timings, accepted = [], 0
+        for reference in references:
+            started = time.perf_counter()
+            accepted += submit(connection, table, reference)
+            timings.append(time.perf_counter() - started)
+        return sorted(timings), accepted
+
+    def handle(self, *args, **options):
+        rows, submits = options['rows'], options['submits']
+        if rows < 1 or submits < 2:
+            raise CommandError("--rows must be at least 1 and --submits at least 2")
+        connection = connections[options['database']]
+        quote = connection.ops.quote_name
+        # Every other submit repeats a reference already in the table
+        references = [
+            self._reference(rows + i if i % 2 else (i * 7919) % rows) for i in range(submits)
+        ]
+        modes = [
+            ('before (unindexed, exists() then INSERT)', 'bench_reference_scan', False, self._submit_before),
+            ('after (unique index, INSERT)', 'bench_reference_unique', True, self._submit_after),
+        ]
+
+        for label, table, unique, submit in modes:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+                self._create(cursor, quote, table, unique)
+            try:
+                started = time.perf_counter()
+                self._fill(connection, table, rows)
+                self.stdout.write(f"{label}: filled {rows} rows in {time.perf_counter() - started:.1f} s")
+                timings, accepted = self._time(submit, connection, table, references)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+            self.stdout.write(
+                f"{label}: {accepted} of {submits} submits accepted, per submit "
+                f"mean {sum(timings) / len(timings) * 1000:.2f} ms, "
+                f"p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+                f"p99 {timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000:.2f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS("Done; the scratch tables were dropped"))
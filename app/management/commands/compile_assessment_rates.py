@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.assessment_rates import (
+    SNAPSHOT_PATH,
+    WORKBOOK_PATH,
+    AssessmentRateIndex,
+    SnapshotRateIndex,
+    write_snapshot,
+)
+from app.caching import LOCATIONS, invalidate
+
+
+class Command(BaseCommand):
+    help = "Compile the city/state assessment-rate workbook into a memory-mappable snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workbook', default=WORKBOOK_PATH, help="Source .xlsx workbook")
+        parser.add_argument('--output', default=SNAPSHOT_PATH, help="Snapshot file to write")
+
+    def handle(self, *args, **options):
+        workbook = options['workbook']
+        output = options['output']
+
+        started = time.perf_counter()
+        try:
+            index = AssessmentRateIndex.from_workbook(workbook)
+        except OSError as e:
+            raise CommandError(f"Could not read {workbook}: {e}")
+        parsed = time.perf_counter()
+
+        count = write_snapshot(index, output)
+
+        # Re-open the result so a broken snapshot fails here, not in a worker.
+        opened = time.perf_counter()
+        snapshot = SnapshotRateIndex(output)
+        loaded = time.perf_counter()
+        if len(snapshot) != count:
+            raise CommandError(f"Snapshot {output} has {len(snapshot)} rows, expected {count}")
+
+        # Cached typeahead answers came from the old rates
+        invalidate(LOCATIONS)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {count} rates to {output} "
+            f"(workbook parse {parsed - started:.2f}s, snapshot open {(loaded - opened) * 1000:.2f}ms)"
+        ))
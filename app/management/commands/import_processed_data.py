@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.importer import DEFAULT_BATCH_SIZE, import_processed_data
+
+
+class Command(BaseCommand):
+    help = "Bulk import ProcessedData rows from a .xlsx or .csv file with the home form's columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Spreadsheet to import (.xlsx or .csv)")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Rows per bulk_create / transaction")
+        parser.add_argument('--username', default='',
+                            help="Username recorded for rows that have none")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Run the calculations and checks without writing")
+
+    def handle(self, *args, **options):
+        try:
+            result = import_processed_data(
+                options['path'],
+                batch_size=options['batch_size'],
+                default_username=options['username'],
+                dry_run=options['dry_run'],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for row_number, message in result.errors:
+            self.stderr.write(f"Row {row_number}: {message}")
+
+        verb = "Checked" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created} rows in {result.elapsed.total_seconds():.1f}s "
+            f"({len(result.errors)} skipped)"
+        ))
@@ -0,0 +1,146 @@
+import http.client
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+# A valid submission; every request gets its own customer reference number
+FORM_DATA = {
+    'image_number': 'LOADTEST',
+    'username': 'loadtest',
+    'input_text1': 'load test',
+    'input_text2': 'load test',
+    'input_text3': 'Abbeville, AL',
+    'input_text4': '$ Two Hundred Thousand dollars and Fifty cents',
+    'purchase_value_reduction': '10',
+    'down_payment': '15',
+    'loan_period': '30',
+    'annual_interest': '5.5',
+    'monthly_principal_reduction': '50',
+    'total_interest_reduction': '40',
+    'input_text_guarantor_ref': 'load test',
+    'assessment_reduction_rate': '',
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class FormClient:
+    """One simulated operator: a keep-alive connection and its cookies"""
+
+    def __init__(self, url, path, timeout):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.referer = url.rstrip('/') + path
+        self.path = path
+        self.cookies = SimpleCookie()
+        self.token = None
+
+    def _request(self, method, body=None, headers=None):
+        headers = {**(headers or {}), 'Referer': self.referer}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{name}={morsel.value}" for name, morsel in self.cookies.items())
+        self.connection.request(method, self.path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        content = response.read()
+        for header in response.headers.get_all('Set-Cookie') or []:
+            self.cookies.load(header)
+        return response.status, content
+
+    def open_form(self):
+        """GET the form once for the CSRF cookie and token"""
+        status, content = self._request('GET')
+        match = CSRF_TOKEN_RE.search(content.decode('utf-8', 'replace'))
+        if status != 200 or not match:
+            raise CommandError(f"GET {self.path} returned {status} without a CSRF token")
+        self.token = match.group(1)
+
+    def submit(self):
+        """POST one submission; returns (status, seconds)"""
+        body = urlencode({
+            **FORM_DATA,
+            'input_text_ref': f"LOADTEST {uuid.uuid4().hex[:16]}",
+            'csrfmiddlewaretoken': self.token,
+        })
+        started = time.perf_counter()
+        status, _ = self._request('POST', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+        return status, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Submit a data-entry form from many concurrent clients against a running server "
+        "and report requests/sec and latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="Server to test, e.g. http://127.0.0.1:8000")
+        parser.add_argument('--path', default='/home3/',
+                            help="Form to submit: /home3/ (stores nothing), / or /test/ (insert rows with image number LOADTEST)")
+        parser.add_argument('--concurrency', type=int, default=50, help="Simultaneous clients")
+        parser.add_argument('--requests', type=int, default=2000, help="Total submissions")
+        parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout in seconds")
+        parser.add_argument('--label', default='', help="Name printed with the results, e.g. gunicorn-sync")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        total = max(1, options['requests'])
+        clients = [FormClient(options['url'], options['path'], options['timeout']) for _ in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(FormClient.open_form, clients))
+
+        latencies, statuses, errors = [], {}, []
+        lock = threading.Lock()
+        remaining = iter(range(total))
+
+        def run(client):
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                try:
+                    status, seconds = client.submit()
+                except (OSError, http.client.HTTPException) as e:
+                    with lock:
+                        errors.append(str(e))
+                    client.connection.close()
+                    continue
+                with lock:
+                    latencies.append(seconds)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run, clients))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        failed = len(errors) + sum(count for status, count in statuses.items() if status >= 400)
+        label = f"{options['label']}: " if options['label'] else ''
+        self.stdout.write(
+            f"{label}{total} POST {options['path']} with {concurrency} clients in {elapsed:.1f}s\n"
+            f"  requests/sec: {total / elapsed:.1f}\n"
+            f"  latency ms:   p50 {percentile(latencies, 0.50) * 1000:.1f}, "
+            f"p90 {percentile(latencies, 0.90) * 1000:.1f}, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f}, max {percentile(latencies, 1.0) * 1000:.1f}\n"
+            f"  status codes: {dict(sorted(statuses.items()))}"
+        )
+        for message in sorted(set(errors))[:5]:
+            self.stderr.write(f"  error: {message}")
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} of {total} submissions failed"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All submissions succeeded"))
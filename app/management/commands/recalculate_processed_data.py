@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from app.loan_batch import DEFAULT_CHUNK_SIZE, recalculate_processed_data
+
+
+class Command(BaseCommand):
+    help = "Recompute loan amount, insurance, PMI and property tax for every stored row after a rate change"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default='app.ProcessedData',
+                            help="Model to recalculate (app.ProcessedData or app2.ProcessedData2)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Rows read and recomputed per round trip")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Count the rows that would change without writing")
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        result = recalculate_processed_data(
+            model,
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+        )
+
+        for pk, message in result.skipped:
+            self.stderr.write(f"Row {pk}: {message}")
+
+        verb = "would change" if options['dry_run'] else "updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result.checked} rows in {result.elapsed.total_seconds():.1f}s, "
+            f"{result.updated} {verb} ({len(result.skipped)} skipped)"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app.export_jobs import work
+from app.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = "Run queued admin export jobs (Excel/CSV) in the background"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty instead of polling")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to wait between polls of an empty queue")
+
+    def handle(self, *args, **options):
+        for job in work(once=options['once'], poll_interval=options['poll_interval']):
+            if job.status == ExportJob.DONE:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Export {job.pk} ({job.exporter}): {job.processed_rows} rows → {job.file_path}"
+                ))
+            else:
+                self.stderr.write(f"Export {job.pk} ({job.exporter}) failed:\n{job.error}")
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerialCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=100)),
+                ('image_number', models.CharField(max_length=100)),
+                ('last_serial', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('scope', 'image_number')},
+            },
+        ),
+    ]
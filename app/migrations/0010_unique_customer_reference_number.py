@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_serialcounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processeddata',
+            name='customer_reference_number',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_unique_customer_reference_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processeddata',
+            index=models.Index(fields=['entry_timestamp', 'id'], name='processeddata_entry_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processeddata',
+            index=models.Index(fields=['image_number', 'entry_timestamp', 'id'], name='processeddata_image_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processeddata',
+            index=models.Index(fields=['username', 'entry_timestamp', 'id'], name='processeddata_user_ts_idx'),
+        ),
+    ]
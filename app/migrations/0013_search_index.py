@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from app.fulltext import FullTextIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_display_columns'),
+    ]
+
+    operations = [
+        FullTextIndex(
+            'app_processeddata',
+            ('image_number', 'username', 'customer_name', 'customer_reference_number', 'guarantor_name'),
+        ).operation(),
+    ]
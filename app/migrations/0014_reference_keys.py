@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:43
+
+from django.db import migrations, models, transaction
+
+# ——— Frozen Helpers ———
+# Copies of app.references.reference_key and app.loan_batch.update_rows as
+# they were when this migration was written, so later changes there cannot
+# change what it does.
+
+BATCH_SIZE = 2000
+UPDATE_BATCH_SIZE = 1000
+
+REFERENCE_KEY_LENGTH = 255
+REFERENCE_COLUMNS = {
+    'customer_reference_number': 'customer_reference_key',
+    'guarantor_reference_number': 'guarantor_reference_key',
+}
+REFERENCE_KEY_COLUMNS = tuple(REFERENCE_COLUMNS.values())
+
+
+def reference_key(text):
+    """The reference with its whitespace and case stripped, None when empty"""
+    key = ''.join((text or '').split()).upper()
+    return key[:REFERENCE_KEY_LENGTH] or None
+
+
+def update_rows(model, columns, changed, connection):
+    """One parameterized UPDATE per row of `changed` ({pk: {column: value}}), sent with executemany"""
+    opts = model._meta
+    fields = [opts.get_field(column) for column in columns]
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(opts.db_table)} SET "
+        + ", ".join(f"{quote(field.column)} = %s" for field in fields)
+        + f" WHERE {quote(opts.pk.column)} = %s"
+    )
+    params = [
+        [field.get_db_prep_save(values[field.name], connection) for field in fields] + [pk]
+        for pk, values in changed.items()
+    ]
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for start in range(0, len(params), UPDATE_BATCH_SIZE):
+            cursor.executemany(sql, params[start:start + UPDATE_BATCH_SIZE])
+
+
+def fill_keys(apps, schema_editor):
+    """Set the key columns of every existing row, in primary-key batches"""
+    connection = schema_editor.connection
+    model = apps.get_model('app', 'ProcessedData')
+    rows = model.objects.using(connection.alias).order_by('pk').values_list('pk', *REFERENCE_COLUMNS)
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return
+        changed = {
+            pk: {key_column: reference_key(value) for key_column, value in zip(REFERENCE_KEY_COLUMNS, values)}
+            for pk, *values in batch
+        }
+        update_rows(model, REFERENCE_KEY_COLUMNS, changed, connection)
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddata',
+            name='customer_reference_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='processeddata',
+            name='guarantor_reference_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_reference_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('namespace', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=1)),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:12
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_queued_jobs(apps, schema_editor):
+    """
+    Jobs still waiting or running were queued as pickled queries, which the
+    worker no longer reads. They are failed, without unpickling anything,
+    so their progress pages say to queue them again.
+    """
+    ExportJob = apps.get_model('app', 'ExportJob')
+    ExportJob.objects.using(schema_editor.connection.alias).filter(status__in=('pending', 'running')).update(
+        status='failed',
+        finished_at=timezone.now(),
+        error="This export was queued before exports were stored as selections and cannot run. Queue it again.",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_cache_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='selection',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(fail_queued_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='query',
+        ),
+    ]
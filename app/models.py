@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from .formatting import DISPLAY_COLUMNS, DISPLAY_SOURCE_COLUMNS, display_columns, format_number_with_commas
+from .loan_engine import pmi_rate, property_insurance_rate
+from .references import REFERENCE_KEY_COLUMNS, REFERENCE_KEY_LENGTH, reference_keys
 
 class ProcessedData(models.Model):
     # 1. Image Information
@@ -9,7 +13,9 @@ class ProcessedData(models.Model):
     username = models.CharField(max_length=200, default='')  # Temporarily changed max_length
     
     # 2. Customer Reference Number
-    customer_reference_number = models.CharField(max_length=255, null=True, blank=True)
+    customer_reference_number = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    # Spaces and case stripped, for lookups (app.references.reference_key)
+    customer_reference_key = models.CharField(max_length=REFERENCE_KEY_LENGTH, null=True, blank=True, editable=False, db_index=True)
     
     # 3. Customer Information
     customer_name = models.TextField()
@@ -21,92 +27,20 @@ class ProcessedData(models.Model):
     
     def format_number_with_commas(self, value):
         """Format a number according to the specified rules"""
-        if value is None:
-            return "NA"
-            
-        # Convert to string and split into whole and decimal parts
-        value_str = f"{value:.2f}"
-        whole, decimal = value_str.split('.')
-        
-        # Handle different lengths
-        length = len(whole)
-        formatted = ""
-        
-        if length <= 3:  # 123.45
-            formatted = f"$  {whole}.{decimal}"
-        else:
-            # Reverse the string to process from right to left
-            whole = whole[::-1]
-            groups = []
-            
-            # Group by 3 digits from right to left
-            for i in range(0, len(whole), 3):
-                group = whole[i:i+3][::-1]  # Reverse back each group
-                groups.append(group)
-            
-            # Reverse the groups to get them in correct order
-            groups = groups[::-1]
-            
-            # Join with proper spacing
-            formatted = "$  " + "  ,  ".join(groups) + f".{decimal}"
-        
-        return formatted
+        return format_number_with_commas(value)
     
     def format_purchase_value(self):
         """Format purchase value according to the specified rules"""
         return self.format_number_with_commas(self.purchase_value_excel)
     
-    @property
-    def purchase_value_and_down_payment(self):
-        """Combine formatted purchase value and down payment"""
-        formatted_purchase = self.format_purchase_value()
-        return f"{formatted_purchase} AND {self.down_payment_percent} %"
-    
-    @property
-    def loan_amount_and_principal(self):
-        """Combine formatted loan amount and principal"""
-        formatted_loan = self.format_number_with_commas(self.loan_amount)
-        formatted_principal = self.format_number_with_commas(self.final_principal)
-        return f"{formatted_loan} AND {formatted_principal}"
-    
-    @property
-    def insurance_and_pmi(self):
-        """Combine formatted property insurance and PMI"""
-        formatted_insurance = self.format_number_with_commas(self.property_insurance_per_month)
-        
-        # Calculate if PMI is applicable - convert down_payment_percent to Decimal first
-        try:
-            down_payment_value = Decimal(self.down_payment_percent)
-            loan_percent = Decimal('100') - down_payment_value
-            if loan_percent <= 80:
-                formatted_pmi = "NA"
-            else:
-                formatted_pmi = self.format_number_with_commas(self.pmi_per_annum)
-        except:
-            # If there's any error converting the down payment, default to NA
-            formatted_pmi = "NA"
-            
-        return f"{formatted_insurance} AND {formatted_pmi}"
-    
-    @property
-    def formatted_property_tax(self):
-        """Format property tax for loan period with proper currency formatting"""
-        if not self.assessment_reduction_rate or self.assessment_reduction_rate.upper() == 'NA':
-            return "NA"
-        return self.format_number_with_commas(self.property_tax_for_period)
-    
     # 5. Loan Period and Interest
     loan_period_years = models.IntegerField(default=0)
     annual_interest_rate = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
     
-    @property
-    def loan_period_and_interest(self):
-        """Format loan period and interest rate as per requirement"""
-        return f"{self.loan_period_years} YEARS AND {self.annual_interest_rate} %"
-    
     # 6. Guarantor Information
     guarantor_name = models.TextField(default='')
     guarantor_reference_number = models.TextField(null=True, blank=True)
+    guarantor_reference_key = models.CharField(max_length=REFERENCE_KEY_LENGTH, null=True, blank=True, editable=False, db_index=True)
     
     # 7. Loan and Principal
     loan_amount = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
@@ -124,58 +58,133 @@ class ProcessedData(models.Model):
     property_tax_per_annum = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True)
     property_tax_for_period = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True)
     
+    # 11. Display Columns: the composite strings shown in the admin list and
+    # the exports, refreshed on every save (see app.formatting.display_columns)
+    purchase_value_and_down_payment = models.CharField(max_length=255, default='', editable=False)
+    loan_period_and_interest = models.CharField(max_length=255, default='', editable=False)
+    loan_amount_and_principal = models.CharField(max_length=255, default='', editable=False)
+    interest_and_property_tax = models.CharField(max_length=255, default='', editable=False)
+    insurance_and_pmi = models.CharField(max_length=255, default='', editable=False)
+    formatted_property_tax = models.CharField(max_length=255, default='', editable=False)
+    
     # Metadata
     entry_timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['image_number', 'serial_number', '-entry_timestamp']
         unique_together = ['image_number', 'serial_number']
+        # Admin changelist access paths: newest-first listing and the date
+        # range, image and username filters, ordered by (entry_timestamp, id)
+        # so the ORDER BY -entry_timestamp, -pk LIMIT needs no sort
+        indexes = [
+            models.Index(fields=['entry_timestamp', 'id'], name='processeddata_entry_ts_idx'),
+            models.Index(fields=['image_number', 'entry_timestamp', 'id'], name='processeddata_image_ts_idx'),
+            models.Index(fields=['username', 'entry_timestamp', 'id'], name='processeddata_user_ts_idx'),
+        ]
 
     def __str__(self):
         return f"Image {self.image_number} - Serial {self.serial_number} - {self.customer_name}"
 
+    def save(self, *args, **kwargs):
+        self.refresh_display_columns()
+        self.refresh_reference_keys()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *DISPLAY_COLUMNS, *REFERENCE_KEY_COLUMNS}
+        super().save(*args, **kwargs)
+
+    def refresh_reference_keys(self):
+        """Recompute the lookup keys from the stored reference numbers"""
+        for column, value in reference_keys(self).items():
+            setattr(self, column, value)
+
+    def refresh_display_columns(self):
+        """Recompute the stored display strings from the row's current values"""
+        values = display_columns({column: getattr(self, column) for column in DISPLAY_SOURCE_COLUMNS})
+        for column, value in values.items():
+            setattr(self, column, value)
+
     @classmethod
     def get_next_serial_number(cls, image_number):
-        """Get the next available serial number for a given image number"""
-        latest = cls.objects.filter(image_number=image_number).order_by('-serial_number').first()
-        return (latest.serial_number + 1) if latest else 1
+        """Reserve the next serial number for a given image number"""
+        from .serials import allocate_serial_numbers
+        return allocate_serial_numbers(cls, image_number)
 
     def calculate_property_insurance_rate(self):
         """Calculate property insurance rate based on loan percentage and period"""
         try:
-            down_payment_value = Decimal(self.down_payment_percent)
-            loan_percent = 100 - down_payment_value
-            period = self.loan_period_years
-
-            if loan_percent <= Decimal('84.99'):
-                return Decimal('0.32')
-            elif loan_percent == Decimal('85'):
-                return Decimal('0.21') if period <= 25 else Decimal('0.32')
-            elif Decimal('85.01') <= loan_percent <= Decimal('90'):
-                return Decimal('0.41') if period <= 25 else Decimal('0.52')
-            elif Decimal('90.01') <= loan_percent <= Decimal('95'):
-                return Decimal('0.67') if period <= 25 else Decimal('0.78')
-            else:  # 95.01 to 100
-                return Decimal('0.85') if period <= 25 else Decimal('0.96')
-        except:
+            loan_percent = 100 - Decimal(self.down_payment_percent)
+        except (InvalidOperation, TypeError):
             return Decimal('0.32')  # Default to minimum rate if there's any error
+        return property_insurance_rate(loan_percent, self.loan_period_years)
 
     def calculate_pmi_rate(self):
         """Calculate PMI rate based on loan percentage and period"""
         try:
-            down_payment_value = Decimal(self.down_payment_percent)
-            loan_percent = 100 - down_payment_value
-            period = self.loan_period_years
-
-            if loan_percent <= 80:
-                return None  # Always return None (will be displayed as "NA") for loan percentage <= 80%
-            elif 80.01 <= loan_percent <= 85:
-                return Decimal('0.19') if period <= 20 else Decimal('0.32')
-            elif 85.01 <= loan_percent <= 90:
-                return Decimal('0.23') if period <= 20 else Decimal('0.52')
-            elif 90.01 <= loan_percent <= 95:
-                return Decimal('0.26') if period <= 20 else Decimal('0.78')
-            else:  # 95.01 to 100
-                return Decimal('0.79') if period <= 20 else Decimal('0.90')
-        except:
+            loan_percent = 100 - Decimal(self.down_payment_percent)
+        except (InvalidOperation, TypeError):
             return None  # Return None if there's any error converting the down payment
+        return pmi_rate(loan_percent, self.loan_period_years)
+
+class ExportJob(models.Model):
+    """An admin export queued for the run_export_worker command"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    exporter = models.CharField(max_length=50)  # key into app.export_jobs.EXPORTERS
+    selection = models.JSONField(default=dict)  # see app.export_jobs.make_selection
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total_rows = models.IntegerField(default=0)
+    processed_rows = models.IntegerField(default=0)
+    filename = models.CharField(max_length=255, blank=True, default='')
+    file_path = models.CharField(max_length=500, blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)  # also the running worker's claim
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Export {self.pk} ({self.exporter}) - {self.get_status_display()}"
+
+    @property
+    def progress_percent(self):
+        """Share of rows written so far, 0-100"""
+        if self.status == self.DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+class SerialCounter(models.Model):
+    """Last serial number handed out per image, see app.serials"""
+    scope = models.CharField(max_length=100)  # model label, e.g. "app.processeddata"
+    image_number = models.CharField(max_length=100)
+    last_serial = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['scope', 'image_number']
+
+    def __str__(self):
+        return f"{self.scope} image {self.image_number}: {self.last_serial}"
+
+
+class CacheVersion(models.Model):
+    """Current version of a cache namespace, see app.caching"""
+    namespace = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.namespace}: {self.version}"
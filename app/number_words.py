@@ -0,0 +1,251 @@
+import difflib
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+# ——— Mappings for Word‐to‐Number Conversion ———
+ONES = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70,
+    "eighty": 80, "ninety": 90
+}
+SCALES = {
+    "hundred":   10**2,
+    "thousand":  10**3,
+    "million":   10**6,
+    "billion":   10**9,
+    "trillion":  10**12
+}
+
+# ——— Compiled Grammar ———
+# One token → (kind, value) table: a UNIT adds to the current group,
+# HUNDRED multiplies it, a SCALE closes the group into the running total.
+UNIT, HUNDRED, SCALE = 'unit', 'hundred', 'scale'
+WORD_VALUES = {
+    **{word: (UNIT, value) for word, value in ONES.items()},
+    **{word: (UNIT, value) for word, value in TENS.items()},
+    **{word: (SCALE, value) for word, value in SCALES.items()},
+    "hundred": (HUNDRED, SCALES["hundred"]),
+}
+CONNECTOR = "and"
+VOCABULARY = sorted(WORD_VALUES) + [CONNECTOR]
+
+# Words (hyphenated tens included) or any other single non-space character.
+# Commas between groups are allowed and skipped.
+TOKEN_RE = re.compile(r"[A-Za-z]+(?:-[A-Za-z]+)*|\d+|[^\sA-Za-z]")
+AMOUNT_RE = re.compile(r"^\s*(?:\$\s*)?(.*)\s+dollars\s+and\s+(.*)\s+cents\s*$", flags=re.IGNORECASE)
+
+# Distinct phrases and amounts kept per process
+CACHE_SIZE = 4096
+
+
+class AmountParseError(ValueError):
+    """
+    A spelled-out amount that does not parse. `token` is the offending text
+    (None when the whole input is malformed) and `offset` its 0-based
+    position in the string that was parsed.
+    """
+
+    def __init__(self, reason, token=None, offset=0):
+        super().__init__(reason, token, offset)
+        self.reason = reason
+        self.token = token
+        self.offset = offset
+
+    def __str__(self):
+        if self.token is None:
+            return self.reason
+        return f"{self.reason} at character {self.offset + 1}"
+
+    def shifted(self, by):
+        """The same error with its offset moved into an enclosing string"""
+        return AmountParseError(self.reason, self.token, self.offset + by)
+
+
+def _unknown_word(token, offset):
+    reason = f"'{token}' is not a number word"
+    suggestion = difflib.get_close_matches(token.lower(), VOCABULARY, n=1, cutoff=0.7)
+    if suggestion:
+        reason += f" (did you mean '{suggestion[0]}'?)"
+    return AmountParseError(reason, token, offset)
+
+
+def _words(text):
+    """Yield (word, offset, lowercase word), splitting hyphenated tens."""
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if token == ',':
+            continue
+        if not token[0].isalpha():
+            raise AmountParseError(f"'{token}' is not allowed in a spelled-out amount", token, match.start())
+        if '-' not in token:
+            yield token, match.start(), token.lower()
+            continue
+        tens, _, ones = token.lower().partition('-')
+        if tens not in TENS or ONES.get(ones, 0) not in range(1, 10) or '-' in ones:
+            raise AmountParseError(f"'{token}' is not a hyphenated number like 'twenty-three'", token, match.start())
+        yield token[:len(tens)], match.start(), tens
+        yield token[len(tens) + 1:], match.start() + len(tens) + 1, ones
+
+
+def normalize_phrase(text):
+    """
+    Fold case and runs of whitespace: spellings that differ only in those
+    parse alike, so they share one cache entry.
+    """
+    return ' '.join(text.lower().split())
+
+
+def parse_number(text):
+    """
+    Parse a large spelled‐out integer with scales:
+      "Four Hundred Seventy Three Billion Five Hundred Six Million ..."
+    → returns a Python int.
+
+    One pass over the words, checking the grammar as it goes: "and" may
+    follow "hundred" or a scale, tens may be hyphenated ("twenty-three"),
+    scales must descend. Anything else raises AmountParseError pointing at
+    the first word that does not fit.
+    """
+    try:
+        return _parse_phrase(normalize_phrase(text))
+    except AmountParseError:
+        # Parse the text as typed so the error quotes its words and offsets
+        return _parse_number(text)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_phrase(phrase):
+    return _parse_number(phrase)
+
+
+def _parse_number(text):
+    total = 0
+    group = 0           # value since the last scale word
+    has_tens = has_units = has_hundred = False
+    last_scale = None   # (value, word) of the last scale; they must get smaller
+    previous = None     # (word, kind) of the previous word
+    pending_and = None  # (word, offset) of an "and" still waiting for a number
+    zero = None
+
+    for word, offset, lower in _words(text):
+        if zero is not None:
+            raise AmountParseError(f"Nothing may follow '{zero}'", word, offset)
+
+        if lower == CONNECTOR:
+            if previous is None or previous[1] not in (HUNDRED, SCALE) or pending_and:
+                raise AmountParseError("'and' must follow 'hundred', 'thousand', 'million', ...", word, offset)
+            pending_and = (word, offset)
+            continue
+
+        entry = WORD_VALUES.get(lower)
+        if entry is None:
+            raise _unknown_word(word, offset)
+        kind, value = entry
+
+        if kind is UNIT:
+            if value == 0:
+                if previous is not None:
+                    raise AmountParseError("'zero' cannot be part of a larger number", word, offset)
+                zero = word
+            elif lower in TENS:
+                if has_tens or has_units:
+                    raise AmountParseError(f"'{word}' cannot follow '{previous[0]}'", word, offset)
+                has_tens = True
+            else:
+                if has_units or (has_tens and value >= 10):
+                    raise AmountParseError(f"'{word}' cannot follow '{previous[0]}'", word, offset)
+                has_units = True
+            group += value
+        elif pending_and:
+            raise AmountParseError(f"'and' must be followed by a number, not '{word}'", word, offset)
+        elif kind is HUNDRED:
+            if has_hundred or not (has_tens or has_units):
+                raise AmountParseError(f"'{word}' needs a number from one to ninety nine before it", word, offset)
+            group *= value
+            has_tens = has_units = False
+            has_hundred = True
+        else:
+            if last_scale is not None and value >= last_scale[0]:
+                raise AmountParseError(f"'{word}' cannot come after '{last_scale[1]}'", word, offset)
+            if not group:
+                raise AmountParseError(f"'{word}' needs a number before it", word, offset)
+            total += group * value
+            group = 0
+            has_tens = has_units = has_hundred = False
+            last_scale = (value, word)
+
+        pending_and = None
+        previous = (word, kind)
+
+    if pending_and:
+        raise AmountParseError("'and' must be followed by a number", *pending_and)
+    if previous is None:
+        raise AmountParseError("No number given", None, 0)
+    return total + group
+
+
+def convert_alphanumeric_to_decimal(s):
+    """
+    Convert strings like:
+      "$ Four Hundred ... dollars and Twenty ... cents"
+    into Decimal("XXXXXXXXX.YY").
+
+    Raises AmountParseError (a ValueError) with the offending word and its
+    position in `s` when the amount is not well formed.
+    """
+    try:
+        return _convert_phrase(normalize_phrase(s))
+    except AmountParseError:
+        # Convert the text as typed so the error quotes its words and offsets
+        return _convert(s)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _convert_phrase(phrase):
+    return _convert(phrase)
+
+
+def _convert(s):
+    m = AMOUNT_RE.match(s)
+    if not m:
+        raise AmountParseError(
+            "Input must be of the form '<…> dollars and <…> cents'."
+        )
+
+    try:
+        dollars_int = _parse_number(m.group(1))
+    except AmountParseError as e:
+        raise e.shifted(m.start(1)) from None
+    try:
+        cents_int = _parse_number(m.group(2))
+    except AmountParseError as e:
+        raise e.shifted(m.start(2)) from None
+    if cents_int > 99:
+        raise AmountParseError("Cents must be below one hundred", m.group(2).strip(), m.start(2))
+
+    return Decimal(dollars_int) + (Decimal(cents_int) / Decimal(100))
+
+
+def parse_many(texts):
+    """
+    Convert a batch of amount strings (e.g. one import chunk). Returns a list
+    aligned with `texts` holding a Decimal, or None where the text is not of
+    the '<…> dollars and <…> cents' form. Repeated texts are parsed once.
+    """
+    texts = list(texts)
+    parsed = {}
+    for text in texts:
+        if text not in parsed:
+            try:
+                parsed[text] = convert_alphanumeric_to_decimal(text)
+            except ValueError:
+                parsed[text] = None
+    return [parsed[text] for text in texts]
@@ -0,0 +1,61 @@
+from django.db.models import Q
+
+# ——— Reference Numbers ———
+# Reference numbers are stored the way the operators' spreadsheet prints
+# them, spaces tripled ("AB   12"), so an equality lookup only finds what
+# was typed with exactly that spacing. Each model also stores a key with
+# the whitespace and case stripped ("AB12"), indexed, which lookups compare
+# against instead.
+
+REFERENCE_COLUMNS = {
+    'customer_reference_number': 'customer_reference_key',
+    'guarantor_reference_number': 'guarantor_reference_key',
+}
+REFERENCE_KEY_COLUMNS = tuple(REFERENCE_COLUMNS.values())
+REFERENCE_KEY_LENGTH = 255
+
+
+def process_reference(text):
+    """
+    Normalize a reference number the way it is stored: "ab 12" → "AB   12".
+    Runs of whitespace become one triple space, so a stored reference comes
+    back unchanged when its row is saved again.
+    """
+    return '   '.join((text or '').split()).upper()
+
+
+def reference_key(text):
+    """
+    The lookup key of a reference number, however it was spaced or cased:
+    "ab 12", "AB   12" and "Ab12" → "AB12". None for an empty reference.
+    """
+    key = ''.join((text or '').split()).upper()
+    return key[:REFERENCE_KEY_LENGTH] or None
+
+
+def reference_keys(obj):
+    """{key column: key} for a model instance"""
+    return {key_column: reference_key(getattr(obj, column)) for column, key_column in REFERENCE_COLUMNS.items()}
+
+
+def lookup_reference(queryset, text):
+    """Rows whose customer or guarantor reference has the key of `text`"""
+    key = reference_key(text)
+    if key is None:
+        return queryset.none()
+    return queryset.filter(Q(customer_reference_key=key) | Q(guarantor_reference_key=key))
+
+
+class ReferenceSearchMixin:
+    """
+    ModelAdmin mixin: a search that is a reference number, however it is
+    spaced, is answered by an equality match on the indexed keys. Anything
+    else goes on to the admin's other searches.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term:
+            matches = lookup_reference(queryset, search_term)
+            if matches.exists():
+                return matches, False
+        return super().get_search_results(request, queryset, search_term)
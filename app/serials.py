@@ -0,0 +1,93 @@
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F, Max
+
+from .models import SerialCounter
+
+# Attempts before a serial-number conflict is reported to the caller
+SERIAL_RETRIES = 3
+
+# MySQL ER_LOCK_DEADLOCK: InnoDB rolled the transaction back to break a deadlock
+MYSQL_DEADLOCK = 1213
+
+
+def _seed_counter(model, scope, image_number):
+    """Create the counter for an image, starting after any existing rows."""
+    latest = model.objects.filter(image_number=image_number).aggregate(latest=Max('serial_number'))['latest']
+    try:
+        with transaction.atomic():
+            SerialCounter.objects.create(scope=scope, image_number=image_number, last_serial=latest or 0)
+    except IntegrityError:
+        pass  # another request created it first
+
+
+def ensure_counter(model, image_number):
+    """
+    Create an image's counter unless it exists. Call it before the
+    transaction that allocates: on MySQL the allocating UPDATE, matching no
+    row, takes a gap lock, and two first submissions for an image that then
+    both INSERT the counter inside their transactions deadlock. Seeded in its
+    own transaction, the loser only gets a duplicate key, which is ignored.
+    """
+    scope = model._meta.label_lower
+    if not SerialCounter.objects.filter(scope=scope, image_number=image_number).exists():
+        _seed_counter(model, scope, image_number)
+
+
+def allocate_serial_numbers(model, image_number, count=1):
+    """
+    Reserve `count` consecutive serial numbers for an image and return the
+    first one.
+
+    The counter row is bumped with a single UPDATE ... SET last_serial =
+    last_serial + count, so concurrent requests queue on the row lock instead
+    of reading the same MAX() and colliding on unique_together. Callers
+    inside a transaction should ensure_counter() before it begins.
+    """
+    scope = model._meta.label_lower
+    counters = SerialCounter.objects.filter(scope=scope, image_number=image_number)
+    with transaction.atomic():
+        if not counters.update(last_serial=F('last_serial') + count):
+            _seed_counter(model, scope, image_number)
+            counters.update(last_serial=F('last_serial') + count)
+        last_serial = counters.values_list('last_serial', flat=True).get()
+    return last_serial - count + 1
+
+
+def _is_deadlock(error):
+    return bool(error.args) and error.args[0] == MYSQL_DEADLOCK
+
+
+def resync_counter(model, image_number):
+    """Move an image's counter past rows written without the allocator."""
+    scope = model._meta.label_lower
+    latest = model.objects.filter(image_number=image_number).aggregate(latest=Max('serial_number'))['latest'] or 0
+    SerialCounter.objects.filter(scope=scope, image_number=image_number, last_serial__lt=latest).update(last_serial=latest)
+
+
+def save_with_serial(instance, retries=SERIAL_RETRIES):
+    """
+    Assign the next serial number for instance.image_number and save it,
+    retrying with a fresh number if the pair is already taken or MySQL broke
+    a deadlock. Any other IntegrityError is raised to the caller.
+    """
+    model = type(instance)
+    ensure_counter(model, instance.image_number)
+    for attempt in range(retries):
+        try:
+            # Allocate and insert together so a rejected row (e.g. a duplicate
+            # customer reference number) does not burn a serial number
+            with transaction.atomic():
+                instance.serial_number = allocate_serial_numbers(model, instance.image_number)
+                instance.save()
+            return instance
+        except OperationalError as e:
+            # The transaction was rolled back whole, so simply run it again
+            if not _is_deadlock(e) or attempt == retries - 1:
+                raise
+        except IntegrityError:
+            taken = model.objects.filter(
+                image_number=instance.image_number, serial_number=instance.serial_number
+            ).exists()
+            if not taken or attempt == retries - 1:
+                raise
+            resync_counter(model, instance.image_number)
@@ -0,0 +1,47 @@
+// Live check of the Purchase Value box, backed by /api/amount.
+// Shows the parsed amount, or the problem and where the offending word is.
+(function() {
+    const input = document.getElementById('input_text4');
+    const status = document.getElementById('amount-check');
+    if (!input || !status) {
+        return;
+    }
+
+    const url = input.dataset.checkUrl;
+    const cache = {};
+    let timer = null;
+
+    function show(result) {
+        status.classList.toggle('invalid', !result.valid);
+        status.textContent = result.valid ? '$ ' + result.formatted : result.error;
+    }
+
+    function check() {
+        const text = input.value;
+        if (!text.trim()) {
+            status.textContent = '';
+            status.classList.remove('invalid');
+            return;
+        }
+        if (cache[text]) {
+            show(cache[text]);
+            return;
+        }
+        fetch(url + '?text=' + encodeURIComponent(text))
+            .then(function(response) { return response.json(); })
+            .then(function(result) {
+                cache[text] = result;
+                if (input.value === text) {
+                    show(result);
+                }
+            })
+            .catch(function(err) {
+                console.error('Amount check failed: ', err);
+            });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(check, 120);
+    });
+})();
@@ -0,0 +1,67 @@
+// Typeahead for the City, State box, backed by /api/cities.
+// Picking a suggestion also fills an empty Assessment Reduction Rate field.
+(function() {
+    const input = document.getElementById('input_text3');
+    const list = document.getElementById('city-suggestions');
+    const rateInput = document.getElementById('assessment_reduction_rate');
+    if (!input || !list) {
+        return;
+    }
+
+    const url = input.dataset.suggestUrl;
+    const cache = {};
+    let timer = null;
+
+    function toTitle(text) {
+        return text.toLowerCase().replace(/\b\w/g, function(c) { return c.toUpperCase(); });
+    }
+
+    function show(results) {
+        list.innerHTML = '';
+        results.forEach(function(item) {
+            const option = document.createElement('li');
+            option.textContent = item.location + '  (' + item.rate + ' %)';
+            option.addEventListener('mousedown', function(event) {
+                event.preventDefault();
+                const parts = item.location.split(' , ');
+                input.value = toTitle(parts[0]) + ', ' + toTitle(parts[1]);
+                if (rateInput && !rateInput.value.trim()) {
+                    rateInput.value = item.rate;
+                }
+                list.innerHTML = '';
+            });
+            list.appendChild(option);
+        });
+    }
+
+    function fetchSuggestions() {
+        const query = input.value.trim();
+        if (query.length < 2) {
+            list.innerHTML = '';
+            return;
+        }
+        if (cache[query]) {
+            show(cache[query]);
+            return;
+        }
+        fetch(url + '?q=' + encodeURIComponent(query))
+            .then(function(response) { return response.json(); })
+            .then(function(data) {
+                cache[query] = data.results;
+                if (input.value.trim() === query) {
+                    show(data.results);
+                }
+            })
+            .catch(function(err) {
+                console.error('City lookup failed: ', err);
+            });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(fetchSuggestions, 120);
+    });
+    input.addEventListener('blur', function() {
+        list.innerHTML = '';
+    });
+})();
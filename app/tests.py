@@ -1,3 +1,1101 @@
-from django.test import TestCase
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.contrib import admin
+from django.contrib.admin import ModelAdmin
+from django.contrib.auth.models import Permission, User
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.http import QueryDict
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app2.models import ProcessedData2
+from app3.calculator import LoanCalculator
+from app4 import summary
+from app4.amounts import parse_purchase_value
+from app4.exports import plain_decimal
+from app4.models import CustomerData
+
+from . import assessment_rates, caching, export_jobs
+from .assessment_rates import AssessmentRateIndex, SnapshotRateIndex, make_key, write_snapshot
+from .caching import get_or_compute, invalidate, namespace_version
+from .calculations import calculate_entry
+from .export_jobs import claim_next_job, enqueue_export, job_queryset, make_selection, run_job
+from .formatting import DISPLAY_COLUMNS, DISPLAY_SOURCE_COLUMNS, display_columns, format_number_with_commas
+from .fulltext import FullTextIndex, restore_fulltext_triggers, search_words
+from .keyset import AFTER_VAR, BEFORE_VAR
+from .management.commands.benchmark_currency_format import legacy_format_number_with_commas, sample_amounts
+from .management.commands.benchmark_number_parser import legacy_convert, spell, typed_variant
+from .loan_batch import (
+    DERIVED_COLUMNS, MAX_CENTS, MAX_LOAN_PERIOD, recalculate_columns, recalculate_row, stored_rate, vector_inputs,
+)
+from .loan_engine import HUNDRED, LoanInput, calculate_loan
+from .location_search import PrefixIndex, SnapshotPrefixIndex
+from .models import CacheVersion, ExportJob, ProcessedData
+from .number_words import AmountParseError, _convert_phrase, convert_alphanumeric_to_decimal, parse_many, parse_number
+from .references import lookup_reference, process_reference, reference_key
+from .serials import save_with_serial
+
+
+class PrefixIndexTests(SimpleTestCase):
+    rates = {
+        make_key(city, state): Decimal(rate)
+        for city, state, rate in [
+            ('Austin', 'TX', '1.25'), ('Austin', 'MN', '2.10'), ('Austintown', 'OH', '0.80'),
+            ('Auburn', 'AL', '1.05'), ('Auburn', 'WA', '0.95'), ('Boston', 'MA', '1.10'),
+            ('Zürich', 'ND', '3.00'), ('Zurich', 'MT', '2.50'),
+        ]
+    }
+
+    def setUp(self):
+        self.source = AssessmentRateIndex(dict(self.rates))
+        fd, self.path = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        write_snapshot(self.source, self.path)
+        self.snapshot = SnapshotRateIndex(self.path)
+
+    def test_snapshot_is_searched_in_place(self):
+        self.assertIsInstance(PrefixIndex.over(self.snapshot), SnapshotPrefixIndex)
+        self.assertNotIsInstance(PrefixIndex.over(self.source), SnapshotPrefixIndex)
+
+    def test_snapshot_matches_list_index(self):
+        in_place, copied = PrefixIndex.over(self.snapshot), PrefixIndex.over(self.source)
+        self.assertEqual(len(in_place), len(copied))
+        for text in ('au', 'Austin', 'austin,', 'austin, t', 'AUB', 'z', 'zü', 'b', 'q', '', 'boston , ma'):
+            for limit in (1, 2, 10):
+                self.assertEqual(in_place.search(text, limit), copied.search(text, limit), (text, limit))
+
+    def test_lower_bound_and_get(self):
+        keys = [key for key, rate in self.snapshot.items()]
+        self.assertEqual(self.snapshot.lower_bound(''), 0)
+        self.assertEqual(self.snapshot.lower_bound('\uffff'), len(keys))
+        self.assertEqual(self.snapshot.lower_bound('AUSTIN , TEXAS'), keys.index('AUSTIN , TEXAS'))
+        self.assertEqual(self.snapshot.get('Austin, TX'), Decimal('1.25'))
+        self.assertIsNone(self.snapshot.get('Austin, CA'))
+
+
+class ExportJobAccessTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='pw', is_staff=True)
+        self.other = User.objects.create_user('other', password='pw', is_staff=True)
+        self.admin = User.objects.create_superuser('root', password='pw')
+        view_job = Permission.objects.get(codename='view_exportjob')
+        view_rows = Permission.objects.get(codename='view_processeddata')
+        self.owner.user_permissions.add(view_job, view_rows)
+        self.other.user_permissions.add(view_job, view_rows)
+        self.job = enqueue_export('processed_data_xlsx', make_selection(ProcessedData), self.owner)
+        self.status_url = reverse('admin:app_exportjob_status', args=[self.job.pk])
+
+    def status(self, user):
+        self.client.force_login(user)
+        return self.client.get(self.status_url)
+
+    def test_owner_and_superuser_only(self):
+        self.assertEqual(self.status(self.owner).status_code, 200)
+        self.assertEqual(self.status(self.admin).status_code, 200)
+        self.assertEqual(self.status(self.other).status_code, 404)
+
+    def test_needs_view_permission_on_exported_model(self):
+        self.owner.user_permissions.remove(Permission.objects.get(codename='view_processeddata'))
+        self.assertEqual(self.status(self.owner).status_code, 404)
+
+    def test_unreadable_selection_marks_job_failed(self):
+        ExportJob.objects.filter(pk=self.job.pk).update(selection={'model': 'app.nosuchmodel'})
+        response = self.status(self.owner)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], ExportJob.FAILED)
+        self.assertIn('can no longer be read', response.json()['error'])
+        self.assertEqual(ExportJob.objects.get(pk=self.job.pk).status, ExportJob.FAILED)
+
+
+
+class ExportJobWorkerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('worker', password='pw')
+        ProcessedData.objects.bulk_create([
+            ProcessedData(
+                image_number='IMG1', serial_number=i, username=f'user{i % 2}',
+                customer_reference_number=f'JOB {i}', customer_name='Job', city_state='Austin , Texas',
+            )
+            for i in range(6)
+        ])
+        export_root = tempfile.TemporaryDirectory()
+        self.addCleanup(export_root.cleanup)
+        patcher = mock.patch.object(export_jobs, 'EXPORT_ROOT', export_root.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queue(self, **selection):
+        return enqueue_export('processed_data_xlsx', make_selection(ProcessedData, **selection), self.user)
+
+    def go_stale(self, job):
+        stale = timezone.now() - export_jobs.STALE_AFTER - timedelta(minutes=1)
+        ExportJob.objects.filter(pk=job.pk).update(heartbeat_at=stale)
+
+    def test_selection_rebuilds_filtered_changelist(self):
+        user0 = set(ProcessedData.objects.filter(username='user0').values_list('pk', flat=True))
+        job = self.queue(params={'username': ['user0']})
+        self.assertEqual(set(job_queryset(job).values_list('pk', flat=True)), user0)
+        ticked = sorted(user0)[:2]
+        job = self.queue(params={'username': ['user0']}, pks=ticked)
+        self.assertEqual(sorted(job_queryset(job).values_list('pk', flat=True)), ticked)
+
+    def test_admin_action_stores_selection(self):
+        self.client.force_login(self.user)
+        url = reverse('admin:app_processeddata_changelist') + '?username=user1'
+        first = ProcessedData.objects.filter(username='user1').first()
+        data = {'action': 'export_to_excel', '_selected_action': [first.pk], 'index': 0}
+        self.client.post(url, data)
+        self.assertEqual(ExportJob.objects.latest('pk').selection['pks'], [first.pk])
+        self.client.post(url, {**data, 'select_across': '1'})
+        selection = ExportJob.objects.latest('pk').selection
+        self.assertEqual((selection['params'], selection['pks']), ({'username': ['user1']}, None))
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = self.queue()
+        self.assertEqual(claim_next_job().pk, job.pk)
+        self.assertIsNone(claim_next_job())
+        self.go_stale(job)
+        reclaimed = claim_next_job()
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (job.pk, 2))
+        self.assertEqual(run_job(reclaimed).status, ExportJob.DONE)
+        self.assertEqual(ExportJob.objects.get(pk=job.pk).processed_rows, 6)
+
+    def test_job_failed_after_max_attempts(self):
+        job = self.queue()
+        for _ in range(export_jobs.MAX_ATTEMPTS):
+            self.assertEqual(claim_next_job().pk, job.pk)
+            self.go_stale(job)
+        self.assertIsNone(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.FAILED)
+        self.assertIn('stopped responding', job.error)
+
+    def test_reclaimed_worker_leaves_job_alone(self):
+        job = self.queue()
+        first = claim_next_job()
+        self.go_stale(job)
+        second = claim_next_job()
+        self.assertIn('claimed by another worker', run_job(first).error)
+        self.assertEqual(ExportJob.objects.get(pk=job.pk).status, ExportJob.RUNNING)
+        self.assertEqual(run_job(second).status, ExportJob.DONE)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), (ExportJob.DONE, 2, ''))
+        self.assertTrue(os.path.exists(job.file_path))
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentSerialTests(TransactionTestCase):
+    """First submissions for a new image racing on separate connections"""
+    threads = 8
+
+    def test_first_submissions_get_consecutive_serials(self):
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def submit(i):
+            try:
+                barrier.wait()
+                save_with_serial(ProcessedData(
+                    image_number='RACE-1', customer_reference_number=f'RACE {i}',
+                    customer_name='Racer', city_state='Austin , Texas',
+                ))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=submit, args=(i,)) for i in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        serials = ProcessedData.objects.filter(image_number='RACE-1').values_list('serial_number', flat=True)
+        self.assertEqual(sorted(serials), list(range(1, self.threads + 1)))
+
+
+class ChangelistIndexMixin:
+    """
+    EXPLAIN the keyset changelist's page query and check it runs on the
+    named (…, entry_timestamp, id) index. Set `model` and `index_prefix`.
+    """
+    model = None
+    index_prefix = None
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('indexes', password='pw')
+        now = timezone.now()
+        self.model.objects.bulk_create([
+            self.model(
+                image_number=f'IMG{i % 5}', serial_number=i, username=f'user{i % 3}',
+                customer_reference_number=f'IDX {i}', customer_name='Index', city_state='Austin , Texas',
+                entry_timestamp=now - timedelta(minutes=i),
+            )
+            for i in range(1, 61)
+        ])
+
+    def plan(self, params=None, cursor_var=None):
+        request = RequestFactory().get('/', params or {})
+        request.user = self.user
+        changelist = admin.site._registry[self.model].get_changelist_instance(request)
+        cursor = None
+        if cursor_var is not None:
+            cursor = self.model.objects.values_list('entry_timestamp', 'pk')[10]
+        return changelist.page_key_query('entry_timestamp', cursor_var, cursor).explain()
+
+    def assertUsesIndex(self, name, plan):
+        self.assertIn(f'{self.index_prefix}_{name}', plan)
+
+    def test_default_listing(self):
+        self.assertUsesIndex('entry_ts_idx', self.plan())
+        self.assertUsesIndex('entry_ts_idx', self.plan(cursor_var=AFTER_VAR))
+        self.assertUsesIndex('entry_ts_idx', self.plan(cursor_var=BEFORE_VAR))
+
+    def test_image_filter(self):
+        self.assertUsesIndex('image_ts_idx', self.plan({'image_number': 'IMG1'}))
+        self.assertUsesIndex('image_ts_idx', self.plan({'image_number': 'IMG1'}, cursor_var=AFTER_VAR))
+
+    def test_username_filter(self):
+        self.assertUsesIndex('user_ts_idx', self.plan({'username': 'user2'}))
+        self.assertUsesIndex('user_ts_idx', self.plan({'username': 'user2'}, cursor_var=AFTER_VAR))
+
+
+class ProcessedDataChangelistIndexTests(ChangelistIndexMixin, TestCase):
+    model = ProcessedData
+    index_prefix = 'processeddata'
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'keyset-local'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'keyset-shared'},
+})
+class KeysetWalkTests(TestCase):
+    """Keyset pages against OFFSET pages over the same ordering, ties included"""
+
+    def setUp(self):
+        caching._versions.clear()
+        self.addCleanup(caching._versions.clear)
+        self.user = User.objects.create_superuser('keyset', password='pw')
+        now = timezone.now()
+        rng = random.Random(21)
+        # Runs of up to four rows share a timestamp
+        timestamps = [now - timedelta(minutes=rng.randrange(30)) for _ in range(83)]
+        ProcessedData.objects.bulk_create([
+            ProcessedData(
+                image_number=f'IMG{i % 3}', serial_number=i, username=f'user{i % 2}',
+                customer_reference_number=f'WALK {i}', customer_name='Walk', city_state='Austin , Texas',
+                entry_timestamp=timestamp,
+            )
+            for i, timestamp in enumerate(timestamps)
+        ])
+        for i, timestamp in enumerate(timestamps[:57]):
+            row = CustomerData.objects.create(
+                emp_id='E1', image_number='WALK', serial_number=str(i), customer_reference_number=f'WALK {i}',
+                customer_name='Walk', city_state=f'City {i % 2}', purchase_value='100',
+                guarantor_name='G', guarantor_reference_number=f'G {i}',
+            )
+            CustomerData.objects.filter(pk=row.pk).update(created_at=timestamp)
+
+    def changelist(self, model, params):
+        request = RequestFactory().get('/', params)
+        request.user = self.user
+        return admin.site._registry[model].get_changelist_instance(request)
+
+    def walk(self, model, params, link):
+        """The pks of every page, following `link` ('next_url' or 'previous_url') from the first page"""
+        pages = []
+        changelist = self.changelist(model, params)
+        while True:
+            pages.append([row.pk for row in changelist.result_list])
+            url = getattr(changelist.keyset_page, link)
+            if url is None:
+                return pages
+            changelist = self.changelist(model, QueryDict(url.lstrip('?')))
+
+    def offset_pages(self, model, field, filters):
+        pks = list(model.objects.filter(**filters).order_by(f'-{field}', '-pk').values_list('pk', flat=True))
+        per_page = admin.site._registry[model].list_per_page
+        return [pks[start:start + per_page] for start in range(0, len(pks), per_page)]
+
+    def test_walk_matches_offset_pages(self):
+        for model, field, params, filters in (
+            (ProcessedData, 'entry_timestamp', {}, {}),
+            (ProcessedData, 'entry_timestamp', {'username': 'user1'}, {'username': 'user1'}),
+            (CustomerData, 'created_at', {}, {}),
+            (CustomerData, 'created_at', {'city_state': 'City 0'}, {'city_state': 'City 0'}),
+        ):
+            with self.subTest(model=model.__name__, params=params):
+                expected = self.offset_pages(model, field, filters)
+                self.assertGreater(len(expected), 1)
+                forward = self.walk(model, params, 'next_url')
+                self.assertEqual(forward, expected)
+
+                # And back again from the last page
+                last = self.changelist(model, params)
+                while last.keyset_page.next_url:
+                    last = self.changelist(model, QueryDict(last.keyset_page.next_url.lstrip('?')))
+                backward, changelist = [], last
+                while True:
+                    backward.append([row.pk for row in changelist.result_list])
+                    if changelist.keyset_page.previous_url is None:
+                        break
+                    changelist = self.changelist(model, QueryDict(changelist.keyset_page.previous_url.lstrip('?')))
+                # Pages line up with OFFSET pages except the newest, shown full
+                flattened = [pk for page in expected for pk in page]
+                self.assertEqual([pk for page in reversed(backward) for pk in page][-len(flattened):], flattened)
+                self.assertEqual(backward[-1], expected[0])
+
+    def test_filtered_count_memoized(self):
+        params = {'city_state': 'City 1'}
+        first = self.changelist(CustomerData, params)
+        self.assertEqual(first.result_count, CustomerData.objects.filter(city_state='City 1').count())
+        with CaptureQueriesContext(connection) as queries:
+            page = self.changelist(CustomerData, QueryDict(first.keyset_page.next_url.lstrip('?')))
+        self.assertEqual(page.result_count, first.result_count)
+        self.assertFalse([query['sql'] for query in queries.captured_queries if 'COUNT(' in query['sql'].upper()])
+
+        # A change drops the memoized count
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomerData.objects.filter(city_state='City 1').first().delete()
+        self.assertEqual(self.changelist(CustomerData, params).result_count, first.result_count - 1)
+
+
+# ——— Loan Engine Golden Values ———
+# 250,000 purchase, no reduction, 5% interest, full principal and interest,
+# 40% assessment rate, at each rate-band edge and either side of the period
+# cutoffs (20 years for PMI, 25 for insurance). 84.995 sits between the
+# listed edges and falls in the 85 band.
+
+GOLDEN_LOAN_FIELDS = (
+    'property_insurance_rate', 'pmi_rate', 'loan_amount', 'property_insurance_per_month',
+    'pmi_per_annum', 'final_principal', 'total_interest_for_period', 'property_tax_for_period',
+)
+
+# (loan %, years) → values of GOLDEN_LOAN_FIELDS
+GOLDEN_LOANS = {
+    ('84.99', 20): ('0.32', '0.19', '212475.00', '56.66', '475.00', '885.31', '212475.00', '33996.00'),
+    ('84.99', 21): ('0.32', '0.32', '212475.00', '56.66', '800.00', '843.15', '223098.75', '35695.80'),
+    ('84.99', 25): ('0.32', '0.32', '212475.00', '56.66', '800.00', '708.25', '265593.75', '42495.00'),
+    ('84.99', 26): ('0.32', '0.32', '212475.00', '56.66', '800.00', '681.00', '276217.50', '44194.80'),
+    ('84.995', 20): ('0.21', '0.19', '212487.50', '37.18', '475.00', '885.36', '212487.40', '33998.00'),
+    ('84.995', 21): ('0.21', '0.32', '212487.50', '37.18', '800.00', '843.20', '223111.77', '35697.90'),
+    ('84.995', 25): ('0.21', '0.32', '212487.50', '37.18', '800.00', '708.29', '265609.25', '42497.50'),
+    ('84.995', 26): ('0.32', '0.32', '212487.50', '56.66', '800.00', '681.04', '276233.62', '44197.40'),
+    ('85', 20): ('0.21', '0.19', '212500.00', '37.18', '475.00', '885.41', '212500.00', '34000.00'),
+    ('85', 21): ('0.21', '0.32', '212500.00', '37.18', '800.00', '843.25', '223125.00', '35700.00'),
+    ('85', 25): ('0.21', '0.32', '212500.00', '37.18', '800.00', '708.33', '265625.00', '42500.00'),
+    ('85', 26): ('0.32', '0.32', '212500.00', '56.66', '800.00', '681.08', '276250.00', '44200.00'),
+    ('85.01', 20): ('0.41', '0.23', '212525.00', '72.61', '575.00', '885.52', '212525.00', '34004.00'),
+    ('85.01', 21): ('0.41', '0.52', '212525.00', '72.61', '1300.00', '843.35', '223151.25', '35704.20'),
+    ('85.01', 25): ('0.41', '0.52', '212525.00', '72.61', '1300.00', '708.41', '265656.25', '42505.00'),
+    ('85.01', 26): ('0.52', '0.52', '212525.00', '92.09', '1300.00', '681.16', '276282.50', '44205.20'),
+    ('90', 20): ('0.41', '0.23', '225000.00', '76.87', '575.00', '937.50', '225000.00', '36000.00'),
+    ('90', 21): ('0.41', '0.52', '225000.00', '76.87', '1300.00', '892.85', '236250.00', '37800.00'),
+    ('90', 25): ('0.41', '0.52', '225000.00', '76.87', '1300.00', '750.00', '281250.00', '45000.00'),
+    ('90', 26): ('0.52', '0.52', '225000.00', '97.50', '1300.00', '721.15', '292500.00', '46800.00'),
+    ('95', 20): ('0.67', '0.26', '237500.00', '132.60', '650.00', '989.58', '237500.00', '38000.00'),
+    ('95', 21): ('0.67', '0.78', '237500.00', '132.60', '1950.00', '942.46', '249375.00', '39900.00'),
+    ('95', 25): ('0.67', '0.78', '237500.00', '132.60', '1950.00', '791.66', '296875.00', '47500.00'),
+    ('95', 26): ('0.78', '0.78', '237500.00', '154.37', '1950.00', '761.21', '308750.00', '49400.00'),
+    ('100', 20): ('0.85', '0.79', '250000.00', '177.08', '1975.00', '1041.66', '250000.00', '40000.00'),
+    ('100', 21): ('0.85', '0.90', '250000.00', '177.08', '2250.00', '992.06', '262500.00', '42000.00'),
+    ('100', 25): ('0.85', '0.90', '250000.00', '177.08', '2250.00', '833.33', '312500.00', '50000.00'),
+    ('100', 26): ('0.96', '0.90', '250000.00', '200.00', '2250.00', '801.28', '325000.00', '52000.00'),
+}
+
+# The columns every entry point stores, and what the engine calls them
+STORED_LOAN_FIELDS = {
+    'loan_amount': 'loan_amount',
+    'property_insurance_per_month': 'property_insurance_per_month',
+    'pmi_per_annum': 'pmi_per_annum',
+    'final_principal': 'final_principal',
+    'total_interest_for_period': 'total_interest_for_period',
+}
+
+
+def golden_form(loan_percent, years, n=0):
+    """The home form submission for a GOLDEN_LOANS case"""
+    return {
+        'image_number': 'GOLD', 'username': 'golden',
+        'input_text_ref': f'gold {loan_percent} {years} {n}', 'input_text1': 'Jane Doe',
+        'input_text2': 'John Doe', 'input_text3': 'Austin, TX', 'input_text4': 'two hundred fifty thousand dollars and zero cents',
+        'purchase_value_reduction': '0', 'down_payment': str(HUNDRED - Decimal(loan_percent)),
+        'loan_period': str(years), 'annual_interest': '5', 'monthly_principal_reduction': '100',
+        'total_interest_reduction': '100', 'assessment_reduction_rate': '40',
+    }
+
+
+class LoanGoldenValueTests(TestCase):
+    def expected(self, case):
+        return {field: Decimal(value) for field, value in zip(GOLDEN_LOAN_FIELDS, GOLDEN_LOANS[case])}
+
+    def test_calculate_loan(self):
+        for (loan_percent, years), values in GOLDEN_LOANS.items():
+            with self.subTest(loan_percent=loan_percent, years=years):
+                result = calculate_loan(LoanInput(
+                    original_amount=Decimal('250000'), purchase_value_reduction=Decimal('0'),
+                    down_payment=HUNDRED - Decimal(loan_percent), loan_period=years,
+                    annual_interest=Decimal('5'), monthly_principal_reduction=Decimal('100'),
+                    total_interest_reduction=Decimal('100'), assessment_reduction_rate=Decimal('40'),
+                ))
+                self.assertEqual({field: getattr(result, field) for field in GOLDEN_LOAN_FIELDS}, self.expected((loan_percent, years)))
+
+    def test_calculate_entry(self):
+        for case in GOLDEN_LOANS:
+            with self.subTest(case=case):
+                fields = calculate_entry(golden_form(*case))
+                expected = self.expected(case)
+                for column, field in STORED_LOAN_FIELDS.items():
+                    self.assertEqual(fields[column], expected[field], column)
+                self.assertEqual(fields['property_tax_for_period'], expected['property_tax_for_period'])
+                self.assertEqual(fields['customer_name'], 'JANE  DOE')
+
+    def test_home2(self):
+        for n, case in enumerate(GOLDEN_LOANS):
+            with self.subTest(case=case):
+                form = golden_form(*case, n=n)
+                response = self.client.post(reverse('home2'), form)
+                self.assertEqual(response.status_code, 200)
+                row = ProcessedData2.objects.get(customer_reference_number=process_reference(form['input_text_ref']))
+                expected = self.expected(case)
+                for column, field in STORED_LOAN_FIELDS.items():
+                    self.assertEqual(getattr(row, column), expected[field], column)
+                self.assertEqual(row.property_tax_for_period, expected['property_tax_for_period'])
+                self.assertEqual(row.customer_name, 'JANE   DOE')
+
+    def test_loan_calculator(self):
+        for case in GOLDEN_LOANS:
+            with self.subTest(case=case):
+                calculator = LoanCalculator()
+                calculator.calculate(golden_form(*case))
+                expected = self.expected(case)
+                for column, field in STORED_LOAN_FIELDS.items():
+                    self.assertEqual(getattr(calculator, column), expected[field], column)
+                self.assertEqual(calculator.calculate_property_insurance_rate(), expected['property_insurance_rate'])
+                self.assertEqual(calculator.calculate_pmi_rate(), expected['pmi_rate'])
+
+
+class LoanBatchEquivalenceTests(SimpleTestCase):
+    """The int64 NumPy path of app.loan_batch against calculate_loan, row by row"""
+
+    def assertMatchesEngine(self, rows):
+        import numpy as np
+
+        none = np.iinfo(np.int64).min
+        inputs = []
+        for purchase_value, down_payment, loan_period, assessment_rate in rows:
+            scaled = vector_inputs(purchase_value, down_payment, loan_period, stored_rate(assessment_rate))
+            self.assertIsNotNone(scaled, (purchase_value, down_payment, loan_period, assessment_rate))
+            inputs.append(scaled + (loan_period, stored_rate(assessment_rate) is not None))
+        purchase_value, down_payment, assessment_rate, loan_period, has_rate = (
+            np.array(column, dtype=np.int64) for column in zip(*inputs)
+        )
+        columns = recalculate_columns(purchase_value, down_payment, loan_period, assessment_rate, has_rate.astype(bool))
+        for index, row in enumerate(rows):
+            vector = {
+                column: None if columns[column][index] == none else Decimal(int(columns[column][index])).scaleb(-2)
+                for column in DERIVED_COLUMNS
+            }
+            self.assertEqual(vector, recalculate_row(*row), row)
+
+    def test_rate_table_boundaries(self):
+        rows = []
+        for loan_percent in ('79.9999', '80', '80.0001', '84.98', '84.99', '84.9901', '85', '85.0001',
+                             '89.9999', '90', '90.0001', '95', '95.0001', '99.9999', '100'):
+            for loan_period in (1, 19, 20, 21, 25, 26, 40):
+                rows.append((Decimal('250000.00'), str(HUNDRED - Decimal(loan_percent)), loan_period, '40'))
+        self.assertMatchesEngine(rows)
+
+    def test_zero_and_missing_rates(self):
+        rows = [
+            (Decimal('123456.78'), '0', 30, '0'),
+            (Decimal('123456.78'), '100', 30, '100'),
+            (Decimal('123456.78'), '20', 15, 'NA'),
+            (Decimal('123456.78'), '20', 15, 'na'),
+            (Decimal('123456.78'), '20', 15, ''),
+            (Decimal('123456.78'), '20', 15, None),
+            (Decimal('0.00'), '5', 10, '50'),
+            (Decimal('0.01'), '0', 1, '100'),
+        ]
+        self.assertMatchesEngine(rows)
+
+    def test_truncation_at_half_cents(self):
+        # Products landing on exactly half a cent, and just either side
+        rows = [
+            (Decimal(amount), down_payment, loan_period, rate)
+            for amount in ('0.05', '0.15', '1.25', '12.50', '99.95', '100.05', '1000.01', '9999.99')
+            for down_payment in ('10', '12.5', '50', '0.5')
+            for loan_period in (3, 7, 30)
+            for rate in ('50', '12.5', '0.5')
+        ]
+        self.assertMatchesEngine(rows)
+
+    def test_random_rows(self):
+        rng = random.Random(12)
+        rows = [
+            (
+                Decimal(rng.randrange(10 ** rng.randrange(1, 11))).scaleb(-2),
+                str(Decimal(rng.randrange(-200000, 1000001)).scaleb(-4)),
+                rng.randrange(1, 51),
+                rng.choice(('NA', '', str(Decimal(rng.randrange(0, 1000001)).scaleb(-4)))),
+            )
+            for _ in range(5000)
+        ]
+        self.assertMatchesEngine(rows)
+
+    def test_out_of_range_rows_use_the_engine(self):
+        for purchase_value, down_payment, loan_period, rate in (
+            (Decimal(MAX_CENTS + 1).scaleb(-2), '20', 30, Decimal('40')),
+            (Decimal('250000.00'), '100.0001', 30, Decimal('40')),
+            (Decimal('250000.00'), '-100.0001', 30, Decimal('40')),
+            (Decimal('250000.00'), '-1000000000', 30, Decimal('40')),
+            (Decimal('250000.00'), '20', 30, Decimal('100.0001')),
+            (Decimal('250000.00'), '20', MAX_LOAN_PERIOD + 1, Decimal('40')),
+            (Decimal('250000.00'), '20.00001', 30, Decimal('40')),
+            (Decimal('250000.001'), '20', 30, None),
+        ):
+            with self.subTest(purchase_value=purchase_value, down_payment=down_payment, loan_period=loan_period, rate=rate):
+                self.assertIsNone(vector_inputs(purchase_value, down_payment, loan_period, rate))
+        # The largest rows the vector path takes still match
+        self.assertMatchesEngine([
+            (Decimal(MAX_CENTS).scaleb(-2), '-100', MAX_LOAN_PERIOD, '100'),
+            (Decimal(-MAX_CENTS).scaleb(-2), '100', 30, '100'),
+        ])
+
+
+class NumberWordsTests(SimpleTestCase):
+    def assertParseError(self, text, token, reason):
+        with self.assertRaises(AmountParseError) as caught:
+            convert_alphanumeric_to_decimal(text)
+        error = caught.exception
+        self.assertEqual(error.token, token, text)
+        self.assertIn(reason, str(error))
+        if token is not None:
+            # The offset points at the token in the text as typed
+            self.assertEqual(text[error.offset:error.offset + len(token)], token, text)
+            self.assertTrue(str(error).endswith(f"at character {error.offset + 1}"))
+
+    def test_amounts(self):
+        for text, amount in (
+            ('One Thousand Twenty Three Dollars and Five Cents', '1023.05'),
+            ('$ Four Hundred Seventy Three Billion Five Hundred Six Million Dollars and Ninety Nine Cents', '473506000000.99'),
+            ('  $ one   hundred  dollars and zero cents ', '100'),
+            ('ONE HUNDRED DOLLARS AND ZERO CENTS', '100'),
+            ('Zero Dollars and Zero Cents', '0'),
+            ('One Trillion, Two Million, Three Dollars and One Cents', '1000002000003.01'),
+        ):
+            self.assertEqual(convert_alphanumeric_to_decimal(text), Decimal(amount), text)
+
+    def test_and(self):
+        self.assertEqual(parse_number('One Hundred and Five'), 105)
+        self.assertEqual(parse_number('One Hundred Thousand and Five'), 100005)
+        self.assertEqual(parse_number('Two Million and Three Hundred and Four'), 2000304)
+        self.assertParseError('And Five Dollars and One Cents', 'And', "'and' must follow")
+        self.assertParseError('Twenty and Five Dollars and One Cents', 'and', "'and' must follow")
+        self.assertParseError('One Hundred and and Five Dollars and One Cents', 'and', "'and' must follow")
+        self.assertParseError('One Hundred and Dollars and Zero Cents', 'and', "'and' must be followed by a number")
+        self.assertParseError('One Thousand and Million Dollars and Zero Cents', 'Million', "'and' must be followed by a number")
+
+    def test_hyphenated_tens(self):
+        self.assertEqual(parse_number('Twenty-Three'), 23)
+        self.assertEqual(parse_number('Nine Hundred Ninety-nine Thousand'), 999000)
+        self.assertEqual(parse_number('Twenty-Three'), parse_number('Twenty Three'))
+        for token in ('Twenty-Ten', 'Three-Twenty', 'Twenty-Zero', 'Twenty-One-Two', 'Twenty-Thre'):
+            self.assertParseError(f'{token} Dollars and Zero Cents', token, 'hyphenated number')
+        self.assertParseError('Forty Five-Two Dollars and Zero Cents', 'Five-Two', 'hyphenated number')
+
+    def test_scale_order(self):
+        self.assertParseError('Five Thousand Million Dollars and Zero Cents', 'Million', "cannot come after 'Thousand'")
+        self.assertParseError('One Million Two Million Dollars and Zero Cents', 'Million', "cannot come after 'Million'")
+        self.assertParseError('Thousand Dollars and Zero Cents', 'Thousand', 'needs a number before it')
+        self.assertParseError('Hundred Dollars and Zero Cents', 'Hundred', 'needs a number from one to ninety nine')
+        self.assertParseError('One Hundred Hundred Dollars and Zero Cents', 'Hundred', 'needs a number from one to ninety nine')
+        self.assertParseError('Twenty Thirty Dollars and Zero Cents', 'Thirty', "cannot follow 'Twenty'")
+        self.assertParseError('Five Twenty Dollars and Zero Cents', 'Twenty', "cannot follow 'Five'")
+        self.assertParseError('Twenty Eleven Dollars and Zero Cents', 'Eleven', "cannot follow 'Twenty'")
+        self.assertParseError('Zero One Dollars and Zero Cents', 'One', "Nothing may follow 'Zero'")
+        self.assertParseError('One Zero Dollars and Zero Cents', 'Zero', "'zero' cannot be part")
+
+    def test_bad_tokens(self):
+        self.assertParseError('Twenty Thre Dollars and Zero Cents', 'Thre', "(did you mean 'three'?)")
+        self.assertParseError('One Thousnd Dollars and Zero Cents', 'Thousnd', "(did you mean 'thousand'?)")
+        self.assertParseError('One Banana Dollars and Zero Cents', 'Banana', "'Banana' is not a number word")
+        self.assertParseError('Five 7 Dollars and One Cents', '7', "'7' is not allowed")
+        self.assertParseError('Five Dollars and One Hundred Cents', 'One Hundred', 'Cents must be below one hundred')
+        # Offsets count the text as typed, spacing and all, not the cached phrase
+        self.assertParseError('  $  Twenty    Thre  Dollars and Zero Cents', 'Thre', 'not a number word')
+        self.assertParseError('Five Dollars and Twnety Cents', 'Twnety', "(did you mean 'twenty'?)")
+        self.assertParseError('Five Dollars', None, "of the form '<…> dollars and <…> cents'")
+
+    def test_old_parser_inputs(self):
+        # Well-formed amounts as the operators type them read as the old parser read them
+        rng = random.Random(14)
+        for _ in range(2000):
+            text = typed_variant(rng, f"{spell(rng.randrange(10 ** 13))} Dollars and {spell(rng.randrange(100))} Cents")
+            self.assertEqual(convert_alphanumeric_to_decimal(text), legacy_convert(text), text)
+        for text in ('$One Hundred and Five Dollars and Ten Cents', '$ Nine Dollars and Nine Cents'):
+            self.assertEqual(convert_alphanumeric_to_decimal(text), legacy_convert(text), text)
+
+    def test_cache_shared_across_spellings(self):
+        _convert_phrase.cache_clear()
+        for text in ('One Dollars and Two Cents', 'ONE  dollars and two CENTS', ' one Dollars And Two Cents '):
+            self.assertEqual(convert_alphanumeric_to_decimal(text), Decimal('1.02'))
+        self.assertEqual(_convert_phrase.cache_info().misses, 1)
+
+    def test_parse_many(self):
+        self.assertEqual(
+            parse_many(['One Dollars and Zero Cents', 'junk', 'One Dollars and Zero Cents', 'Ten Dollars and Ten Cents']),
+            [Decimal('1'), None, Decimal('1'), Decimal('10.10')],
+        )
+
+    def test_api_amount(self):
+        response = self.client.get(reverse('check_amount'), {'text': 'One Thousand Dollars and Five Cents'})
+        self.assertEqual(response.json(), {
+            'text': 'One Thousand Dollars and Five Cents', 'valid': True, 'amount': '1000.05', 'formatted': '1,000.05',
+        })
+        response = self.client.get(reverse('check_amount'), {'text': 'One Thousnd Dollars and Five Cents'})
+        self.assertEqual(response.json(), {
+            'text': 'One Thousnd Dollars and Five Cents', 'valid': False,
+            'error': "'Thousnd' is not a number word (did you mean 'thousand'?) at character 5",
+            'token': 'Thousnd', 'offset': 4,
+        })
+        response = self.client.get(reverse('check_amount'), {'text': ''})
+        self.assertEqual(response.json(), {
+            'text': '', 'valid': False, 'error': "Input must be of the form '<…> dollars and <…> cents'.",
+            'token': None, 'offset': 0,
+        })
+
+
+class CurrencyFormatTests(SimpleTestCase):
+    """format_number_with_commas against the reverse-and-regroup formatter it replaced"""
+
+    def assertSameAsLegacy(self, value):
+        self.assertEqual(format_number_with_commas(value), legacy_format_number_with_commas(value), value)
+
+    def test_none(self):
+        self.assertEqual(format_number_with_commas(None), "NA")
+        self.assertSameAsLegacy(None)
+
+    def test_three_digits_or_fewer(self):
+        for value in (0, 5, 99, 999, Decimal('0'), Decimal('0.01'), Decimal('7.5'), Decimal('999.99'), 12.3):
+            self.assertSameAsLegacy(value)
+        self.assertEqual(format_number_with_commas(Decimal('999.99')), "$  999.99")
+        self.assertEqual(format_number_with_commas(Decimal('1000')), "$  1  ,  000.00")
+
+    def test_half_cent_rounding(self):
+        for text in ('0.005', '0.015', '0.125', '2.675', '999.995', '1234.565', '1000000.005', '9999999.995'):
+            self.assertSameAsLegacy(Decimal(text))
+            self.assertSameAsLegacy(float(text))
+
+    def test_random_amounts(self):
+        rng = random.Random(15)
+        for value in sample_amounts(20000, seed=15):
+            self.assertSameAsLegacy(value)
+            self.assertSameAsLegacy(float(value))
+        for _ in range(5000):
+            self.assertSameAsLegacy(rng.randrange(10 ** 15))
+
+    def test_negative_values(self):
+        # Documented change: the old code grouped the sign as a digit
+        self.assertEqual(legacy_format_number_with_commas(Decimal('-100')), "$  -  ,  100.00")
+        self.assertEqual(format_number_with_commas(Decimal('-100')), "$  -100.00")
+        for value in sample_amounts(2000, seed=16):
+            if value.quantize(Decimal('0.01')):
+                self.assertEqual(format_number_with_commas(-value), "$  -" + format_number_with_commas(value)[3:])
+
+
+class ExportPercentTests(SimpleTestCase):
+    """Percentages leave the export as typed, not padded to the column's places"""
+
+    def test_plain_decimal(self):
+        for stored, exported in (('7.5000', '7.5'), ('12.0000', '12'), ('100.0000', '100'),
+                                 ('0.1250', '0.125'), ('0.0000', '0')):
+            self.assertEqual(str(plain_decimal(Decimal(stored))), exported)
+        self.assertIsNone(plain_decimal(None))
+
+
+class TypedFigureMigrationTests(SimpleTestCase):
+    """What app4 0006 refuses to convert, and the figures it takes"""
+
+    def test_figure_problem(self):
+        figure_problem = import_module('app4.migrations.0006_typed_numeric_columns').figure_problem
+        for column, text in (
+            ('purchase_value', ''), ('purchase_value', 'NA'), ('purchase_value', '$ 1,25,000.005'),
+            ('purchase_value', 'Two Hundred Five Thousand Dollars and Twenty-One Cents'),
+            ('down_payment_percent', None), ('down_payment_percent', 'n/a'), ('down_payment_percent', '7.5 %'),
+            ('down_payment_percent', '7.1234'), ('loan_period_years', '30'),
+        ):
+            self.assertIsNone(figure_problem(column, text), (column, text))
+        for column, text, problem in (
+            ('purchase_value', 'One Thousand Million Dollars and Zero Cents', 'not a number'),
+            ('purchase_value', 'Hundred Dollars and Zero Cents', 'not a number'),
+            ('purchase_value', '1e30', 'too large'),
+            ('down_payment_percent', 'ten', 'not a number'),
+            ('down_payment_percent', '7.12345', 'more than 4 decimal places'),
+            ('down_payment_percent', '1000000', 'too large'),
+            ('loan_period_years', '7.5', 'not a whole number of years up to 32767'),
+        ):
+            self.assertEqual(figure_problem(column, text), problem, (column, text))
+
+    def test_huge_purchase_value(self):
+        self.assertIsNone(parse_purchase_value('1e30'))
+        self.assertEqual(parse_purchase_value('$ 1,25,000.009'), Decimal('125000.00'))
+
+
+class CustomerDataSummaryTests(TestCase):
+    """The running totals of app4.summary against a full rebuild"""
+
+    def create(self, n, rng):
+        return CustomerData.objects.create(
+            emp_id='E1', image_number='SUM', serial_number=str(n), customer_reference_number=f'SUM {n}',
+            customer_name='Summary', city_state='Austin , Texas', guarantor_name='G',
+            guarantor_reference_number=f'G {n}', purchase_value=self.purchase_value(rng),
+            loan_period_years=rng.choice((None, 15, 30)),
+            annual_interest_rate_percent=rng.choice((None, Decimal('5.2500'), Decimal('7.125'))),
+        )
+
+    def purchase_value(self, rng):
+        return rng.choice(('', 'NA', '125000', '$ 1,25,000.50', 'Ten Thousand Dollars and Five Cents', 'junk'))
+
+    def assertTotalsMatchRebuild(self):
+        self.assertEqual(
+            {field: Decimal(value) for field, value in summary.stored_totals().items()},
+            {field: Decimal(value) for field, value in summary.aggregate_totals(CustomerData.objects.all()).items()},
+        )
+
+    def test_incremental_totals_match_rebuild(self):
+        rng = random.Random(22)
+        rows = [self.create(n, rng) for n in range(40)]
+        self.assertTotalsMatchRebuild()
+        for row in rng.sample(rows, 20):
+            row.purchase_value = self.purchase_value(rng)
+            row.loan_period_years = rng.choice((None, 10, 20))
+            row.annual_interest_rate_percent = rng.choice((None, Decimal('3.5')))
+            row.save()
+        for row in rng.sample(rows, 10):
+            row.loan_period_years = 25
+            row.save(update_fields=['loan_period_years'])
+        for row in rng.sample(rows, 10):
+            row.customer_name = 'Renamed'
+            row.save(update_fields=['customer_name'])
+        self.assertTotalsMatchRebuild()
+        for row in rows[:5]:
+            row.delete()
+        CustomerData.objects.filter(serial_number__in=['10', '11', '12']).delete()
+        self.assertTotalsMatchRebuild()
+        self.assertEqual(summary.stored_totals()['record_count'], 32)
+
+    def test_failed_delta_rolls_back_row(self):
+        rng = random.Random(23)
+        row = self.create(0, rng)
+        before = summary.stored_totals()
+        with mock.patch.object(summary, 'apply_delta', side_effect=DatabaseError('summary write failed')):
+            with self.assertRaises(DatabaseError):
+                self.create(1, rng)
+            row.purchase_value = '999'
+            with self.assertRaises(DatabaseError):
+                row.save()
+        self.assertFalse(CustomerData.objects.filter(serial_number='1').exists())
+        row.refresh_from_db()
+        self.assertNotEqual(row.purchase_value, '999')
+        self.assertEqual(summary.stored_totals(), before)
+        self.assertTotalsMatchRebuild()
+
+
+class DataEntryOffEventLoopTests(TestCase):
+    """The async data-entry views must not read the workbook index on the event loop"""
+
+    def post(self, url_name):
+        calls = []
+        real_get_index = assessment_rates.get_index
+
+        def get_index(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                calls.append('event loop')
+            except RuntimeError:
+                calls.append('thread')
+            return real_get_index(*args, **kwargs)
+
+        form = {**golden_form('90', 20, n=url_name), 'assessment_reduction_rate': '', 'input_text3': 'Austn, TX'}
+        with mock.patch('app.assessment_rates.get_index', get_index), mock.patch('app.location_search.get_index', get_index):
+            response = self.client.post(reverse(url_name), form, follow=True)
+        self.assertTrue(calls)
+        self.assertNotIn('event loop', calls)
+        return [str(message) for message in response.context['messages']]
+
+    def test_home(self):
+        self.assertTrue(any('Did you mean' in message for message in self.post('home')))
+
+    def test_home2(self):
+        self.assertTrue(any('Did you mean' in message for message in self.post('home2')))
+
+
+class DisplayColumnMigrationTests(TestCase):
+    """The frozen backfill in the migrations adding the display columns against display_columns()"""
+
+    migrations = {
+        ProcessedData: 'app.migrations.0012_display_columns',
+        ProcessedData2: 'app2.migrations.0007_display_columns',
+    }
+
+    def create_rows(self, model):
+        rng = random.Random(16)
+        rows = [
+            model(
+                image_number='DISPLAY', serial_number=i, customer_reference_number=f'DISPLAY {i}',
+                customer_name='Display', city_state='Austin , Texas',
+                purchase_value_excel=Decimal(rng.randrange(10 ** 11)).scaleb(-2),
+                down_payment_percent=rng.choice(('0', '5', '10.5', '20', '20.00', '100', 'abc')),
+                loan_period_years=rng.randrange(1, 41),
+                annual_interest_rate=Decimal(rng.randrange(10000)).scaleb(-2),
+                loan_amount=Decimal(rng.randrange(10 ** 10)).scaleb(-2),
+                final_principal=Decimal(rng.randrange(10 ** 7)).scaleb(-2),
+                total_interest_for_period=Decimal(rng.randrange(10 ** 9)).scaleb(-2),
+                property_insurance_per_month=Decimal(rng.randrange(10 ** 6)).scaleb(-2),
+                pmi_per_annum=rng.choice((None, Decimal(rng.randrange(10 ** 7)).scaleb(-2))),
+                assessment_reduction_rate=rng.choice((None, '', 'NA', 'na', '40', '12.5')),
+                property_tax_for_period=rng.choice((None, Decimal(rng.randrange(10 ** 8)).scaleb(-2))),
+            )
+            for i in range(200)
+        ]
+        model.objects.bulk_create(rows)
+        # As the rows stood when the columns were added
+        model.objects.update(**{column: '' for column in DISPLAY_COLUMNS})
+
+    def test_backfill_matches_display_columns(self):
+        for model, migration in self.migrations.items():
+            with self.subTest(model=model.__name__):
+                self.create_rows(model)
+                import_module(migration).fill_display_columns(django_apps, SimpleNamespace(connection=connection))
+                for row in model.objects.values('pk', *DISPLAY_SOURCE_COLUMNS, *DISPLAY_COLUMNS):
+                    self.assertEqual({column: row[column] for column in DISPLAY_COLUMNS}, display_columns(row), row['pk'])
+
+
+class ReferenceTests(TestCase):
+    def test_process_reference(self):
+        self.assertEqual(process_reference('ab 12'), 'AB   12')
+        self.assertEqual(process_reference('  ab \t 12  x '), 'AB   12   X')
+        self.assertEqual(process_reference(None), '')
+        for text in ('ab 12', 'AB   12', 'ab  12', ' x y z '):
+            once = process_reference(text)
+            self.assertEqual(process_reference(once), once, text)
+
+    def test_reference_key(self):
+        for text in ('ab 12', 'AB   12', 'Ab12', ' a b 1 2 '):
+            self.assertEqual(reference_key(text), 'AB12', text)
+            self.assertEqual(reference_key(process_reference(text)), 'AB12', text)
+        self.assertIsNone(reference_key(''))
+        self.assertIsNone(reference_key('   '))
+        self.assertIsNone(reference_key(None))
+        self.assertEqual(len(reference_key('x' * 300)), 255)
+
+    def test_admin_resave_keeps_reference(self):
+        request = RequestFactory().post('/')
+        request.user = User.objects.create_superuser('references', password='pw')
+        for model in (ProcessedData, ProcessedData2):
+            with self.subTest(model=model.__name__):
+                model_admin = admin.site._registry[model]
+                obj = model(image_number='REF', serial_number=1, customer_reference_number='ab 12',
+                            customer_name='Ref', city_state='Austin , Texas')
+                model_admin.save_model(request, obj, None, False)
+                for _ in range(3):
+                    obj = model.objects.get(pk=obj.pk)
+                    model_admin.save_model(request, obj, None, True)
+                obj.refresh_from_db()
+                self.assertEqual(obj.customer_reference_number, 'AB   12')
+                self.assertEqual(obj.customer_reference_key, 'AB12')
+
+    def test_admin_search_by_reference(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser('references', password='pw')
+        for model in (ProcessedData, ProcessedData2):
+            with self.subTest(model=model.__name__):
+                match = model.objects.create(
+                    image_number='REF', serial_number=1, customer_reference_number=process_reference('ab 12'),
+                    customer_name='Ref', city_state='Austin , Texas',
+                )
+                guarantor = model.objects.create(
+                    image_number='REF', serial_number=2, customer_reference_number=process_reference('cd 34'),
+                    guarantor_reference_number='Ab  12', customer_name='Ref', city_state='Austin , Texas',
+                )
+                model.objects.create(
+                    image_number='REF', serial_number=3, customer_reference_number=process_reference('ab 123'),
+                    customer_name='Ref', city_state='Austin , Texas',
+                )
+                model_admin = admin.site._registry[model]
+                for term in ('ab 12', 'AB12', ' a b 1 2 '):
+                    results, may_have_duplicates = model_admin.get_search_results(request, model.objects.all(), term)
+                    self.assertEqual(set(results), {match, guarantor}, term)
+                    self.assertFalse(may_have_duplicates)
+                self.assertFalse(lookup_reference(model.objects.all(), '  ').exists())
+
+    def test_migration_fills_keys(self):
+        for model, migration in ((ProcessedData, 'app.migrations.0014_reference_keys'),
+                                 (ProcessedData2, 'app2.migrations.0009_reference_keys')):
+            with self.subTest(model=model.__name__):
+                model.objects.bulk_create([
+                    model(image_number='REF', serial_number=i, customer_reference_number=f'ref  {i}',
+                          guarantor_reference_number=[None, '', f' g {i} '][i % 3],
+                          customer_name='Ref', city_state='Austin , Texas')
+                    for i in range(30)
+                ])
+                model.objects.update(customer_reference_key=None, guarantor_reference_key=None)
+                import_module(migration).fill_keys(django_apps, SimpleNamespace(connection=connection))
+                for row in model.objects.all():
+                    self.assertEqual(row.customer_reference_key, reference_key(row.customer_reference_number))
+                    self.assertEqual(row.guarantor_reference_key, reference_key(row.guarantor_reference_number))
+
+
+@skipUnless(connection.vendor == 'sqlite', "The FTS5 index is SQLite's")
+class FullTextSearchTests(TestCase):
+    """The SQLite FTS5 index behind the ProcessedData admin search"""
+
+    names = ['Smith', 'Jones', 'Garcia', 'Nguyen', 'Okafor', 'Brown', 'Kowalski', 'Haddad']
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_superuser('fulltext', password='pw')
+        self.model_admin = admin.site._registry[ProcessedData]
+        rng = random.Random(24)
+        for i in range(60):
+            first, last = rng.sample(self.names, 2)
+            ProcessedData.objects.create(
+                image_number=f'IMG{i % 7}', serial_number=i, username=rng.choice(('alice', 'bob', 'carol')),
+                customer_reference_number=f'FT {i}', customer_name=f'{first} {last}', city_state='Austin , Texas',
+                guarantor_name=rng.choice(self.names),
+            )
+
+    def fresh_index(self):
+        """An index whose availability has not been checked in this process"""
+        index = self.model_admin.fulltext_index
+        return FullTextIndex(index.table, index.columns)
+
+    def indexed(self, term, index=None):
+        return self.model_admin.fulltext_index.filter(ProcessedData.objects.all(), search_words(term)) \
+            if index is None else index.filter(ProcessedData.objects.all(), search_words(term))
+
+    def stock(self, term):
+        results, _ = ModelAdmin.get_search_results(self.model_admin, self.request, ProcessedData.objects.all(), term)
+        return set(results)
+
+    def test_match_agrees_with_icontains(self):
+        # Every search word starts a word of the data, so both searches find the same rows
+        for term in ('smith', 'SMI', 'garcia jones', 'okafor alice', 'img3', 'img3 bob', 'ngu hadd', 'kowalski carol img1', 'nobody'):
+            with self.subTest(term=term):
+                indexed = self.indexed(term)
+                self.assertIsNotNone(indexed)
+                self.assertEqual(set(indexed), self.stock(term))
+        results, may_have_duplicates = self.model_admin.get_search_results(self.request, ProcessedData.objects.all(), 'garcia')
+        self.assertEqual(set(results), self.stock('garcia'))
+        self.assertFalse(may_have_duplicates)
+
+    def test_word_prefixes_only(self):
+        # "mith" is inside "Smith" but starts no word
+        self.assertTrue(self.stock('mith'))
+        self.assertEqual(list(self.indexed('mith')), [])
+
+    def test_triggers_keep_index_in_step(self):
+        row = ProcessedData.objects.create(
+            image_number='IMG9', serial_number=100, customer_reference_number='FT 100',
+            customer_name='Zebulon Quist', city_state='Austin , Texas',
+        )
+        self.assertEqual(list(self.indexed('zebulon')), [row])
+        row.customer_name = 'Yusuf Quist'
+        row.save()
+        self.assertEqual(list(self.indexed('zebulon')), [])
+        self.assertEqual(list(self.indexed('yusuf quist')), [row])
+        ProcessedData.objects.filter(pk=row.pk).update(guarantor_name='Xavier')
+        self.assertEqual(list(self.indexed('xavier')), [row])
+        row.delete()
+        self.assertEqual(list(self.indexed('quist')), [])
+        self.assertEqual(set(self.indexed('smith')), self.stock('smith'))
+
+    def test_missing_triggers(self):
+        index = self.fresh_index()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER "{index.name}_ai"')
+        # No DDL on the request path: the search falls back to the stock one
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(index.available())
+            self.assertIsNone(self.indexed('smith', index))
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries.captured_queries))
+
+        # Rows written while the trigger was gone are picked up when migrate restores it
+        row = ProcessedData.objects.create(
+            image_number='IMG9', serial_number=101, customer_reference_number='FT 101',
+            customer_name='Wendeline Quist', city_state='Austin , Texas',
+        )
+        restore_fulltext_triggers(using=connection.alias)
+        index = self.fresh_index()
+        self.assertTrue(index.available())
+        self.assertEqual(list(self.indexed('wendeline', index)), [row])
+        self.assertFalse(index.restore_triggers(connection))
+
+    def test_index_never_created(self):
+        index = FullTextIndex('app_not_indexed', ('customer_name',))
+        self.assertFalse(index.restore_triggers(connection))
+        self.assertFalse(index.available())
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        # Versions read by earlier tests belong to rolled-back rows
+        caching._versions.clear()
+        self.addCleanup(caching._versions.clear)
+        caches[caching.LOCAL].clear()
+
+    def test_invalidate_bumps_version_on_commit(self):
+        self.assertEqual(namespace_version('tests'), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate('tests')
+            # Not before the transaction commits
+            self.assertEqual(namespace_version('tests'), 1)
+        self.assertEqual(namespace_version('tests'), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate('tests')
+            invalidate('tests')
+        self.assertEqual(namespace_version('tests'), 4)
+
+    def test_invalidate_drops_entries(self):
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return len(computed)
+
+        self.assertEqual(get_or_compute('tests', 'value', (), compute, shared=False), 1)
+        self.assertEqual(get_or_compute('tests', 'value', (), compute, shared=False), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate('tests')
+        self.assertEqual(get_or_compute('tests', 'value', (), compute, shared=False), 2)
+
+    def test_local_hit_runs_no_queries(self):
+        get_or_compute('tests', 'value', (), lambda: 1, shared=False)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_or_compute('tests', 'value', (), lambda: 2, shared=False), 1)
+
+    def test_version_reread_after_ttl(self):
+        self.assertEqual(namespace_version('tests'), 1)
+        # Another worker's bump
+        CacheVersion.objects.create(namespace='tests', version=5)
+        self.assertEqual(namespace_version('tests'), 1)
+        with mock.patch.object(caching.time, 'monotonic', return_value=time.monotonic() + caching.VERSION_TTL):
+            self.assertEqual(namespace_version('tests'), 5)
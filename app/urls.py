@@ -4,4 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('results/', views.results, name='results'),
-]
\ No newline at end of file
+    path('api/cities', views.city_suggestions, name='city_suggestions'),
+    path('api/amount', views.check_amount, name='check_amount'),
+]
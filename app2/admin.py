@@ -1,81 +1,30 @@
 from django.contrib import admin
 from .models import ProcessedData2
-from django.http import HttpResponse
-import xlwt
+from app.caching import CachedCountPaginator
+from app.export_jobs import queue_export
+from app.fulltext import FullTextIndex, FullTextSearchMixin
+from app.keyset import KeysetPaginationMixin
+from app.references import ReferenceSearchMixin, process_reference
 from datetime import datetime
 from django.utils import timezone
 from rangefilter.filters import DateRangeFilter
 
 @admin.register(ProcessedData2)
-class ProcessedDataAdmin2(admin.ModelAdmin):
+class ProcessedDataAdmin2(ReferenceSearchMixin, FullTextSearchMixin, KeysetPaginationMixin, admin.ModelAdmin):
     list_display = ('image_number', 'serial_number', 'username', 'customer_name', 'city_state', 
                    'purchase_value_and_down_payment', 'loan_period_and_interest', 
                    'loan_amount_and_principal', 'insurance_and_pmi', 'formatted_property_tax', 'entry_timestamp')
     list_filter = (('entry_timestamp', DateRangeFilter), 'image_number', 'username')
     search_fields = ('image_number', 'username', 'customer_name', 'customer_reference_number', 'guarantor_name')
+    fulltext_index = FullTextIndex(ProcessedData2._meta.db_table, search_fields)
     readonly_fields = ('entry_timestamp', 'loan_period_and_interest', 
                       'purchase_value_and_down_payment', 'loan_amount_and_principal',
                       'insurance_and_pmi', 'formatted_property_tax')
     actions = ['export_to_excel']
     
     def export_to_excel(self, request, queryset):
-        """Export selected records to Excel"""
-        response = HttpResponse(content_type='application/ms-excel')
-        response['Content-Disposition'] = 'attachment; filename="processed_data.xls"'
-
-        wb = xlwt.Workbook(encoding='utf-8')
-        ws = wb.add_sheet('Processed Data')
-
-        # Write headers
-        headers = [
-            'Image Number',
-            'Serial Number',
-            'Username',
-            'Customer Reference Number',
-            'Customer Name',
-            'City, State',
-            'Purchase Value and Down Payment',
-            'Loan Period and Annual Interest',
-            'Guarantor Name',
-            'Guarantor Reference Number',
-            'Loan Amount and Principal',
-            'Total Interest for Loan Period and Property Tax for Loan Period',
-            'Property Insurance per Month and PMI per Annum'
-        ]
-        
-        font_style = xlwt.XFStyle()
-        font_style.font.bold = True
-
-        for col_num, header in enumerate(headers):
-            ws.write(0, col_num, header, font_style)
-
-        # Write data rows
-        font_style = xlwt.XFStyle()
-        row_num = 1
-        
-        for obj in queryset:
-            row = [
-                obj.image_number,
-                obj.serial_number,
-                obj.username,
-                obj.customer_reference_number,
-                obj.customer_name,
-                obj.city_state,
-                f"{obj.format_purchase_value()} AND {obj.down_payment_percent} %",
-                f"{obj.loan_period_years} YEARS AND {obj.annual_interest_rate} %",
-                obj.guarantor_name,
-                obj.guarantor_reference_number or '',
-                f"{obj.format_number_with_commas(obj.loan_amount)} AND {obj.format_number_with_commas(obj.final_principal)}",
-                f"{obj.format_number_with_commas(obj.total_interest_for_period)} AND {obj.formatted_property_tax}",
-                f"{obj.format_number_with_commas(obj.property_insurance_per_month)} AND {obj.format_number_with_commas(obj.pmi_per_annum) if obj.pmi_per_annum else 'NA'}"
-            ]
-            
-            for col_num, cell_value in enumerate(row):
-                ws.write(row_num, col_num, str(cell_value), font_style)
-            row_num += 1
-
-        wb.save(response)
-        return response
+        """Queue the selected records for export to Excel"""
+        return queue_export(request, 'processed_data2_xlsx', queryset)
     export_to_excel.short_description = "Export selected records to Excel"
     
     fieldsets = (
@@ -112,10 +61,12 @@ class ProcessedDataAdmin2(admin.ModelAdmin):
     )
     
     list_per_page = 20
+    paginator = CachedCountPaginator
     save_on_top = True
     ordering = ('-entry_timestamp',)
+    keyset_field = 'entry_timestamp'
 
     def save_model(self, request, obj, form, change):
         if obj.customer_reference_number:
-            obj.customer_reference_number = obj.customer_reference_number.strip().upper().replace(' ', '   ')
+            obj.customer_reference_number = process_reference(obj.customer_reference_number)
         super().save_model(request, obj, form, change)
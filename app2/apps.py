@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class App2Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app2'
+
+    def ready(self):
+        from app.caching import processed_data_changed
+
+        post_save.connect(processed_data_changed, sender='app2.ProcessedData2')
+        post_delete.connect(processed_data_changed, sender='app2.ProcessedData2')
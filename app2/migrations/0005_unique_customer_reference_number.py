@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app2', '0004_processeddata2_assessment_reduction_rate_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processeddata2',
+            name='customer_reference_number',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
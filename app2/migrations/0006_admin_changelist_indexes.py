@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app2', '0005_unique_customer_reference_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processeddata2',
+            index=models.Index(fields=['entry_timestamp', 'id'], name='processeddata2_entry_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processeddata2',
+            index=models.Index(fields=['image_number', 'entry_timestamp', 'id'], name='processeddata2_image_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processeddata2',
+            index=models.Index(fields=['username', 'entry_timestamp', 'id'], name='processeddata2_user_ts_idx'),
+        ),
+    ]
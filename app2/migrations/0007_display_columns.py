@@ -0,0 +1,143 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:49
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models, transaction
+
+# ——— Frozen Helpers ———
+# Copies of app.formatting.display_columns and app.display_backfill as they
+# were when this migration was written, so later changes there cannot
+# change what it does.
+
+BATCH_SIZE = 10000
+UPDATE_BATCH_SIZE = 1000
+
+THOUSANDS_SEPARATOR = "  ,  "
+DISPLAY_SOURCE_COLUMNS = (
+    'purchase_value_excel', 'down_payment_percent', 'loan_period_years',
+    'annual_interest_rate', 'loan_amount', 'final_principal',
+    'total_interest_for_period', 'assessment_reduction_rate', 'property_tax_for_period',
+    'property_insurance_per_month', 'pmi_per_annum',
+)
+DISPLAY_COLUMNS = (
+    'purchase_value_and_down_payment', 'loan_period_and_interest',
+    'loan_amount_and_principal', 'interest_and_property_tax',
+    'insurance_and_pmi', 'formatted_property_tax',
+)
+
+
+def format_number_with_commas(value):
+    if value is None:
+        return "NA"
+    return "$  " + format(value, ',.2f').replace(',', THOUSANDS_SEPARATOR)
+
+
+def format_property_tax(assessment_reduction_rate, property_tax_for_period):
+    rate = '' if assessment_reduction_rate is None else str(assessment_reduction_rate)
+    if not rate or rate.upper() == 'NA':
+        return "NA"
+    return format_number_with_commas(property_tax_for_period)
+
+
+def format_pmi(down_payment_percent, pmi_per_annum):
+    try:
+        loan_percent = Decimal('100') - Decimal(down_payment_percent)
+    except (InvalidOperation, TypeError, ValueError):
+        return "NA"
+    if loan_percent <= 80:
+        return "NA"
+    return format_number_with_commas(pmi_per_annum)
+
+
+def display_columns(values):
+    """DISPLAY_COLUMNS for one row, from a mapping of its DISPLAY_SOURCE_COLUMNS"""
+    formatted_property_tax = format_property_tax(values['assessment_reduction_rate'], values['property_tax_for_period'])
+    return {
+        'purchase_value_and_down_payment':
+            f"{format_number_with_commas(values['purchase_value_excel'])} AND {values['down_payment_percent']} %",
+        'loan_period_and_interest':
+            f"{values['loan_period_years']} YEARS AND {Decimal(values['annual_interest_rate']):.2f} %",
+        'loan_amount_and_principal':
+            f"{format_number_with_commas(values['loan_amount'])} AND {format_number_with_commas(values['final_principal'])}",
+        'interest_and_property_tax':
+            f"{format_number_with_commas(values['total_interest_for_period'])} AND {formatted_property_tax}",
+        'insurance_and_pmi':
+            f"{format_number_with_commas(values['property_insurance_per_month'])} AND "
+            f"{format_pmi(values['down_payment_percent'], values['pmi_per_annum'])}",
+        'formatted_property_tax': formatted_property_tax,
+    }
+
+
+def update_rows(model, columns, changed, connection):
+    """One parameterized UPDATE per row of `changed` ({pk: {column: value}}), sent with executemany"""
+    opts = model._meta
+    fields = [opts.get_field(column) for column in columns]
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(opts.db_table)} SET "
+        + ", ".join(f"{quote(field.column)} = %s" for field in fields)
+        + f" WHERE {quote(opts.pk.column)} = %s"
+    )
+    params = [
+        [field.get_db_prep_save(values[field.name], connection) for field in fields] + [pk]
+        for pk, values in changed.items()
+    ]
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for start in range(0, len(params), UPDATE_BATCH_SIZE):
+            cursor.executemany(sql, params[start:start + UPDATE_BATCH_SIZE])
+
+
+def fill_display_columns(apps, schema_editor):
+    """Fill the new display columns of every existing row, in primary-key batches"""
+    connection = schema_editor.connection
+    model = apps.get_model('app2', 'ProcessedData2')
+    rows = model.objects.using(connection.alias).order_by('pk').values_list('pk', *DISPLAY_SOURCE_COLUMNS)
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return
+        changed = {pk: display_columns(dict(zip(DISPLAY_SOURCE_COLUMNS, values))) for pk, *values in batch}
+        update_rows(model, DISPLAY_COLUMNS, changed, connection)
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app2', '0006_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddata2',
+            name='formatted_property_tax',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='processeddata2',
+            name='insurance_and_pmi',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='processeddata2',
+            name='interest_and_property_tax',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='processeddata2',
+            name='loan_amount_and_principal',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='processeddata2',
+            name='loan_period_and_interest',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='processeddata2',
+            name='purchase_value_and_down_payment',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_display_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from app.fulltext import FullTextIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app2', '0007_display_columns'),
+    ]
+
+    operations = [
+        FullTextIndex(
+            'app2_processeddata2',
+            ('image_number', 'username', 'customer_name', 'customer_reference_number', 'guarantor_name'),
+        ).operation(),
+    ]
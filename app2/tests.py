@@ -1,3 +1,10 @@
 from django.test import TestCase
 
-# Create your tests here.
+from app.tests import ChangelistIndexMixin
+
+from .models import ProcessedData2
+
+
+class ProcessedData2ChangelistIndexTests(ChangelistIndexMixin, TestCase):
+    model = ProcessedData2
+    index_prefix = 'processeddata2'
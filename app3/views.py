@@ -1,8 +1,14 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from .calculator import LoanCalculator
 
-def home3(request):
+async def home3(request):
+    """
+    Loan calculator. Nothing is stored, so the calculation runs inline; only
+    rendering (which may read queued messages from the session) is handed to
+    a thread.
+    """
     if request.method == 'POST':
         try:
             # Create calculator instance
@@ -28,10 +34,10 @@ def home3(request):
             }
             
             messages.success(request, 'Calculations completed successfully!')
-            return render(request, 'app3/results.html', context)
+            return await sync_to_async(render)(request, 'app3/results.html', context)
 
         except Exception as e:
             messages.error(request, f'Error processing data: {str(e)}')
             return redirect('app3:home3')
 
-    return render(request, 'app3/home.html')
+    return await sync_to_async(render)(request, 'app3/home.html')
@@ -1,22 +1,30 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db import models
-from django.http import HttpResponse
-from rangefilter.filters import DateRangeFilter
+from rangefilter.filters import DateRangeFilter, NumericRangeFilter
+from app.caching import CUSTOMER_DATA, CachedCountPaginator
+from app.export_jobs import queue_export
+from app.fulltext import FullTextIndex, FullTextSearchMixin
+from app.keyset import KeysetPaginationMixin
+from app.references import ReferenceSearchMixin
 from .models import CustomerData
-import csv
-import io
-from datetime import datetime
+from .summary import summarize
 
 # Register your models here.
 
+
+class CustomerDataPaginator(CachedCountPaginator):
+    # Invalidated with the dashboard summary on every CustomerData change
+    namespace = CUSTOMER_DATA
+
+
 @admin.register(CustomerData)
-class CustomerDataAdmin(admin.ModelAdmin):
+class CustomerDataAdmin(ReferenceSearchMixin, FullTextSearchMixin, KeysetPaginationMixin, admin.ModelAdmin):
     list_display = [
         'customer_name', 
         'customer_reference_number', 
         'emp_id', 
-        'purchase_value', 
+        'formatted_purchase_value', 
         'city_state',
         'formatted_created_date',
         'formatted_updated_date'
@@ -25,6 +33,9 @@ class CustomerDataAdmin(admin.ModelAdmin):
     list_filter = [
         ('created_at', DateRangeFilter),
         ('updated_at', DateRangeFilter),
+        ('purchase_amount', NumericRangeFilter),
+        ('loan_period_years', NumericRangeFilter),
+        ('annual_interest_rate_percent', NumericRangeFilter),
         'city_state', 
         'emp_id'
     ]
@@ -36,11 +47,15 @@ class CustomerDataAdmin(admin.ModelAdmin):
         'guarantor_name',
         'city_state'
     ]
+    fulltext_index = FullTextIndex(CustomerData._meta.db_table, search_fields)
     
     readonly_fields = ['created_at', 'updated_at']
+    change_list_template = 'app4/admin/customerdata/change_list.html'
     ordering = ['-created_at']
+    keyset_field = 'created_at'
     
     list_per_page = 25
+    paginator = CustomerDataPaginator
     date_hierarchy = 'created_at'
     
     # Enable list editable for quick editing
@@ -78,6 +93,12 @@ class CustomerDataAdmin(admin.ModelAdmin):
         }),
     )
     
+    def formatted_purchase_value(self, obj):
+        """Purchase value as entered, sorted by its parsed amount"""
+        return obj.purchase_value
+    formatted_purchase_value.short_description = 'Purchase Value'
+    formatted_purchase_value.admin_order_field = 'purchase_amount'
+    
     def formatted_created_date(self, obj):
         """Format created date for better display"""
         if obj.created_at:
@@ -107,144 +128,22 @@ class CustomerDataAdmin(admin.ModelAdmin):
         except (AttributeError, KeyError):
             return response
         
-        # Add summary statistics
-        metrics = {
-            'total_records': qs.count(),
-        }
-        
-        response.context_data['summary'] = metrics
+        # Running totals when unfiltered, cached per filter set otherwise
+        response.context_data['summary'] = summarize(qs)
         return response
     
     # Add custom actions
     actions = ['export_to_excel', 'export_to_csv', 'mark_as_processed']
     
     def export_to_excel(self, request, queryset):
-        """Export selected records to Excel"""
-        try:
-            # Try to use xlsxwriter if available
-            import xlsxwriter
-            return self._export_to_xlsx(queryset)
-        except ImportError:
-            # Fallback to CSV if xlsxwriter is not available
-            self.message_user(request, "xlsxwriter not available, exporting as CSV instead.")
-            return self.export_to_csv(request, queryset)
-    
-    def _export_to_xlsx(self, queryset):
-        """Export to Excel using xlsxwriter"""
-        # Create a new workbook and add a worksheet
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('Customer Data')
-        
-        # Define formats
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#D7E4BC',
-            'border': 1
-        })
-        
-        cell_format = workbook.add_format({
-            'text_wrap': True,
-            'valign': 'top',
-            'border': 1
-        })
-        
-        date_format = workbook.add_format({
-            'num_format': 'yyyy-mm-dd hh:mm',
-            'text_wrap': True,
-            'valign': 'top',
-            'border': 1
-        })
-        
-        # Define headers
-        headers = [
-            'Emp ID', 'Image Number', 'Serial Number', 'Customer Reference Number',
-            'Customer Name', 'City, State', 'Purchase Value', 'Purchase Value Reduction %',
-            'Down Payment %', 'Loan Period (Years)', 'Annual Interest Rate %',
-            'Monthly Principal Reduction %', 'Total Interest Reduction %',
-            'Guarantor Name', 'Guarantor Reference Number', 'Assessment Reduction Rate %',
-            'Created At', 'Updated At'
-        ]
-        
-        # Write headers
-        for col, header in enumerate(headers):
-            worksheet.write(0, col, header, header_format)
-        
-        # Write data
-        for row, obj in enumerate(queryset, start=1):
-            worksheet.write(row, 0, obj.emp_id, cell_format)
-            worksheet.write(row, 1, obj.image_number, cell_format)
-            worksheet.write(row, 2, obj.serial_number, cell_format)
-            worksheet.write(row, 3, obj.customer_reference_number, cell_format)
-            worksheet.write(row, 4, obj.customer_name, cell_format)
-            worksheet.write(row, 5, obj.city_state, cell_format)
-            worksheet.write(row, 6, obj.purchase_value, cell_format)
-            worksheet.write(row, 7, obj.purchase_value_reduction_percent, cell_format)
-            worksheet.write(row, 8, obj.down_payment_percent, cell_format)
-            worksheet.write(row, 9, obj.loan_period_years, cell_format)
-            worksheet.write(row, 10, obj.annual_interest_rate_percent, cell_format)
-            worksheet.write(row, 11, obj.monthly_principal_reduction_percent, cell_format)
-            worksheet.write(row, 12, obj.total_interest_reduction_percent, cell_format)
-            worksheet.write(row, 13, obj.guarantor_name, cell_format)
-            worksheet.write(row, 14, obj.guarantor_reference_number, cell_format)
-            worksheet.write(row, 15, obj.assessment_reduction_rate_percent, cell_format)
-            worksheet.write(row, 16, obj.created_at, date_format)
-            worksheet.write(row, 17, obj.updated_at, date_format)
-        
-        # Set column widths
-        column_widths = [15, 15, 15, 25, 25, 20, 20, 25, 15, 20, 20, 25, 25, 25, 25, 25, 20, 20]
-        for col, width in enumerate(column_widths):
-            worksheet.set_column(col, col, width)
-        
-        workbook.close()
-        output.seek(0)
-        
-        # Create the HTTP response
-        filename = f"customer_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        response = HttpResponse(
-            output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        """Queue the selected records for export to Excel"""
+        return queue_export(request, 'customer_data_xlsx', queryset)
     
     export_to_excel.short_description = "Export selected records to Excel"
     
     def export_to_csv(self, request, queryset):
-        """Export selected records to CSV"""
-        response = HttpResponse(content_type='text/csv')
-        filename = f"customer_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        headers = [
-            'Emp ID', 'Image Number', 'Serial Number', 'Customer Reference Number',
-            'Customer Name', 'City, State', 'Purchase Value', 'Purchase Value Reduction %',
-            'Down Payment %', 'Loan Period (Years)', 'Annual Interest Rate %',
-            'Monthly Principal Reduction %', 'Total Interest Reduction %',
-            'Guarantor Name', 'Guarantor Reference Number', 'Assessment Reduction Rate %',
-            'Created At', 'Updated At'
-        ]
-        writer.writerow(headers)
-        
-        # Write data
-        for obj in queryset:
-            writer.writerow([
-                obj.emp_id, obj.image_number, obj.serial_number, obj.customer_reference_number,
-                obj.customer_name, obj.city_state, obj.purchase_value, obj.purchase_value_reduction_percent,
-                obj.down_payment_percent, obj.loan_period_years, obj.annual_interest_rate_percent,
-                obj.monthly_principal_reduction_percent, obj.total_interest_reduction_percent,
-                obj.guarantor_name, obj.guarantor_reference_number, obj.assessment_reduction_rate_percent,
-                obj.created_at.strftime('%Y-%m-%d %H:%M:%S'), obj.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        self.message_user(request, f"Successfully exported {queryset.count()} records to CSV.")
-        return response
+        """Queue the selected records for export to CSV"""
+        return queue_export(request, 'customer_data_csv', queryset)
     
     export_to_csv.short_description = "Export selected records to CSV"
     
@@ -0,0 +1,59 @@
+from decimal import Decimal, InvalidOperation, ROUND_DOWN
+
+from app.number_words import convert_alphanumeric_to_decimal
+
+# ——— Parsing CustomerData Figures ———
+# Purchase values are typed as text ("125000", "$ 1,25,000.00" or
+# "... dollars and ... cents"); the model keeps that text and stores the
+# parsed amount next to it. The same rules turned the old text percentage
+# and loan period columns into numbers (migration 0006).
+
+PURCHASE_AMOUNT_DIGITS = 20
+PERCENT_DIGITS = 10
+PERCENT_PLACES = 4
+MAX_LOAN_PERIOD = 32767  # PositiveSmallIntegerField
+
+
+def parse_figure(text):
+    """
+    The number in a figure typed as text, or None when there is none:
+    "125000", "$ 1,25,000.00", "7.5 %" and spelled-out amounts all parse.
+    """
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        value = Decimal(text.lstrip('$₹').replace(',', '').rstrip('%').strip())
+    except InvalidOperation:
+        try:
+            value = convert_alphanumeric_to_decimal(text)
+        except ValueError:
+            return None
+    return value if value.is_finite() else None
+
+
+def fit_decimal(value, max_digits, decimal_places):
+    """`value` truncated to a DecimalField's places, or None if it does not fit"""
+    if value is None:
+        return None
+    # Checked first: quantizing a huge value overflows the decimal context
+    if value and value.adjusted() >= max_digits - decimal_places:
+        return None
+    return value.quantize(Decimal(1).scaleb(-decimal_places), rounding=ROUND_DOWN)
+
+
+def parse_purchase_value(text):
+    """The amount in a purchase value, to the cent, or None"""
+    return fit_decimal(parse_figure(text), PURCHASE_AMOUNT_DIGITS, 2)
+
+
+def parse_percent(text):
+    return fit_decimal(parse_figure(text), PERCENT_DIGITS, PERCENT_PLACES)
+
+
+def parse_loan_period(text):
+    """A loan period in whole years, or None"""
+    value = parse_figure(text)
+    if value is None or value != value.to_integral_value() or not 0 <= value <= MAX_LOAN_PERIOD:
+        return None
+    return int(value)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_save
 
 
 class App4Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app4'
+
+    def ready(self):
+        from .summary import customer_data_deleted, customer_data_pre_save, customer_data_saved
+
+        pre_save.connect(customer_data_pre_save, sender='app4.CustomerData')
+        post_save.connect(customer_data_saved, sender='app4.CustomerData')
+        post_delete.connect(customer_data_deleted, sender='app4.CustomerData')
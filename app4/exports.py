@@ -0,0 +1,41 @@
+CUSTOMER_DATA_HEADERS = [
+    'Emp ID', 'Image Number', 'Serial Number', 'Customer Reference Number',
+    'Customer Name', 'City, State', 'Purchase Value', 'Purchase Value Reduction %',
+    'Down Payment %', 'Loan Period (Years)', 'Annual Interest Rate %',
+    'Monthly Principal Reduction %', 'Total Interest Reduction %',
+    'Guarantor Name', 'Guarantor Reference Number', 'Assessment Reduction Rate %',
+    'Created At', 'Updated At'
+]
+
+CUSTOMER_DATA_COLUMNS = (
+    'emp_id', 'image_number', 'serial_number', 'customer_reference_number',
+    'customer_name', 'city_state', 'purchase_value', 'purchase_value_reduction_percent',
+    'down_payment_percent', 'loan_period_years', 'annual_interest_rate_percent',
+    'monthly_principal_reduction_percent', 'total_interest_reduction_percent',
+    'guarantor_name', 'guarantor_reference_number', 'assessment_reduction_rate_percent',
+    'created_at', 'updated_at',
+)
+
+CUSTOMER_DATA_COLUMN_WIDTHS = [15, 15, 15, 25, 25, 20, 20, 25, 15, 20, 20, 25, 25, 25, 25, 25, 20, 20]
+
+
+# The percentages come back padded to the column's four places
+PERCENT_COLUMN_INDEXES = tuple(i for i, column in enumerate(CUSTOMER_DATA_COLUMNS) if column.endswith('_percent'))
+
+
+def plain_decimal(value):
+    """A stored percentage as it was typed: 7.5000 → 7.5, 12.0000 → 12"""
+    if value is None:
+        return None
+    value = value.normalize()
+    # normalize() writes whole tens in exponent form (1E+2)
+    return value.quantize(1) if value.as_tuple().exponent > 0 else value
+
+
+def customer_data_rows(queryset, chunk_size=2000):
+    """Yield export rows for a CustomerData queryset straight from values_list"""
+    for row in queryset.values_list(*CUSTOMER_DATA_COLUMNS).iterator(chunk_size=chunk_size):
+        row = list(row)
+        for i in PERCENT_COLUMN_INDEXES:
+            row[i] = plain_decimal(row[i])
+        yield row
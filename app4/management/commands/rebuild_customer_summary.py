@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app4.summary import rebuild_summary, summary_metrics
+
+
+class Command(BaseCommand):
+    help = "Recompute the CustomerData dashboard totals, e.g. after rows were changed with raw SQL or QuerySet.update()"
+
+    def handle(self, *args, **options):
+        metrics = summary_metrics(rebuild_summary())
+        self.stdout.write(self.style.SUCCESS(
+            f"Summarized {metrics['total_records']} records, "
+            f"total purchase value {metrics['total_purchase_value']}"
+        ))
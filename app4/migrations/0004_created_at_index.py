@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app4', '0003_alter_customerdata_customer_reference_number_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customerdata',
+            index=models.Index(fields=['created_at', 'id'], name='customerdata_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app4', '0004_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerDataSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_count', models.BigIntegerField(default=0)),
+                ('purchase_value_total', models.DecimalField(decimal_places=4, default=0, max_digits=30)),
+                ('purchase_value_count', models.BigIntegerField(default=0)),
+                ('loan_period_total', models.DecimalField(decimal_places=4, default=0, max_digits=30)),
+                ('loan_period_count', models.BigIntegerField(default=0)),
+                ('interest_rate_total', models.DecimalField(decimal_places=4, default=0, max_digits=30)),
+                ('interest_rate_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Customer Data Summary',
+                'verbose_name_plural': 'Customer Data Summary',
+            },
+        ),
+    ]
@@ -0,0 +1,333 @@
+import re
+from decimal import Decimal, InvalidOperation, ROUND_DOWN
+
+from django.db import DataError, migrations, models, transaction
+
+# ——— Frozen Helpers ———
+# Copies of app4.amounts, the spelled-out amount parser in app.number_words
+# and app.loan_batch.update_rows as they were when this migration was
+# written, so later changes there cannot change what it does. The parser
+# keeps the grammar and drops the error messages, caching and suggestions.
+
+BATCH_SIZE = 2000
+UPDATE_BATCH_SIZE = 1000
+REPORT_LIMIT = 20
+
+PURCHASE_AMOUNT_DIGITS = 20
+PERCENT_DIGITS = 10
+PERCENT_PLACES = 4
+MAX_LOAN_PERIOD = 32767  # PositiveSmallIntegerField
+
+# Text that means "no figure" and becomes NULL
+NO_FIGURE = {'', 'NA', 'N/A'}
+
+# Percentage columns turned from text into numbers: name -> verbose name
+PERCENT_COLUMNS = {
+    'purchase_value_reduction_percent': 'Purchase Value Reduction %',
+    'down_payment_percent': 'Down Payment %',
+    'annual_interest_rate_percent': 'Annual Interest Rate %',
+    'monthly_principal_reduction_percent': 'Monthly Principal Reduction %',
+    'total_interest_reduction_percent': 'Total Interest Reduction %',
+    'assessment_reduction_rate_percent': 'Assessment Reduction Rate %',
+}
+TEXT_COLUMNS = (*PERCENT_COLUMNS, 'loan_period_years')
+# Checked before converting: the text columns, and the purchase value that
+# purchase_amount is parsed from
+CHECKED_COLUMNS = ('purchase_value', *TEXT_COLUMNS)
+
+ONES = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70,
+    "eighty": 80, "ninety": 90,
+}
+SCALES = {'thousand': 10**3, 'million': 10**6, 'billion': 10**9, 'trillion': 10**12}
+TOKEN_RE = re.compile(r"[A-Za-z]+(?:-[A-Za-z]+)*|\d+|[^\sA-Za-z]")
+AMOUNT_RE = re.compile(r"^\s*(?:\$\s*)?(.*)\s+dollars\s+and\s+(.*)\s+cents\s*$", flags=re.IGNORECASE)
+
+
+def words(text):
+    """The lowercase words of a spelled-out number, hyphenated tens split"""
+    for match in TOKEN_RE.finditer(text):
+        token = match.group().lower()
+        if token == ',':
+            continue
+        if not token[0].isalpha():
+            raise ValueError(token)
+        if '-' not in token:
+            yield token
+            continue
+        tens, _, ones = token.partition('-')
+        if tens not in TENS or ONES.get(ones, 0) not in range(1, 10) or '-' in ones:
+            raise ValueError(token)
+        yield tens
+        yield ones
+
+
+def parse_number(text):
+    """
+    A spelled-out whole number, with the grammar of app.number_words: "and"
+    only after "hundred" or a scale, tens before units, scales descending.
+    Raises ValueError otherwise.
+    """
+    total = group = 0
+    has_tens = has_units = has_hundred = False
+    last_scale = previous = None
+    pending_and = zero = False
+
+    for word in words(text):
+        if zero:
+            raise ValueError(word)
+        if word == 'and':
+            if previous not in ('hundred', 'scale') or pending_and:
+                raise ValueError(word)
+            pending_and = True
+            continue
+
+        if word in ONES or word in TENS:
+            value = ONES.get(word, TENS.get(word))
+            if value == 0:
+                if previous is not None:
+                    raise ValueError(word)
+                zero = True
+            elif word in TENS:
+                if has_tens or has_units:
+                    raise ValueError(word)
+                has_tens = True
+            else:
+                if has_units or (has_tens and value >= 10):
+                    raise ValueError(word)
+                has_units = True
+            group += value
+            previous = 'unit'
+        elif pending_and:
+            raise ValueError(word)
+        elif word == 'hundred':
+            if has_hundred or not (has_tens or has_units):
+                raise ValueError(word)
+            group *= 100
+            has_tens = has_units = False
+            has_hundred = True
+            previous = 'hundred'
+        elif word in SCALES:
+            value = SCALES[word]
+            if (last_scale is not None and value >= last_scale) or not group:
+                raise ValueError(word)
+            total += group * value
+            group = 0
+            has_tens = has_units = has_hundred = False
+            last_scale = value
+            previous = 'scale'
+        else:
+            raise ValueError(word)
+        pending_and = False
+
+    if pending_and or previous is None:
+        raise ValueError(text)
+    return total + group
+
+
+def convert_amount(text):
+    """'<…> dollars and <…> cents' as a Decimal; ValueError if it is not one"""
+    match = AMOUNT_RE.match(text)
+    if not match:
+        raise ValueError(text)
+    dollars, cents = parse_number(match.group(1)), parse_number(match.group(2))
+    if cents > 99:
+        raise ValueError(text)
+    return Decimal(dollars) + Decimal(cents) / Decimal(100)
+
+
+def parse_figure(text):
+    """The number in a figure typed as text ("125000", "$ 1,25,000.00", "7.5 %", spelled out), or None"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        value = Decimal(text.lstrip('$₹').replace(',', '').rstrip('%').strip())
+    except InvalidOperation:
+        try:
+            value = convert_amount(text)
+        except ValueError:
+            return None
+    return value if value.is_finite() else None
+
+
+def fit_decimal(value, max_digits, decimal_places):
+    """`value` truncated to a DecimalField's places, or None if it does not fit"""
+    if value is None:
+        return None
+    # Checked first: quantizing a huge value overflows the decimal context
+    if value and value.adjusted() >= max_digits - decimal_places:
+        return None
+    return value.quantize(Decimal(1).scaleb(-decimal_places), rounding=ROUND_DOWN)
+
+
+def parse_loan_period(text):
+    value = parse_figure(text)
+    if value is None or value != value.to_integral_value() or not 0 <= value <= MAX_LOAN_PERIOD:
+        return None
+    return int(value)
+
+
+def canonical(column, text):
+    """The text a typed column can be cast from, or None if it is not a number"""
+    if column == 'loan_period_years':
+        value = parse_loan_period(text)
+    else:
+        value = fit_decimal(parse_figure(text), PERCENT_DIGITS, PERCENT_PLACES)
+    return None if value is None else str(value)
+
+
+def figure_problem(column, text):
+    """Why `text` cannot be converted as it is, or None when it can (or is blank / NA)"""
+    if (text or '').strip().upper() in NO_FIGURE:
+        return None
+    if column == 'loan_period_years':
+        return None if parse_loan_period(text) is not None else f"not a whole number of years up to {MAX_LOAN_PERIOD}"
+    value = parse_figure(text)
+    if value is None:
+        return "not a number"
+    if column == 'purchase_value':
+        # The text stays; purchase_amount is cut to the cent as the app does
+        return None if fit_decimal(value, PURCHASE_AMOUNT_DIGITS, 2) is not None else "too large"
+    fitted = fit_decimal(value, PERCENT_DIGITS, PERCENT_PLACES)
+    if fitted is None:
+        return "too large"
+    if fitted != value:
+        return f"more than {PERCENT_PLACES} decimal places"
+    return None
+
+
+def update_rows(model, columns, changed, connection):
+    """One parameterized UPDATE per row of `changed` ({pk: {column: value}}), sent with executemany"""
+    opts = model._meta
+    fields = [opts.get_field(column) for column in columns]
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(opts.db_table)} SET "
+        + ", ".join(f"{quote(field.column)} = %s" for field in fields)
+        + f" WHERE {quote(opts.pk.column)} = %s"
+    )
+    params = [
+        [field.get_db_prep_save(values[field.name], connection) for field in fields] + [pk]
+        for pk, values in changed.items()
+    ]
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for start in range(0, len(params), UPDATE_BATCH_SIZE):
+            cursor.executemany(sql, params[start:start + UPDATE_BATCH_SIZE])
+
+
+# ——— Steps ———
+
+def batches(queryset):
+    """`queryset` (of tuples starting with the pk) BATCH_SIZE rows at a time, in primary-key order"""
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1][0]
+
+
+def check_figures(apps, schema_editor):
+    """
+    Refuse to convert while any checked column holds something other than a
+    number (or nothing), or a percentage with more places than its column
+    keeps: the conversion would turn it into NULL or cut it short. The
+    error lists the offending values, which are left as they are, to be
+    fixed or cleared before migrating again.
+    """
+    CustomerData = apps.get_model('app4', 'CustomerData')
+    rows = CustomerData.objects.using(schema_editor.connection.alias).order_by('pk').values_list('pk', *CHECKED_COLUMNS)
+    bad, total = [], 0
+    for batch in batches(rows):
+        for pk, *texts in batch:
+            for column, text in zip(CHECKED_COLUMNS, texts):
+                problem = figure_problem(column, text)
+                if problem is not None:
+                    total += 1
+                    if len(bad) < REPORT_LIMIT:
+                        bad.append(f"  CustomerData {pk} {column}: {text!r} ({problem})")
+    if total:
+        more = f"\n  ... and {total - len(bad)} more" if total > len(bad) else ''
+        raise DataError(
+            f"{total} CustomerData figures cannot be converted without losing them. "
+            f"Correct or clear them, then migrate again:\n" + "\n".join(bad) + more
+        )
+
+
+def convert_figures(apps, schema_editor):
+    """
+    Rewrite each numeric text column as plain digits (NULL where it is
+    blank or NA) so the AlterFields below can cast it, and parse the
+    purchase values into purchase_amount.
+    """
+    connection = schema_editor.connection
+    CustomerData = apps.get_model('app4', 'CustomerData')
+    rows = CustomerData.objects.using(connection.alias).order_by('pk').values_list('pk', 'purchase_value', *TEXT_COLUMNS)
+    for batch in batches(rows):
+        changed = {}
+        for pk, purchase_value, *texts in batch:
+            values = {'purchase_amount': fit_decimal(parse_figure(purchase_value), PURCHASE_AMOUNT_DIGITS, 2)}
+            for column, text in zip(TEXT_COLUMNS, texts):
+                values[column] = canonical(column, text)
+            changed[pk] = values
+        update_rows(CustomerData, ('purchase_amount', *TEXT_COLUMNS), changed, connection)
+
+
+def reset_summary(apps, schema_editor):
+    # The dashboard totals were summed from the text; rebuilt on first read
+    apps.get_model('app4', 'CustomerDataSummary').objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app4', '0005_customer_data_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_figures, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='customerdata',
+            name='purchase_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=20, null=True, verbose_name='Purchase Amount'),
+        ),
+        # Let the text columns hold NULL for blank values
+        *[
+            migrations.AlterField(
+                model_name='customerdata',
+                name=name,
+                field=models.CharField(max_length=20, null=True, verbose_name=verbose_name),
+            )
+            for name, verbose_name in PERCENT_COLUMNS.items()
+        ],
+        migrations.AlterField(
+            model_name='customerdata',
+            name='loan_period_years',
+            field=models.CharField(max_length=10, null=True, verbose_name='Loan Period (Years)'),
+        ),
+        migrations.RunPython(convert_figures, migrations.RunPython.noop),
+        *[
+            migrations.AlterField(
+                model_name='customerdata',
+                name=name,
+                field=models.DecimalField(decimal_places=4, max_digits=10, null=True, verbose_name=verbose_name),
+            )
+            for name, verbose_name in PERCENT_COLUMNS.items()
+        ],
+        migrations.AlterField(
+            model_name='customerdata',
+            name='loan_period_years',
+            field=models.PositiveSmallIntegerField(null=True, verbose_name='Loan Period (Years)'),
+        ),
+        migrations.RunPython(reset_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from app.fulltext import FullTextIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app4', '0006_typed_numeric_columns'),
+    ]
+
+    operations = [
+        FullTextIndex(
+            'app4_customerdata',
+            ('customer_name', 'customer_reference_number', 'emp_id', 'guarantor_name', 'city_state'),
+        ).operation(),
+    ]
@@ -1,7 +1,15 @@
-from django.db import models
+from django.db import models, router, transaction
+
+from app.references import REFERENCE_KEY_COLUMNS, REFERENCE_KEY_LENGTH, reference_keys
+
+from .amounts import PERCENT_DIGITS, PERCENT_PLACES, PURCHASE_AMOUNT_DIGITS, parse_purchase_value
 
 # Create your models here.
 
+# Percentages converted from text are NULL where the old text was blank or NA
+PERCENT_FIELD = {'max_digits': PERCENT_DIGITS, 'decimal_places': PERCENT_PLACES, 'null': True}
+
+
 class CustomerData(models.Model):
     emp_id = models.CharField(max_length=50, verbose_name="Emp ID")
     image_number = models.CharField(max_length=100, verbose_name="Image Number*")
@@ -11,21 +19,33 @@ class CustomerData(models.Model):
         unique=True, 
         verbose_name="Customer Reference Number"
     )
+    # Spaces and case stripped, for lookups (app.references.reference_key)
+    customer_reference_key = models.CharField(
+        max_length=REFERENCE_KEY_LENGTH, null=True, blank=True, editable=False, db_index=True
+    )
     customer_name = models.CharField(max_length=200, verbose_name="Customer Name")
     city_state = models.CharField(max_length=200, verbose_name="City, State")
     purchase_value = models.CharField(max_length=500, verbose_name="Purchase Value")
-    purchase_value_reduction_percent = models.CharField(max_length=20, verbose_name="Purchase Value Reduction %")
-    down_payment_percent = models.CharField(max_length=20, verbose_name="Down Payment %")
-    loan_period_years = models.CharField(max_length=10, verbose_name="Loan Period (Years)")
-    annual_interest_rate_percent = models.CharField(max_length=20, verbose_name="Annual Interest Rate %")
-    monthly_principal_reduction_percent = models.CharField(max_length=20, verbose_name="Monthly Principal Reduction %")
-    total_interest_reduction_percent = models.CharField(max_length=20, verbose_name="Total Interest Reduction %")
+    # purchase_value parsed on save (app4.amounts), for sums, sorts and range filters
+    purchase_amount = models.DecimalField(
+        max_digits=PURCHASE_AMOUNT_DIGITS, decimal_places=2, null=True, blank=True,
+        editable=False, verbose_name="Purchase Amount"
+    )
+    purchase_value_reduction_percent = models.DecimalField(**PERCENT_FIELD, verbose_name="Purchase Value Reduction %")
+    down_payment_percent = models.DecimalField(**PERCENT_FIELD, verbose_name="Down Payment %")
+    loan_period_years = models.PositiveSmallIntegerField(null=True, verbose_name="Loan Period (Years)")
+    annual_interest_rate_percent = models.DecimalField(**PERCENT_FIELD, verbose_name="Annual Interest Rate %")
+    monthly_principal_reduction_percent = models.DecimalField(**PERCENT_FIELD, verbose_name="Monthly Principal Reduction %")
+    total_interest_reduction_percent = models.DecimalField(**PERCENT_FIELD, verbose_name="Total Interest Reduction %")
     guarantor_name = models.CharField(max_length=200, verbose_name="Guarantor Name")
     guarantor_reference_number = models.CharField(
         max_length=300, 
         verbose_name="Guarantor Reference Number"
     )
-    assessment_reduction_rate_percent = models.CharField(max_length=20, verbose_name="Assessment Reduction Rate %")
+    guarantor_reference_key = models.CharField(
+        max_length=REFERENCE_KEY_LENGTH, null=True, blank=True, editable=False, db_index=True
+    )
+    assessment_reduction_rate_percent = models.DecimalField(**PERCENT_FIELD, verbose_name="Assessment Reduction Rate %")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -33,6 +53,54 @@ class CustomerData(models.Model):
         verbose_name = "Customer Data"
         verbose_name_plural = "Customer Data"
         ordering = ['-created_at']
+        # Keyset pages of the admin changelist seek on (created_at, id)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='customerdata_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer_name} - {self.customer_reference_number}"
+
+    def save(self, *args, **kwargs):
+        self.purchase_amount = parse_purchase_value(self.purchase_value)
+        for column, value in reference_keys(self).items():
+            setattr(self, column, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, *REFERENCE_KEY_COLUMNS}
+            if 'purchase_value' in update_fields:
+                update_fields.add('purchase_amount')
+            kwargs['update_fields'] = update_fields
+        # post_save moves the summary totals (app4.summary); the row and the
+        # totals commit together or not at all. Deletes already send
+        # post_delete inside the deletion's transaction.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class CustomerDataSummary(models.Model):
+    """
+    Running totals over every CustomerData row, kept up to date by the
+    save/delete signals in app4.summary so the changelist dashboard reads one
+    row instead of scanning the table. Only the row with pk=1 is used.
+
+    The totals are summed from the numeric columns purchase_amount,
+    loan_period_years and annual_interest_rate_percent; each covers only the
+    rows where its column is not NULL, counted alongside it.
+    """
+    record_count = models.BigIntegerField(default=0)
+    purchase_value_total = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    purchase_value_count = models.BigIntegerField(default=0)
+    loan_period_total = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    loan_period_count = models.BigIntegerField(default=0)
+    interest_rate_total = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    interest_rate_count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Customer Data Summary"
+        verbose_name_plural = "Customer Data Summary"
+
+    def __str__(self):
+        return f"{self.record_count} records"
@@ -0,0 +1,152 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from app.caching import CUSTOMER_DATA, get_or_compute, invalidate
+
+# ——— Summary Statistics for the CustomerData Dashboard ———
+# The unfiltered numbers are running totals in CustomerDataSummary, moved by
+# the delta of every save and delete, so the dashboard reads one row however
+# large the table is. The delta is applied in the transaction that writes
+# the row (CustomerData.save() opens one), so a failure rolls back both. A
+# filtered changelist is summarized with one aggregate query per filter set,
+# cached under CUSTOMER_DATA until the next change (or the TTL).
+
+SUMMARY_PK = 1
+SUMMARY_TIMEOUT = 300
+
+# Metric -> CustomerData column holding it; NULLs are left out of a metric
+METRIC_COLUMNS = {
+    'purchase_value': 'purchase_amount',
+    'loan_period': 'loan_period_years',
+    'interest_rate': 'annual_interest_rate_percent',
+}
+COLUMNS = tuple(METRIC_COLUMNS.values())
+
+TOTAL_FIELDS = ('record_count',) + tuple(
+    f"{metric}_{part}" for metric in METRIC_COLUMNS for part in ('total', 'count')
+)
+
+
+def contribution(values, sign=1):
+    """What one row ({column: value}) adds to the totals, negated for sign=-1"""
+    totals = {'record_count': sign}
+    for metric, column in METRIC_COLUMNS.items():
+        value = values.get(column)
+        totals[f'{metric}_total'] = sign * (value or 0)
+        totals[f'{metric}_count'] = 0 if value is None else sign
+    return totals
+
+
+def aggregate_totals(queryset):
+    """The totals of a CustomerData queryset, computed by the database"""
+    aggregates = {'record_count': Count('pk')}
+    for metric, column in METRIC_COLUMNS.items():
+        aggregates[f'{metric}_total'] = Sum(column)
+        aggregates[f'{metric}_count'] = Count(column)
+    totals = queryset.order_by().aggregate(**aggregates)
+    # SUM() over no rows is NULL
+    return {field: value or 0 for field, value in totals.items()}
+
+
+def summary_metrics(totals):
+    """The `summary` context of the changelist template from a totals dict"""
+    def average(metric):
+        count = totals[f'{metric}_count']
+        return totals[f'{metric}_total'] / count if count else None
+
+    return {
+        'total_records': totals['record_count'],
+        'total_purchase_value': totals['purchase_value_total'],
+        'avg_loan_period': average('loan_period'),
+        'avg_interest_rate': average('interest_rate'),
+    }
+
+
+def rebuild_summary():
+    """
+    Recompute the running totals with one aggregate query and store them;
+    returns the totals. Needed after changes that send no signals
+    (QuerySet.update(), raw SQL); also builds the row on first use.
+    """
+    from .models import CustomerData, CustomerDataSummary
+
+    with transaction.atomic():
+        totals = aggregate_totals(CustomerData.objects.all())
+        CustomerDataSummary.objects.update_or_create(pk=SUMMARY_PK, defaults=totals)
+    invalidate(CUSTOMER_DATA)
+    return totals
+
+
+def apply_delta(delta):
+    """Move the running totals by `delta` with one UPDATE ... SET f = f + x"""
+    from .models import CustomerDataSummary
+
+    changes = {field: F(field) + value for field, value in delta.items() if value}
+    if changes and not CustomerDataSummary.objects.filter(pk=SUMMARY_PK).update(**changes):
+        # No summary row yet: build it from the table, this change included
+        rebuild_summary()
+
+
+def stored_totals():
+    from .models import CustomerDataSummary
+
+    totals = CustomerDataSummary.objects.filter(pk=SUMMARY_PK).values(*TOTAL_FIELDS).first()
+    return totals if totals is not None else rebuild_summary()
+
+
+def summarize(queryset):
+    """
+    Summary metrics for a CustomerData queryset: the running totals when it
+    is unfiltered, otherwise an aggregate over the filtered rows, cached per
+    filter set.
+    """
+    query = queryset.query
+    if not query.where:
+        return summary_metrics(stored_totals())
+    try:
+        sql = query.sql_with_params()
+    except EmptyResultSet:
+        return summary_metrics(dict.fromkeys(TOTAL_FIELDS, 0))
+    totals = get_or_compute(
+        CUSTOMER_DATA, 'changelist_summary', sql,
+        lambda: aggregate_totals(queryset),
+        timeout=SUMMARY_TIMEOUT,
+    )
+    return summary_metrics(totals)
+
+
+# ——— Signal Receivers (connected in App4Config.ready) ———
+
+def customer_data_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored values of a row about to be overwritten"""
+    instance._summary_previous = None
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(COLUMNS)):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(*COLUMNS).first()
+    instance._summary_previous = previous
+
+
+def row_values(instance):
+    """The summary columns of an instance, as the database will hold them"""
+    opts = instance._meta
+    return {column: opts.get_field(column).to_python(getattr(instance, column)) for column in COLUMNS}
+
+
+def customer_data_saved(sender, instance, created, update_fields=None, **kwargs):
+    values = row_values(instance)
+    previous = getattr(instance, '_summary_previous', None)
+    delta = contribution(values)
+    if previous is not None:
+        for field, value in contribution(previous, sign=-1).items():
+            delta[field] += value
+    elif not created:
+        # Only columns outside the summary changed
+        delta = {}
+    apply_delta(delta)
+    invalidate(CUSTOMER_DATA)
+
+
+def customer_data_deleted(sender, instance, **kwargs):
+    apply_delta(contribution(row_values(instance), sign=-1))
+    invalidate(CUSTOMER_DATA)
@@ -0,0 +1,28 @@
+"""
+Gunicorn settings for serving the ASGI application with Uvicorn workers:
+
+    gunicorn data_extract.asgi:application -c data_extract/gunicorn_asgi.py
+
+Each worker is one process running one event loop. The data-entry views
+(app.views.home, app2.views.home2, app3.views.home3) are async, so a worker
+keeps accepting submissions while others wait on MySQL. Every request that
+is in the middle of a save holds its own database connection, so keep
+workers x concurrent submissions below MySQL's max_connections.
+"""
+import multiprocessing
+
+bind = '0.0.0.0:8000'
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# One event loop per core is enough; concurrency comes from the loop, not
+# from extra processes as with the sync workers
+workers = multiprocessing.cpu_count()
+
+# Exports run in run_export_worker, so no request should take this long
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Async requests run their queries on per-request threads, so a persistent
+# connection would never be reused; close each one when its request ends
+raw_env = ['DB_CONN_MAX_AGE=0']
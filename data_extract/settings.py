@@ -1,7 +1,14 @@
+import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Settings marked below can be overridden from the environment; a .env file
+# in the project root is read first (existing variables win)
+load_dotenv(BASE_DIR / '.env')
+
 SECRET_KEY = 'django-insecure-c^y$9l4nx&^#op*hl+ps%v_pd=p&i3rfm9(ef*k(_d@vtcacl!'
 
 DEBUG = True
@@ -72,17 +79,29 @@ DATABASES = {
 
 '''
 
+# Database connection, overridable from the environment or a .env file
+# (DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'data',
-        'USER': 'root',
-        'PASSWORD': 'Tanasvi@123',
-        'HOST': '103.154.233.117',
-        'PORT': '3306',
+        'NAME': os.environ.get('DB_NAME', 'data'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'Tanasvi@123'),
+        'HOST': os.environ.get('DB_HOST', '103.154.233.117'),
+        'PORT': os.environ.get('DB_PORT', '3306'),
+        # Keep each worker thread's connection open between requests instead
+        # of paying TCP + auth to the database host on every request. Django
+        # holds one connection per thread, so a sync worker run with
+        # `--threads N` keeps up to N. The ASGI profile sets this to 0, as
+        # async requests run their queries on short-lived threads.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '300')),
+        # Ping a reused connection once per request before using it, so a
+        # connection the server dropped (wait_timeout, restart) is replaced
+        # instead of failing the request
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '10')),
     }
 }
     }
@@ -116,3 +135,20 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Caches (see app.caching): a per-process LRU for hot lookups, and a
+# file-backed tier all workers on the box share. Neither needs a server.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'data-extract',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / 'cache')),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}